@@ -7,6 +7,7 @@ from flask import Flask
 from flask_restful import Api
 from flask_cors import CORS
 from database import initialize_database
+from compresion import init_compression
 from api.endpoints import VideoResource, VideoListResource
 from config import DevelopmentConfig
 import logging
@@ -21,6 +22,9 @@ def create_app(config_class=DevelopmentConfig):
     # Configurar CORS para permitir requests desde frontend
     CORS(app)
 
+    # Comprimir respuestas grandes con gzip o brotli
+    init_compression(app)
+
     # Configurar logging
     logging.basicConfig(
         level=logging.INFO,
@@ -0,0 +1,129 @@
+"""
+Compresión de respuestas (gzip / brotli) para VideoStream API
+Negocia la codificación con Accept-Encoding, respeta un tamaño mínimo,
+comprime en streaming las respuestas generadas por bloques y reutiliza
+los cuerpos ya comprimidos de las respuestas con ETag
+"""
+
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+from flask import request
+
+try:
+    import brotli  # Opcional: sin brotli solo se ofrece gzip
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'text/csv', 'text/html', 'text/plain', 'text/css'
+}
+
+class CompressedCache:
+    """Caché LRU de cuerpos comprimidos, acotada en bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+def available_encodings():
+    """Codificaciones soportadas, en orden de preferencia"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def compress_body(data, encoding, gzip_level=6, brotli_quality=5):
+    """Comprimir un cuerpo completo"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+def compress_stream(chunks, encoding, gzip_level=6, brotli_quality=5):
+    """Comprimir un cuerpo en streaming, vaciando la salida en cada bloque"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=brotli_quality)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        process = compressor.compress
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+        finish = compressor.flush
+    try:
+        for chunk in chunks:
+            output = process(chunk) + flush()
+            if output:
+                yield output
+        yield finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def init_compression(app):
+    """Registrar la compresión de respuestas en la aplicación Flask"""
+    min_size = app.config.get('COMPRESSION_MIN_SIZE', 1024)
+    levels = {
+        'gzip_level': app.config.get('COMPRESSION_GZIP_LEVEL', 6),
+        'brotli_quality': app.config.get('COMPRESSION_BROTLI_QUALITY', 5)
+    }
+    cache = CompressedCache(app.config.get('COMPRESSION_CACHE_BYTES', 16 * 1024 * 1024))
+    app.extensions['compression_cache'] = cache
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+        if 'accept-encoding' not in response.vary:
+            response.vary.add('Accept-Encoding')
+        if 'no-transform' in response.headers.get('Cache-Control', ''):
+            return response
+
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.iter_encoded(), encoding, **levels)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            etag, _ = response.get_etag()
+            if etag:
+                # Mismo ETag => mismo cuerpo: se comprime una sola vez
+                key = (etag, encoding)
+                body = cache.get(key)
+                if body is None:
+                    body = compress_body(data, encoding, **levels)
+                    cache.put(key, body)
+                response.set_etag(etag, weak=True)
+            else:
+                body = compress_body(data, encoding, **levels)
+            response.set_data(body)
+
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -16,6 +16,12 @@ class BaseConfig:
     DEFAULT_PAGE_SIZE = 10
     MAX_PAGE_SIZE = 100
 
+    # Configuración de compresión de respuestas
+    COMPRESSION_MIN_SIZE = 1024  # Bytes mínimos para comprimir
+    COMPRESSION_GZIP_LEVEL = 6
+    COMPRESSION_BROTLI_QUALITY = 5
+    COMPRESSION_CACHE_BYTES = 16 * 1024 * 1024  # Cuerpos comprimidos reutilizables por ETag
+
 class DevelopmentConfig(BaseConfig):
     """Configuración para desarrollo"""
     DEBUG = True
@@ -27,6 +33,23 @@ class ProductionConfig(BaseConfig):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///videostream_prod.db'
 
+    # SQLite con lectores y escritores concurrentes: WAL en lugar del diario de rollback
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',  # Seguro con WAL, sin fsync en cada commit
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,  # 64 MB por conexión (negativo = KB)
+        'busy_timeout': 5000,  # Esperar al escritor en lugar de "database is locked"
+        'temp_store': 'MEMORY'
+    }
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 10,
+        'max_overflow': 10,
+        'pool_timeout': 10,
+        'pool_pre_ping': True,
+        'pool_recycle': 3600
+    }
+
 class TestingConfig(BaseConfig):
     """Configuración para testing"""
     TESTING = True
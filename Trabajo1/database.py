@@ -3,16 +3,34 @@ Configuración y manejo de base de datos
 """
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from datetime import datetime
 
 # Instancia global de SQLAlchemy
 db = SQLAlchemy()
 
+def apply_sqlite_pragmas(engine, pragmas):
+    """Aplicar los PRAGMAs de SQLite a cada conexión nueva del motor"""
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+
 def initialize_database(app):
     """Inicializar la base de datos con la aplicación Flask"""
     db.init_app(app)
 
     with app.app_context():
+        # Antes de abrir la primera conexión
+        apply_sqlite_pragmas(db.engine, app.config.get('SQLITE_PRAGMAS'))
+
         # Crear todas las tablas
         db.create_all()
         print("✅ Base de datos inicializada correctamente")
@@ -4,6 +4,7 @@ Este script se encarga de configurar y poner en marcha la aplicación Flask.
 """
 import os
 from remington_song import create_app  # Importamos nuestra "fábrica" de apps
+from remington_song.config import configuraciones  # Configuraciones por entorno
 from dotenv import load_dotenv  # Para cargar las variables de entorno
 
 # Cargamos las variables de entorno desde el archivo .env (si existe)
@@ -11,7 +12,8 @@ from dotenv import load_dotenv  # Para cargar las variables de entorno
 load_dotenv()
 
 # Creamos la aplicación utilizando la función create_app de nuestro paquete remington_song
-app = create_app()
+# REMINGTON_ENTORNO elige la configuración ('desarrollo', 'pruebas', 'produccion')
+app = create_app(configuraciones[os.environ.get("REMINGTON_ENTORNO", "defecto")])
 
 if __name__ == "__main__":
     # Obtenemos el puerto del entorno, o usamos el 5000 por defecto
@@ -0,0 +1,109 @@
+"""
+¡Benchmark de la búsqueda de canciones de Remington Song! ⏱️
+Compara el camino anterior (LIKE '%x%', que recorre toda la tabla) con el
+índice FTS5 sobre un catálogo sintético, por defecto de 1.000.000 de canciones.
+
+Uso (desde la carpeta Trabajo2):
+    python benchmarks/bench_busqueda.py --canciones 1000000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from remington_song.busqueda import CREAR_TABLA_FTS, TRIGGERS_FTS, CONSULTA_FTS, expresion_fts
+from utils import GENEROS_MUSICALES
+
+PALABRAS = [
+    'amor', 'noche', 'fuego', 'corazon', 'luna', 'sol', 'camino', 'sueño', 'mar', 'cielo',
+    'ciudad', 'baile', 'tiempo', 'libre', 'rio', 'viento', 'estrella', 'sombra', 'lluvia', 'verano',
+    'love', 'night', 'fire', 'heart', 'moon', 'road', 'dream', 'sea', 'sky', 'city'
+]
+
+CREAR_TABLA_CANCION = """
+CREATE TABLE cancion (
+    id INTEGER PRIMARY KEY,
+    titulo VARCHAR(100) NOT NULL,
+    artista VARCHAR(100) NOT NULL,
+    album VARCHAR(100),
+    duracion INTEGER,
+    año INTEGER,
+    genero VARCHAR(50),
+    fecha_creacion DATETIME NOT NULL
+)
+"""
+
+CONSULTA_LIKE = """
+SELECT * FROM cancion
+WHERE titulo LIKE :patron OR artista LIKE :patron OR album LIKE :patron OR genero LIKE :patron
+LIMIT :limite
+"""
+
+def generar_canciones(cantidad, semilla):
+    """Genera filas sintéticas de canciones de forma determinista."""
+    azar = random.Random(semilla)
+    for id in range(1, cantidad + 1):
+        yield (
+            id,
+            ' '.join(azar.choices(PALABRAS, k=3)).title(),
+            f'Artista {azar.randint(1, cantidad // 20 + 1)}',
+            f'Album {azar.randint(1, cantidad // 10 + 1)}',
+            azar.randint(60, 600),
+            azar.randint(1950, 2024),
+            azar.choice(GENEROS_MUSICALES),
+            '2024-01-01 00:00:00'
+        )
+
+def preparar_base(ruta, cantidad, semilla):
+    """Crea la base de datos con el catálogo sintético y el índice FTS5."""
+    conexion = sqlite3.connect(ruta)
+    conexion.execute(CREAR_TABLA_CANCION)
+    conexion.execute(CREAR_TABLA_FTS)
+    for sentencia in TRIGGERS_FTS.values():
+        conexion.execute(sentencia)
+    conexion.executemany(
+        'INSERT INTO cancion VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        generar_canciones(cantidad, semilla)
+    )
+    conexion.commit()
+    return conexion
+
+def medir(conexion, consulta, parametros, repeticiones):
+    """Ejecuta una consulta varias veces y devuelve los tiempos en milisegundos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        conexion.execute(consulta, parametros).fetchall()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara la búsqueda LIKE con FTS5')
+    parser.add_argument('--canciones', type=int, default=1_000_000, help='Tamaño del catálogo')
+    parser.add_argument('--repeticiones', type=int, default=20, help='Repeticiones por término')
+    parser.add_argument('--limite', type=int, default=20, help='Resultados por búsqueda')
+    parser.add_argument('--semilla', type=int, default=42, help='Semilla del generador')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        print(f"🎵 Generando {args.canciones:,} canciones...")
+        inicio = time.perf_counter()
+        conexion = preparar_base(os.path.join(carpeta, 'bench.db'), args.canciones, args.semilla)
+        print(f"   listo en {time.perf_counter() - inicio:.1f} s (incluye el mantenimiento del índice)")
+
+        print(f"\n{'término':<16}{'LIKE p50 (ms)':>16}{'FTS5 p50 (ms)':>16}{'aceleración':>14}")
+        for termino in ['luna', 'corazon', 'Artista 7', 'Vallenato', 'estrella', 'zzz']:
+            like = medir(conexion, CONSULTA_LIKE, {'patron': f'%{termino}%', 'limite': args.limite}, args.repeticiones)
+            fts = medir(conexion, CONSULTA_FTS, {'expresion': expresion_fts(q=termino), 'limite': args.limite}, args.repeticiones)
+            p50_like, p50_fts = statistics.median(like), statistics.median(fts)
+            print(f"{termino:<16}{p50_like:>16.2f}{p50_fts:>16.2f}{p50_like / max(p50_fts, 1e-6):>13.1f}x")
+        conexion.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""
+¡Prueba de carga de Remington Song! ⏱️
+Levanta la API con create_app sobre una base SQLite con datos sembrados de
+forma determinista (con remington_song.semillas) y la recorre con varios clientes a la vez (conexiones
+keep-alive), mezclando navegación, búsquedas, favoritos y logins. Parte de
+los listados se piden con Accept-Encoding, como lo haría un navegador.
+
+Por cada ruta reporta peticiones por segundo, p50/p95/p99 y consultas a la
+base por petición. El resultado se puede guardar como línea base y comparar
+después: las consultas por petición no dependen de la máquina, así que un
+cambio en resources.py que agregue consultas aparece siempre en la diferencia.
+
+Uso (desde la carpeta Trabajo2):
+    python benchmarks/bench_carga.py --segundos 20 --clientes 8
+    python benchmarks/bench_carga.py --guardar benchmarks/linea_base.json
+    python benchmarks/bench_carga.py --comparar benchmarks/linea_base.json
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import g, has_request_context
+from sqlalchemy import event
+from werkzeug.serving import WSGIRequestHandler, make_server
+from remington_song import create_app
+from remington_song.config import Config
+from remington_song.extensions import db
+from remington_song.semillas import PALABRAS, completar_siembra, sembrar as sembrar_datos
+
+CONTRASEÑA = 'clave-de-carga'
+
+# Peso de cada operación en cada mezcla
+MEZCLAS = {
+    'mixta': {'listar': 15, 'listar_comprimido': 5, 'detalle': 20, 'populares': 10, 'buscar': 15, 'sugerir': 5,
+              'favoritos_usuario': 10, 'alternar_favorito': 15, 'login': 5},
+    'lectura': {'listar': 20, 'listar_comprimido': 10, 'detalle': 30, 'populares': 15, 'buscar': 15, 'sugerir': 5,
+                'favoritos_usuario': 5},
+    'escritura': {'detalle': 20, 'alternar_favorito': 70, 'login': 10},
+}
+
+def percentil(valores, p):
+    """Percentil p (0-100) de una lista de valores."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+# ----------------------------------------------------------------------------------------------------
+# Datos y servidor
+# ----------------------------------------------------------------------------------------------------
+def sembrar(app, canciones, usuarios, favoritos_promedio, semilla):
+    """Carga los datos de semillas.sembrar (los mismos que 'flask remington seed')."""
+    with app.app_context():
+        reporte = sembrar_datos(canciones, usuarios, favoritos_promedio, semilla=semilla,
+                                contraseña=CONTRASEÑA, metodo_hash=app.config['HASH_METODO'])
+        completar_siembra(reporte['ids_canciones'])
+
+def contar_consultas(app):
+    """Agrega a cada respuesta la cabecera X-Consultas-BD con las consultas que hizo."""
+    with app.app_context():
+        motor = db.engine
+
+    @event.listens_for(motor, 'before_cursor_execute')
+    def contar(conexion, cursor, sentencia, parametros, contexto, executemany):
+        if has_request_context():
+            g.consultas_carga = g.get('consultas_carga', 0) + 1
+
+    @app.after_request
+    def informar(respuesta):
+        respuesta.headers['X-Consultas-BD'] = str(g.get('consultas_carga', 0))
+        return respuesta
+
+class ManejadorKeepAlive(WSGIRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Los clientes reutilizan su conexión
+
+# ----------------------------------------------------------------------------------------------------
+# Clientes
+# ----------------------------------------------------------------------------------------------------
+class Cliente:
+    """Un usuario virtual con su conexión keep-alive y su propio generador aleatorio."""
+
+    def __init__(self, puerto, numero, semilla, canciones, usuarios, registrar):
+        self.conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=60)
+        self.azar = random.Random(semilla * 1000 + numero)
+        self.canciones = canciones
+        self.usuarios = usuarios
+        self.id_usuario = numero % usuarios + 1
+        self.registrar = registrar
+        self.cabeceras = {'Content-Type': 'application/json'}
+
+    def pedir(self, etiqueta, metodo, ruta, cuerpo=None, cabeceras=None):
+        datos = json.dumps(cuerpo).encode('utf-8') if cuerpo is not None else None
+        inicio = time.perf_counter()
+        self.conexion.request(metodo, ruta, body=datos, headers=dict(self.cabeceras, **(cabeceras or {})))
+        respuesta = self.conexion.getresponse()
+        contenido = respuesta.read()
+        duracion = (time.perf_counter() - inicio) * 1000
+        self.registrar(etiqueta, respuesta.status, duracion, int(respuesta.getheader('X-Consultas-BD', 0)))
+        return respuesta, contenido
+
+    def login(self):
+        respuesta, contenido = self.pedir('POST /api/auth/login', 'POST', '/api/auth/login', {
+            'correo': f'usuario{self.id_usuario - 1}@semilla.remington.song', 'contraseña': CONTRASEÑA
+        })
+        if respuesta.status == 200:
+            self.cabeceras['Authorization'] = f"Bearer {json.loads(contenido)['access_token']}"
+
+    def listar(self):
+        respuesta, _ = self.pedir('GET /api/canciones', 'GET', '/api/canciones?limit=20')
+        siguiente = respuesta.getheader('X-Next-Cursor')
+        if siguiente and self.azar.random() < 0.5:
+            self.pedir('GET /api/canciones', 'GET', f'/api/canciones?limit=20&after={quote(siguiente)}')
+
+    def listar_comprimido(self):
+        # Páginas grandes y repetidas: la segunda vez el cuerpo comprimido sale de la caché por ETag
+        self.pedir('GET /api/canciones (gzip, br)', 'GET', '/api/canciones?limit=100',
+                   cabeceras={'Accept-Encoding': 'gzip, br'})
+
+    def detalle(self):
+        self.pedir('GET /api/canciones/<id>', 'GET', f'/api/canciones/{self.azar.randint(1, self.canciones)}')
+
+    def populares(self):
+        self.pedir('GET /api/canciones/populares', 'GET', '/api/canciones/populares?limit=10')
+
+    def buscar(self):
+        consulta = quote(' '.join(self.azar.sample(PALABRAS, self.azar.randint(1, 2))))
+        self.pedir('GET /api/canciones/buscar', 'GET', f'/api/canciones/buscar?q={consulta}')
+
+    def sugerir(self):
+        self.pedir('GET /api/canciones/sugerir', 'GET', f'/api/canciones/sugerir?q={quote(self.azar.choice(PALABRAS)[:3])}')
+
+    def favoritos_usuario(self):
+        self.pedir('GET /api/usuarios/<id>/favoritos', 'GET', f'/api/usuarios/{self.id_usuario}/favoritos?limit=20')
+
+    def alternar_favorito(self):
+        ruta = f'/api/usuarios/{self.id_usuario}/favoritos/{self.azar.randint(1, self.canciones)}'
+        self.pedir('POST /api/usuarios/<id>/favoritos/<id>', 'POST', ruta)
+        self.pedir('DELETE /api/usuarios/<id>/favoritos/<id>', 'DELETE', ruta)
+
+    def ejecutar(self, mezcla, fin):
+        operaciones, pesos = zip(*mezcla.items())
+        while time.perf_counter() < fin:
+            getattr(self, self.azar.choices(operaciones, pesos)[0])()
+        self.conexion.close()
+
+def correr_carga(puerto, args, segundos, mezcla):
+    """Corre los clientes durante 'segundos' y devuelve las mediciones por ruta."""
+    mediciones = defaultdict(lambda: {'latencias': [], 'consultas': [], 'errores': 0})
+    lock = threading.Lock()
+
+    def registrar(etiqueta, codigo, duracion, consultas):
+        with lock:
+            medicion = mediciones[etiqueta]
+            if codigo >= 500:
+                medicion['errores'] += 1
+            medicion['latencias'].append(duracion)
+            medicion['consultas'].append(consultas)
+
+    clientes = [Cliente(puerto, numero, args.semilla, args.canciones, args.usuarios, registrar)
+                for numero in range(args.clientes)]
+    for cliente in clientes:
+        cliente.login()
+    with lock:
+        mediciones.clear()  # Los logins iniciales no cuentan
+
+    fin = time.perf_counter() + segundos
+    hilos = [threading.Thread(target=cliente.ejecutar, args=(mezcla, fin)) for cliente in clientes]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return mediciones
+
+def resumir(mediciones, segundos):
+    rutas = {}
+    for etiqueta, medicion in sorted(mediciones.items()):
+        latencias = medicion['latencias']
+        rutas[etiqueta] = {
+            'peticiones': len(latencias),
+            'peticiones_por_segundo': round(len(latencias) / segundos, 1),
+            'p50_ms': round(percentil(latencias, 50), 2),
+            'p95_ms': round(percentil(latencias, 95), 2),
+            'p99_ms': round(percentil(latencias, 99), 2),
+            'consultas_bd_por_peticion': round(sum(medicion['consultas']) / len(latencias), 2),
+            'errores_5xx': medicion['errores']
+        }
+    total = sum(ruta['peticiones'] for ruta in rutas.values())
+    return {
+        'total': {
+            'peticiones': total,
+            'peticiones_por_segundo': round(total / segundos, 1),
+            'errores_5xx': sum(ruta['errores_5xx'] for ruta in rutas.values())
+        },
+        'rutas': rutas
+    }
+
+# ----------------------------------------------------------------------------------------------------
+# Comparación con la línea base
+# ----------------------------------------------------------------------------------------------------
+def comparar(base, actual, umbral, tolerancia_consultas):
+    """
+    Imprime la diferencia por ruta y devuelve la lista de regresiones.
+
+    Es regresión subir las consultas por petición más que
+    'tolerancia_consultas' (no depende de la máquina; la tolerancia cubre las
+    rutas cacheadas, cuyo promedio varía con los aciertos de la caché) o
+    empeorar el p95 más que 'umbral' (proporción, 0.25 = 25 %).
+    """
+    regresiones = []
+    print(f"{'ruta':45} {'p95 base':>9} {'p95':>9} {'consultas base':>15} {'consultas':>10}")
+    for etiqueta, ruta in actual['rutas'].items():
+        anterior = base['rutas'].get(etiqueta)
+        if anterior is None:
+            print(f"{etiqueta:45} {'-':>9} {ruta['p95_ms']:>9} {'-':>15} {ruta['consultas_bd_por_peticion']:>10}  (nueva)")
+            continue
+        marcas = []
+        if ruta['consultas_bd_por_peticion'] > anterior['consultas_bd_por_peticion'] * (1 + tolerancia_consultas) + 0.05:
+            marcas.append('más consultas')
+        if ruta['p95_ms'] > anterior['p95_ms'] * (1 + umbral):
+            marcas.append('p95 más lento')
+        if marcas:
+            regresiones.append((etiqueta, marcas))
+        print(f"{etiqueta:45} {anterior['p95_ms']:>9} {ruta['p95_ms']:>9} "
+              f"{anterior['consultas_bd_por_peticion']:>15} {ruta['consultas_bd_por_peticion']:>10}"
+              f"{'  ⚠️ ' + ', '.join(marcas) if marcas else ''}")
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga con una mezcla realista de peticiones')
+    parser.add_argument('--segundos', type=float, default=20, help='Duración de la medición')
+    parser.add_argument('--calentamiento', type=float, default=3, help='Segundos previos que no se miden')
+    parser.add_argument('--clientes', type=int, default=8, help='Usuarios virtuales simultáneos')
+    parser.add_argument('--mezcla', choices=sorted(MEZCLAS), default='mixta', help='Mezcla de operaciones')
+    parser.add_argument('--canciones', type=int, default=20_000, help='Canciones sembradas')
+    parser.add_argument('--usuarios', type=int, default=500, help='Usuarios sembrados')
+    parser.add_argument('--favoritos', type=int, default=20, help='Favoritos promedio por usuario')
+    parser.add_argument('--semilla', type=int, default=42, help='Semilla de los datos y de los clientes')
+    parser.add_argument('--guardar', help='Guarda el resultado como JSON (línea base)')
+    parser.add_argument('--comparar', help='Compara con una línea base JSON; sale con código 1 si hay regresiones')
+    parser.add_argument('--umbral', type=float, default=0.25, help='Empeoramiento tolerado del p95 (proporción)')
+    parser.add_argument('--tolerancia-consultas', type=float, default=0.1,
+                        help='Aumento tolerado de consultas por petición (proporción)')
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # Sin una línea de log por petición
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(carpeta, 'carga.db')}"
+            CREAR_ESQUEMA = True  # Base temporal: sin migraciones
+
+        app = create_app(BenchConfig)
+        sembrar(app, args.canciones, args.usuarios, args.favoritos, args.semilla)
+        contar_consultas(app)
+        servidor = make_server('127.0.0.1', 0, app, threaded=True, request_handler=ManejadorKeepAlive)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        try:
+            mezcla = MEZCLAS[args.mezcla]
+            if args.calentamiento:
+                correr_carga(servidor.server_port, args, args.calentamiento, mezcla)
+            mediciones = correr_carga(servidor.server_port, args, args.segundos, mezcla)
+        finally:
+            servidor.shutdown()
+            app.extensions['remington_song_hash'].cerrar()
+
+    resultado = {
+        'parametros': {nombre: getattr(args, nombre) for nombre in
+                       ('segundos', 'clientes', 'mezcla', 'canciones', 'usuarios', 'favoritos', 'semilla')},
+        **resumir(mediciones, args.segundos)
+    }
+    print(json.dumps(resultado, ensure_ascii=False, indent=2))
+
+    if args.guardar:
+        with open(args.guardar, 'w', encoding='utf-8') as salida:
+            json.dump(resultado, salida, ensure_ascii=False, indent=2)
+            salida.write('\n')
+        print(f"🎵 Línea base guardada en {args.guardar}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as entrada:
+            base = json.load(entrada)
+        regresiones = comparar(base, resultado, args.umbral, args.tolerancia_consultas)
+        if regresiones:
+            print(f"🎵 {len(regresiones)} rutas con regresiones")
+            sys.exit(1)
+        print("🎵 Sin regresiones respecto de la línea base")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+¡Benchmark del hash de contraseñas de Remington Song! ⏱️
+Levanta la API en un servidor con hilos, lanza una ola de logins y, al mismo
+tiempo, mide la latencia de una petición barata (GET /api/canciones/<id>).
+Compara el hash en el hilo de la petición (HASH_PROCESOS = 0) con el pool de
+procesos.
+
+Uso (desde la carpeta Trabajo2):
+    python benchmarks/bench_hash.py --segundos 10 --clientes-login 16
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server
+from remington_song import create_app
+from remington_song.config import Config
+
+def percentil(valores, p):
+    """Percentil p (0-100) de una lista de valores."""
+    if not valores:
+        return float('nan')
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+def peticion(url, datos=None):
+    """Hace una petición HTTP y devuelve (código, segundos)."""
+    cuerpo = json.dumps(datos).encode('utf-8') if datos is not None else None
+    solicitud = urllib.request.Request(url, data=cuerpo, headers={'Content-Type': 'application/json'})
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(solicitud, timeout=30) as respuesta:
+            respuesta.read()
+            codigo = respuesta.status
+    except urllib.error.HTTPError as error:
+        codigo = error.code
+    return codigo, time.perf_counter() - inicio
+
+def ejecutar(procesos, segundos, clientes_login, ruta):
+    """Corre un escenario y devuelve sus métricas."""
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{ruta}'
+        CREAR_ESQUEMA = True  # Base temporal: sin migraciones
+        HASH_PROCESOS = procesos
+
+    app = create_app(BenchConfig)
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{servidor.server_port}/api'
+
+    credenciales = {'correo': 'bench@remington.song', 'contraseña': 'clave-de-prueba'}
+    peticion(f'{base}/auth/register', dict(credenciales, nombre='Bench'))
+    peticion(f'{base}/canciones', {'titulo': 'Canción', 'artista': 'Artista'})
+
+    fin = time.perf_counter() + segundos
+    logins, rechazados, latencias_get = [], [0], []
+
+    def cliente_login():
+        while time.perf_counter() < fin:
+            codigo, duracion = peticion(f'{base}/auth/login', credenciales)
+            if codigo == 200:
+                logins.append(duracion)
+            elif codigo == 503:
+                rechazados[0] += 1
+
+    def cliente_get():
+        while time.perf_counter() < fin:
+            _, duracion = peticion(f'{base}/canciones/1')
+            latencias_get.append(duracion * 1000)
+
+    hilos = [threading.Thread(target=cliente_login) for _ in range(clientes_login)]
+    hilos.append(threading.Thread(target=cliente_get))
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    servidor.shutdown()
+    app.extensions['remington_song_hash'].cerrar()
+
+    return {
+        'logins_por_segundo': round(len(logins) / segundos, 1),
+        'logins_rechazados_503': rechazados[0],
+        'get_p50_ms': round(percentil(latencias_get, 50), 2),
+        'get_p99_ms': round(percentil(latencias_get, 99), 2),
+        'get_peticiones': len(latencias_get)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Mide logins y latencia de otras rutas bajo carga')
+    parser.add_argument('--segundos', type=float, default=10, help='Duración de cada escenario')
+    parser.add_argument('--clientes-login', type=int, default=16, help='Hilos haciendo login sin pausa')
+    parser.add_argument('--procesos', type=int, default=Config.HASH_PROCESOS, help='Procesos del pool de hash')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        for nombre, procesos in (('en el hilo', 0), (f'pool de {args.procesos}', args.procesos)):
+            ruta = os.path.join(carpeta, f'bench_{procesos}.db')
+            metricas = ejecutar(procesos, args.segundos, args.clientes_login, ruta)
+            print(f"🎵 Hash {nombre}: {json.dumps(metricas, ensure_ascii=False)}")
+
+if __name__ == '__main__':
+    main()
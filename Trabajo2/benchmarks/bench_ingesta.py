@@ -0,0 +1,73 @@
+"""
+¡Benchmark de la carga masiva de canciones de Remington Song! ⏱️
+Mide el rendimiento de POST /api/canciones/bulk (lectura en streaming y
+executemany por lotes) frente a una petición POST /api/canciones por canción.
+
+Uso (desde la carpeta Trabajo2):
+    python benchmarks/bench_ingesta.py --canciones 50000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from remington_song import create_app
+from remington_song.config import Config
+from utils import GENEROS_MUSICALES
+
+def generar_canciones(cantidad, semilla):
+    """Genera canciones sintéticas de forma determinista."""
+    azar = random.Random(semilla)
+    for numero in range(cantidad):
+        yield {
+            'titulo': f'Canción {numero}',
+            'artista': f'Artista {azar.randint(1, 5000)}',
+            'album': f'Álbum {azar.randint(1, 20000)}',
+            'duracion': azar.randint(60, 600),
+            'año': azar.randint(1950, 2024),
+            'genero': azar.choice(GENEROS_MUSICALES)
+        }
+
+def crear_app(ruta):
+    """Crea la aplicación apuntando a una base de datos SQLite temporal."""
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{ruta}'
+        CREAR_ESQUEMA = True  # Base temporal: sin migraciones
+    return create_app(BenchConfig)
+
+def main():
+    parser = argparse.ArgumentParser(description='Mide el rendimiento de la carga masiva')
+    parser.add_argument('--canciones', type=int, default=50_000, help='Canciones de la carga masiva')
+    parser.add_argument('--individuales', type=int, default=1_000, help='Canciones cargadas de a una')
+    parser.add_argument('--semilla', type=int, default=42, help='Semilla del generador')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        app = crear_app(os.path.join(carpeta, 'bench.db'))
+        cliente = app.test_client()
+
+        cuerpo = ''.join(
+            json.dumps(cancion, ensure_ascii=False) + '\n'
+            for cancion in generar_canciones(args.canciones, args.semilla)
+        ).encode('utf-8')
+        inicio = time.perf_counter()
+        respuesta = cliente.post('/api/canciones/bulk', data=cuerpo, content_type='application/x-ndjson')
+        segundos = time.perf_counter() - inicio
+        reporte = respuesta.get_json()
+        print(f"📥 Carga masiva: {reporte['insertadas']:,} canciones en {segundos:.2f} s "
+              f"({reporte['insertadas'] / segundos:,.0f} filas/s, {len(cuerpo) / 1e6:.1f} MB)")
+
+        inicio = time.perf_counter()
+        for cancion in generar_canciones(args.individuales, args.semilla + 1):
+            cliente.post('/api/canciones', json=cancion)
+        segundos = time.perf_counter() - inicio
+        print(f"🐢 Una por petición: {args.individuales:,} canciones en {segundos:.2f} s "
+              f"({args.individuales / segundos:,.0f} filas/s)")
+
+if __name__ == '__main__':
+    main()
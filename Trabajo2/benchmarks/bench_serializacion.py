@@ -0,0 +1,75 @@
+"""
+¡Benchmark de la serialización de listados de Remington Song! ⏱️
+Compara el camino anterior (objetos del ORM + to_dict() + marshal + json)
+con el serializador compilado sobre filas de Core.
+
+Uso (desde la carpeta Trabajo2):
+    python benchmarks/bench_serializacion.py --canciones 10000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_restx import marshal
+from sqlalchemy import insert
+from remington_song import create_app
+from remington_song.config import Config
+from remington_song.extensions import db
+from remington_song.models import Cancion
+from remington_song.resources import cancion_model, serializador_cancion
+from remington_song.serializacion import codificar_json, orjson
+from bench_ingesta import generar_canciones
+
+def crear_app(ruta):
+    """Crea la aplicación apuntando a una base de datos SQLite temporal."""
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{ruta}'
+        CREAR_ESQUEMA = True  # Base temporal: sin migraciones
+    return create_app(BenchConfig)
+
+def camino_anterior(limite):
+    canciones = Cancion.query.order_by(Cancion.id).limit(limite).all()
+    return json.dumps(marshal([cancion.to_dict() for cancion in canciones], cancion_model)).encode('utf-8')
+
+def camino_rapido(limite):
+    filas = db.session.query(*serializador_cancion.columnas).order_by(Cancion.id).limit(limite).all()
+    return codificar_json(serializador_cancion.serializar_filas(filas))
+
+def medir(funcion, limite, repeticiones):
+    """Ejecuta funcion varias veces (con la sesión limpia) y devuelve los tiempos en ms."""
+    tiempos = []
+    for _ in range(repeticiones):
+        db.session.remove()
+        inicio = time.perf_counter()
+        funcion(limite)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara los caminos de serialización')
+    parser.add_argument('--canciones', type=int, default=10_000, help='Filas por listado')
+    parser.add_argument('--repeticiones', type=int, default=20, help='Repeticiones por camino')
+    parser.add_argument('--semilla', type=int, default=42, help='Semilla del generador')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        app = crear_app(os.path.join(carpeta, 'bench.db'))
+        with app.app_context():
+            db.session.execute(insert(Cancion.__table__), list(generar_canciones(args.canciones, args.semilla)))
+            db.session.commit()
+
+            print(f"🎵 Listado de {args.canciones:,} canciones (codificador: {'orjson' if orjson else 'json'})")
+            anterior = statistics.median(medir(camino_anterior, args.canciones, args.repeticiones))
+            rapido = statistics.median(medir(camino_rapido, args.canciones, args.repeticiones))
+            print(f"   ORM + to_dict + marshal: {anterior:8.1f} ms (p50)")
+            print(f"   Core + serializador:     {rapido:8.1f} ms (p50)")
+            print(f"   aceleración:             {anterior / max(rapido, 1e-6):8.1f}x")
+
+if __name__ == '__main__':
+    main()
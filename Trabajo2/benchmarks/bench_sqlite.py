@@ -0,0 +1,127 @@
+"""
+¡Benchmark del perfil de SQLite de Remington Song! ⏱️
+Levanta la API en un servidor con hilos y mezcla escritores (altas de
+canciones y favoritos) con lectores (listado y detalle de canciones).
+Compara la configuración por defecto (diario de rollback) con
+ProductionConfig (WAL, synchronous = NORMAL, mmap, caché y busy_timeout).
+
+Uso (desde la carpeta Trabajo2):
+    python benchmarks/bench_sqlite.py --segundos 10 --escritores 4 --lectores 8
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server
+from remington_song import create_app
+from remington_song.config import Config, ProductionConfig
+
+def percentil(valores, p):
+    """Percentil p (0-100) de una lista de valores."""
+    if not valores:
+        return float('nan')
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+def peticion(url, datos=None, metodo=None):
+    """Hace una petición HTTP y devuelve (código, segundos)."""
+    cuerpo = json.dumps(datos).encode('utf-8') if datos is not None else None
+    solicitud = urllib.request.Request(url, data=cuerpo, method=metodo,
+                                       headers={'Content-Type': 'application/json'})
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(solicitud, timeout=60) as respuesta:
+            respuesta.read()
+            codigo = respuesta.status
+    except urllib.error.HTTPError as error:
+        codigo = error.code
+    return codigo, time.perf_counter() - inicio
+
+def ejecutar(config_base, ruta, segundos, escritores, lectores, canciones_iniciales):
+    """Corre un escenario y devuelve sus métricas."""
+    class BenchConfig(config_base):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{ruta}'
+        CREAR_ESQUEMA = True  # Base temporal: sin migraciones
+        CACHE_RESULTADOS = None  # Medimos la base, no la caché
+        HASH_PROCESOS = 0
+
+    app = create_app(BenchConfig)
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{servidor.server_port}/api'
+
+    peticion(f'{base}/usuarios', {'nombre': 'Bench', 'correo': 'bench@remington.song', 'contraseña': 'clave'})
+    for numero in range(canciones_iniciales):
+        peticion(f'{base}/canciones', {'titulo': f'Canción {numero}', 'artista': f'Artista {numero % 50}'})
+
+    fin = time.perf_counter() + segundos
+    contador = itertools.count(canciones_iniciales)
+    escrituras, lecturas, errores = [], [], {}
+
+    def anotar(lista, codigo, duracion):
+        if codigo < 500:
+            lista.append(duracion * 1000)
+        else:
+            errores[codigo] = errores.get(codigo, 0) + 1
+
+    def escritor():
+        while time.perf_counter() < fin:
+            numero = next(contador)
+            anotar(escrituras, *peticion(f'{base}/canciones', {'titulo': f'Canción {numero}', 'artista': 'Bench'}))
+            id_cancion = numero % canciones_iniciales + 1
+            anotar(escrituras, *peticion(f'{base}/usuarios/1/favoritos/{id_cancion}', {}, 'POST'))
+            anotar(escrituras, *peticion(f'{base}/usuarios/1/favoritos/{id_cancion}', metodo='DELETE'))
+
+    def lector(desplazamiento):
+        for numero in itertools.count(desplazamiento):
+            if time.perf_counter() >= fin:
+                break
+            if numero % 2:
+                anotar(lecturas, *peticion(f'{base}/canciones?limit=50'))
+            else:
+                anotar(lecturas, *peticion(f'{base}/canciones/{numero % canciones_iniciales + 1}'))
+
+    hilos = [threading.Thread(target=escritor) for _ in range(escritores)]
+    hilos += [threading.Thread(target=lector, args=(numero,)) for numero in range(lectores)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    servidor.shutdown()
+
+    return {
+        'escrituras_por_segundo': round(len(escrituras) / segundos, 1),
+        'lecturas_por_segundo': round(len(lecturas) / segundos, 1),
+        'escritura_p99_ms': round(percentil(escrituras, 99), 2),
+        'lectura_p50_ms': round(percentil(lecturas, 50), 2),
+        'lectura_p99_ms': round(percentil(lecturas, 99), 2),
+        'errores': errores
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara SQLite por defecto con el perfil de producción')
+    parser.add_argument('--segundos', type=float, default=10, help='Duración de cada escenario')
+    parser.add_argument('--escritores', type=int, default=4, help='Hilos que escriben sin pausa')
+    parser.add_argument('--lectores', type=int, default=8, help='Hilos que leen sin pausa')
+    parser.add_argument('--canciones', type=int, default=200, help='Canciones creadas antes de medir')
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # Sin una línea de log por petición
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        for nombre, config_base in (('por defecto', Config), ('producción', ProductionConfig)):
+            ruta = os.path.join(carpeta, f'bench_{config_base.__name__}.db')
+            metricas = ejecutar(config_base, ruta, args.segundos, args.escritores, args.lectores, args.canciones)
+            print(f"🎵 SQLite {nombre}: {json.dumps(metricas, ensure_ascii=False)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Índices para las consultas frecuentes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 20:34:20.937572
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# (tabla, nombre del índice, columnas)
+INDICES = [
+    ('cancion', 'ix_cancion_artista', ['artista']),
+    ('cancion', 'ix_cancion_año', ['año']),
+    ('cancion', 'ix_cancion_fecha_creacion', ['fecha_creacion']),
+    ('cancion', 'ix_cancion_genero', ['genero']),
+    ('favorito', 'ix_favorito_fecha_marcado', ['fecha_marcado']),
+    ('favorito', 'ix_favorito_id_cancion', ['id_cancion']),
+    ('favorito', 'ix_favorito_id_usuario_fecha_marcado', ['id_usuario', 'fecha_marcado']),
+    ('usuario', 'ix_usuario_fecha_registro', ['fecha_registro']),
+]
+
+
+def _existentes(tabla):
+    return {indice['name'] for indice in sa.inspect(op.get_bind()).get_indexes(tabla)}
+
+
+def upgrade():
+    # Las bases creadas con db.create_all() en una versión nueva ya tienen estos
+    # índices: solo creamos los que faltan.
+    for tabla, nombre, columnas in INDICES:
+        if nombre not in _existentes(tabla):
+            op.create_index(nombre, tabla, columnas, unique=False)
+
+
+def downgrade():
+    for tabla, nombre, _ in reversed(INDICES):
+        if nombre in _existentes(tabla):
+            op.drop_index(nombre, table_name=tabla)
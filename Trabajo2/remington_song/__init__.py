@@ -4,10 +4,22 @@ Aquí definimos la función create_app, que inicializa y configura la aplicació
 """
 from flask import Flask
 from flask_restx import Api
+from sqlalchemy import inspect
 from .config import Config  # Importamos la configuración base
 from .extensions import db, migrate, jwt  # Importamos las extensiones
 from .resources import api as ns1  # Importamos el namespace de recursos
-from .models import Usuario, Cancion, Favorito  # Importamos los modelos
+from .models import Usuario, Cancion, Favorito, VersionTabla  # Importamos los modelos
+from .busqueda import crear_indice_busqueda  # Índice de texto completo (FTS5)
+from .indices import registrar_indices  # Índices en memoria (trigramas y sugerencias)
+from .contadores import registrar_contadores  # Contadores de favoritos
+from .cli import remington_cli  # Comandos 'flask remington ...'
+from .condicional import inicializar_versiones  # Versiones por tabla para los ETags
+from .ingesta import reparar_carga_interrumpida  # Índices de una carga rápida que no terminó
+from .cache import registrar_cache  # Caché de resultados de búsquedas y populares
+from .compresion import registrar_compresion  # Compresión gzip / brotli de las respuestas
+from .seguridad import registrar_hash  # Hash de contraseñas en un pool de procesos
+from .motor import registrar_pragmas  # PRAGMAs de SQLite en cada conexión
+from .replicas import preparar_replicas, registrar_replicas, sincronizar_replicas  # Lecturas en réplicas
 from flask_cors import CORS  # Importamos CORS
 
 def create_app(config_class=Config):
@@ -27,10 +39,14 @@ def create_app(config_class=Config):
     app.config.from_object(config_class)
 
     # Inicializamos las extensiones
+    preparar_replicas(app)  # Las réplicas de lectura son binds adicionales de SQLAlchemy
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)  # Inicializamos JWT
-    CORS(app)  # Habilitamos CORS
+    registrar_pragmas(app)  # Antes de abrir la primera conexión
+    registrar_replicas(app)  # Las peticiones de lectura consultan una réplica
+    # Habilitamos CORS (exponiendo las cabeceras de paginación y de caché)
+    CORS(app, expose_headers=['Link', 'X-Next-Cursor', 'ETag', 'Last-Modified'])
 
     # Creamos la API de Flask-RESTx
     api = Api(
@@ -44,10 +60,39 @@ def create_app(config_class=Config):
     # Agregamos el namespace de recursos a la API
     api.add_namespace(ns1)
 
-    # Registramos un hook para crear la base de datos si no existe
-    @app.before_first_request
-    def create_tables():
-        db.create_all()
+    # Registramos los índices en memoria (se construyen en su primer uso)
+    registrar_indices(app)
+
+    # Los contadores de favoritos se ajustan con eventos del ORM
+    registrar_contadores()
+
+    # Creamos la caché de resultados
+    registrar_cache(app)
+
+    # Comprimimos las respuestas grandes (gzip o brotli, según el cliente)
+    registrar_compresion(app)
+
+    # Preparamos el pool de procesos para el hash de contraseñas
+    registrar_hash(app)
+
+    # Registramos los comandos de consola
+    app.cli.add_command(remington_cli)
+
+    # Preparamos la base y el índice de búsqueda al arrancar (before_first_request ya no
+    # existe en Flask 2.3). Las tablas las crean las migraciones ('flask db upgrade');
+    # create_all solo se usa con CREAR_ESQUEMA (pruebas y bases temporales).
+    with app.app_context():
+        if app.config.get('CREAR_ESQUEMA'):
+            db.create_all()
+        if not inspect(db.engine).has_table(VersionTabla.__tablename__):
+            print("🎵 La base de Remington Song todavía no tiene tablas: se crean con 'flask --app app db upgrade'")
+            return app
+        with db.engine.begin() as conexion:
+            app.extensions['remington_song_fts'] = crear_indice_busqueda(conexion)
+            inicializar_versiones(conexion)
+            if reparar_carga_interrumpida(conexion):
+                print("🎵 Se restauraron los índices de una carga rápida que no terminó")
+        sincronizar_replicas(app)  # Las réplicas locales arrancan con el mismo esquema y datos
         print("🎵 Base de datos de Remington Song inicializada correctamente")
 
     return app
\ No newline at end of file
@@ -21,7 +21,8 @@ cancion_model = {
     'duracion': fields.Integer(description='Duración de la canción en segundos'),
     'año': fields.Integer(description='Año de lanzamiento de la canción'),
     'genero': fields.String(description='Género de la canción'),
-    'fecha_creacion': fields.DateTime(description='Fecha de creación de la canción')
+    'fecha_creacion': fields.DateTime(description='Fecha de creación de la canción'),
+    'total_favoritos': fields.Integer(description='Cantidad de usuarios que marcaron la canción como favorita')
 }
 
 # Modelo para la representación de un favorito en la API
@@ -51,9 +52,71 @@ registro_model = {
     'contraseña': fields.String(required=True, description='Contraseña del usuario')
 }
 
+# Modelo para las estadísticas de un usuario
+estadisticas_model = {
+    'id_usuario': fields.Integer(description='Identificador del usuario'),
+    'total_favoritos': fields.Integer(description='Cantidad total de favoritos del usuario'),
+    'genero_favorito': fields.String(description='Género con más favoritos'),
+    'generos_estadisticas': fields.Raw(description='Cantidad de favoritos por género')
+}
+
+# Modelo para pedir estadísticas de varios usuarios
+estadisticas_lote_model = {
+    'ids': fields.List(fields.Integer, required=True, description='Identificadores de los usuarios')
+}
+
+# Modelo para el reporte de una carga masiva de canciones
+reporte_carga_model = {
+    'recibidas': fields.Integer(description='Filas leídas del cuerpo de la petición'),
+    'insertadas': fields.Integer(description='Filas insertadas'),
+    'rechazadas': fields.Integer(description='Filas que no pasaron la validación'),
+    'errores': fields.Raw(description='Errores por fila: [{"fila": n, "errores": [...]}]'),
+    'errores_omitidos': fields.Integer(description='Errores que no se detallan por superar el máximo'),
+    'error_formato': fields.String(description='Error de formato que cortó la lectura (si lo hubo)'),
+    'error_base_datos': fields.String(description='Error de la base de datos que cortó la carga (si lo hubo)'),
+    'segundos': fields.Float(description='Duración de la carga'),
+    'filas_por_segundo': fields.Float(description='Rendimiento de la carga')
+}
+
+# Modelo para agregar y quitar varios favoritos a la vez
+favoritos_lote_model = {
+    'agregar': fields.List(fields.Integer, description='Ids de canciones a marcar como favoritas'),
+    'eliminar': fields.List(fields.Integer, description='Ids de canciones a desmarcar')
+}
+
+# Modelo para el resultado de una operación en lote sobre favoritos
+resultado_favoritos_lote_model = {
+    'agregados': fields.Integer(description='Favoritos agregados'),
+    'eliminados': fields.Integer(description='Favoritos eliminados'),
+    'ya_existian': fields.List(fields.Integer, description='Canciones que ya eran favoritas'),
+    'no_encontradas': fields.List(fields.Integer, description='Canciones que no existen'),
+    'no_eran_favoritas': fields.List(fields.Integer, description='Canciones a desmarcar que no eran favoritas')
+}
+
 # Modelo para búsqueda de canciones
 busqueda_model = {
+    'q': fields.String(description='Texto libre a buscar en título, artista, álbum y género'),
     'titulo': fields.String(description='Título de la canción a buscar'),
     'artista': fields.String(description='Artista de la canción a buscar'),
     'genero': fields.String(description='Género de la canción a buscar')
-}
\ No newline at end of file
+}
+
+# Modelo para las estadísticas de la caché de resultados
+estadisticas_cache_model = {
+    'almacen': fields.String(description='Almacén de la caché: memoria o sqlite'),
+    'entradas': fields.Integer(description='Entradas guardadas'),
+    'bytes': fields.Integer(description='Tamaño aproximado de las entradas'),
+    'aciertos': fields.Integer(description='Consultas resueltas desde la caché'),
+    'fallos': fields.Integer(description='Consultas que tuvieron que ir a la base de datos'),
+    'expulsiones': fields.Integer(description='Entradas expulsadas por falta de espacio'),
+    'tasa_aciertos': fields.Float(description='Aciertos sobre el total de consultas')
+}
+
+# Modelo para las sugerencias de autocompletado
+sugerencia_model = {
+    'texto': fields.String(description='Texto sugerido (título o artista)'),
+    'tipo': fields.String(description='Tipo de sugerencia: titulo o artista'),
+    'artista': fields.String(description='Artista de la canción sugerida'),
+    'id_cancion': fields.Integer(description='Identificador de la canción (solo para títulos)'),
+    'favoritos': fields.Integer(description='Cantidad de favoritos usada para ordenar')
+}
@@ -0,0 +1,165 @@
+"""
+¡Aquí definimos la búsqueda de texto completo de Remington Song! 🔎
+Usamos una tabla virtual FTS5 de SQLite sobre titulo, artista, album y genero.
+Los triggers la mantienen sincronizada con la tabla cancion, y las búsquedas se
+resuelven con el índice invertido (ordenadas por relevancia) en lugar de
+recorrer la tabla completa con LIKE '%x%'.
+"""
+import re
+from flask import current_app
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+from .models import Cancion
+
+# Tabla virtual FTS5 con contenido externo: el texto vive en 'cancion' y el
+# índice solo guarda los tokens, así no duplicamos los datos.
+CREAR_TABLA_FTS = """
+CREATE VIRTUAL TABLE cancion_fts USING fts5(
+    titulo, artista, album, genero,
+    content='cancion', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+# Triggers que mantienen el índice al día en cada insert, update y delete
+TRIGGERS_FTS = {
+    'cancion_fts_ai': """
+CREATE TRIGGER IF NOT EXISTS cancion_fts_ai AFTER INSERT ON cancion BEGIN
+    INSERT INTO cancion_fts(rowid, titulo, artista, album, genero)
+    VALUES (new.id, new.titulo, new.artista, new.album, new.genero);
+END
+""",
+    'cancion_fts_ad': """
+CREATE TRIGGER IF NOT EXISTS cancion_fts_ad AFTER DELETE ON cancion BEGIN
+    INSERT INTO cancion_fts(cancion_fts, rowid, titulo, artista, album, genero)
+    VALUES ('delete', old.id, old.titulo, old.artista, old.album, old.genero);
+END
+""",
+    'cancion_fts_au': """
+CREATE TRIGGER IF NOT EXISTS cancion_fts_au AFTER UPDATE ON cancion BEGIN
+    INSERT INTO cancion_fts(cancion_fts, rowid, titulo, artista, album, genero)
+    VALUES ('delete', old.id, old.titulo, old.artista, old.album, old.genero);
+    INSERT INTO cancion_fts(rowid, titulo, artista, album, genero)
+    VALUES (new.id, new.titulo, new.artista, new.album, new.genero);
+END
+"""
+}
+
+# Reconstruye el índice completo a partir de la tabla cancion
+RECONSTRUIR_FTS = "INSERT INTO cancion_fts(cancion_fts) VALUES ('rebuild')"
+
+# Búsqueda ordenada por relevancia (bm25); el título pesa más que el resto.
+# Primero elegimos los mejores rowid dentro del índice y solo después leemos
+# esas pocas filas de cancion, en lugar de unir todas las coincidencias.
+CONSULTA_FTS = """
+SELECT cancion.* FROM (
+    SELECT rowid, bm25(cancion_fts, 10.0, 5.0, 2.0, 1.0) AS relevancia
+    FROM cancion_fts
+    WHERE cancion_fts MATCH :expresion
+    ORDER BY relevancia
+    LIMIT :limite
+) AS mejores
+JOIN cancion ON cancion.id = mejores.rowid
+ORDER BY mejores.relevancia
+"""
+
+def crear_indice_busqueda(conexion):
+    """
+    Crea la tabla FTS5 y sus triggers si todavía no existen.
+
+    Si la tabla se crea sobre un catálogo que ya tiene canciones, el índice se
+    reconstruye una vez para incluirlas.
+
+    Args:
+        conexion: Una conexión de SQLAlchemy a la base de datos SQLite.
+
+    Returns:
+        True si la búsqueda FTS5 quedó disponible, False si el motor no la soporta.
+    """
+    if conexion.dialect.name != 'sqlite':
+        return False
+    try:
+        if not inspect(conexion).has_table('cancion_fts'):
+            conexion.execute(text(CREAR_TABLA_FTS))
+            conexion.execute(text(RECONSTRUIR_FTS))
+        for sentencia in TRIGGERS_FTS.values():
+            conexion.execute(text(sentencia))
+    except OperationalError:
+        # SQLite compilado sin FTS5: seguimos con la búsqueda por LIKE
+        return False
+    return True
+
+def reconstruir_indice_busqueda(conexion):
+    """
+    Reconstruye el índice FTS5 desde cero (útil tras cargas masivas).
+    """
+    conexion.execute(text(RECONSTRUIR_FTS))
+
+def fts_disponible():
+    """
+    Indica si la aplicación actual tiene el índice FTS5 disponible.
+    """
+    return current_app.extensions.get('remington_song_fts', False)
+
+def _terminos(texto):
+    """
+    Convierte un texto en términos de prefijo para FTS5 ("rock"*).
+    """
+    return ' '.join(f'"{token}"*' for token in re.findall(r'\w+', texto))
+
+def expresion_fts(q='', titulo='', artista='', genero=''):
+    """
+    Construye la expresión MATCH de FTS5 a partir de los filtros de búsqueda.
+
+    Args:
+        q: Texto libre que se busca en todas las columnas.
+        titulo: Texto que debe aparecer en el título.
+        artista: Texto que debe aparecer en el artista.
+        genero: Texto que debe aparecer en el género.
+
+    Returns:
+        La expresión MATCH, o una cadena vacía si no hay términos.
+    """
+    partes = []
+    if q and _terminos(q):
+        partes.append(f'({_terminos(q)})')
+    for columna, valor in (('titulo', titulo), ('artista', artista), ('genero', genero)):
+        if valor and _terminos(valor):
+            partes.append(f'{columna} : ({_terminos(valor)})')
+    return ' AND '.join(partes)
+
+def buscar_canciones(q='', titulo='', artista='', genero='', limite=20):
+    """
+    Busca canciones usando el índice FTS5, o LIKE si el índice no está disponible.
+
+    Args:
+        q: Texto libre que se busca en todas las columnas.
+        titulo: Texto que debe aparecer en el título.
+        artista: Texto que debe aparecer en el artista.
+        genero: Texto que debe aparecer en el género.
+        limite: Cantidad máxima de resultados.
+
+    Returns:
+        Una lista de canciones, las más relevantes primero.
+    """
+    if fts_disponible():
+        expresion = expresion_fts(q, titulo, artista, genero)
+        if expresion:
+            return Cancion.query.from_statement(text(CONSULTA_FTS)).params(
+                expresion=expresion, limite=limite
+            ).all()
+
+    # Camino de respaldo (otros motores o SQLite sin FTS5)
+    query = Cancion.query
+    if q:
+        query = query.filter(
+            Cancion.titulo.contains(q) | Cancion.artista.contains(q) |
+            Cancion.album.contains(q) | Cancion.genero.contains(q)
+        )
+    if titulo:
+        query = query.filter(Cancion.titulo.contains(titulo))
+    if artista:
+        query = query.filter(Cancion.artista.contains(artista))
+    if genero:
+        query = query.filter(Cancion.genero.contains(genero))
+    return query.order_by(Cancion.id).limit(limite).all()
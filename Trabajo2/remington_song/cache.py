@@ -0,0 +1,269 @@
+"""
+¡Aquí definimos la caché de resultados de Remington Song! 🗃️
+Guardamos el resultado de las consultas más repetidas (búsquedas y canciones
+populares) para no ejecutarlas de nuevo en cada petición.
+
+La clave de cada entrada incluye los argumentos normalizados y la versión de
+las tablas de las que depende el resultado (ver condicional.py). Cualquier
+escritura incrementa esa versión en su misma transacción, así que las entradas
+afectadas dejan de usarse en cuanto se confirma el cambio, en este proceso y
+en cualquier otro que comparta la caché. Las entradas viejas se expulsan por
+LRU, por tamaño o por TTL.
+
+Los valores se guardan como JSON: leer la caché nunca ejecuta código.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app
+from .condicional import leer_versiones
+from utils import limpiar_texto
+
+# ----------------------------------------------------------------------------------------------------
+# Almacenes
+# ----------------------------------------------------------------------------------------------------
+def codificar(valor):
+    """Convierte un resultado a JSON (listas, diccionarios, textos y números)."""
+    return json.dumps(valor, ensure_ascii=False, separators=(',', ':'))
+
+def medir(valor):
+    """Bytes que ocupa un valor: su largo si ya son bytes (cuerpos comprimidos), si no su JSON."""
+    if isinstance(valor, (bytes, bytearray)):
+        return len(valor)
+    return len(codificar(valor))
+
+class CacheMemoria:
+    """
+    Caché LRU dentro del proceso, acotada por cantidad de entradas, bytes y TTL.
+    """
+    nombre = 'memoria'
+
+    def __init__(self, maximo_entradas=2048, maximo_bytes=32 * 1024 * 1024, ttl=300):
+        self.maximo_entradas = maximo_entradas
+        self.maximo_bytes = maximo_bytes
+        self.ttl = ttl
+        self.expulsiones = 0
+        self._entradas = OrderedDict()  # clave -> (expira, tamaño, valor)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        """Devuelve (encontrado, valor)."""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return False, None
+            if entrada[0] < time.monotonic():
+                self._quitar(clave)
+                return False, None
+            self._entradas.move_to_end(clave)
+            return True, entrada[2]
+
+    def guardar(self, clave, valor):
+        tamaño = medir(valor)
+        if tamaño > self.maximo_bytes:
+            return  # Un resultado enorme vaciaría la caché entera
+        with self._lock:
+            if clave in self._entradas:
+                self._quitar(clave)
+            self._entradas[clave] = (time.monotonic() + self.ttl, tamaño, valor)
+            self._bytes += tamaño
+            while len(self._entradas) > self.maximo_entradas or self._bytes > self.maximo_bytes:
+                self._quitar(next(iter(self._entradas)))
+                self.expulsiones += 1
+
+    def _quitar(self, clave):
+        _, tamaño, _ = self._entradas.pop(clave)
+        self._bytes -= tamaño
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estado(self):
+        with self._lock:
+            return {'entradas': len(self._entradas), 'bytes': self._bytes, 'expulsiones': self.expulsiones}
+
+class CacheSQLite:
+    """
+    Caché compartida por todos los procesos de la máquina, en un archivo SQLite.
+
+    Sirve cuando la API corre con varios workers: lo que calcula uno lo
+    aprovechan los demás. Se acota por cantidad de entradas (expulsando las
+    más antiguas) y por TTL.
+
+    El archivo se crea con permisos 0600 y tiene que pertenecer al usuario
+    del proceso: otro usuario de la máquina no puede leerlo ni plantar entradas.
+    """
+    nombre = 'sqlite'
+
+    def __init__(self, ruta, maximo_entradas=2048, ttl=300):
+        self.ruta = ruta
+        self._crear_archivo_privado(ruta)
+        self.maximo_entradas = maximo_entradas
+        self.ttl = ttl
+        self.expulsiones = 0
+        self._local = threading.local()  # Una conexión por hilo
+        with self._conexion() as conexion:
+            conexion.execute(
+                'CREATE TABLE IF NOT EXISTS resultado ('
+                'clave TEXT PRIMARY KEY, valor BLOB NOT NULL, expira REAL NOT NULL, guardado REAL NOT NULL)'
+            )
+            conexion.execute('CREATE INDEX IF NOT EXISTS ix_resultado_guardado ON resultado (guardado)')
+
+    @staticmethod
+    def _crear_archivo_privado(ruta):
+        # O_NOFOLLOW: no seguimos un enlace simbólico plantado en lugar del archivo
+        descriptor = os.open(ruta, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+        try:
+            if os.fstat(descriptor).st_uid != os.getuid():
+                raise PermissionError(f"El archivo de caché {ruta} pertenece a otro usuario")
+            os.fchmod(descriptor, 0o600)
+        finally:
+            os.close(descriptor)
+
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=5, check_same_thread=False)
+            conexion.execute('PRAGMA journal_mode = WAL')
+            conexion.execute('PRAGMA synchronous = OFF')  # Es una caché: perderla no es grave
+            self._local.conexion = conexion
+        return conexion
+
+    def obtener(self, clave):
+        conexion = self._conexion()
+        fila = conexion.execute('SELECT valor, expira FROM resultado WHERE clave = ?', (clave,)).fetchone()
+        if fila is None or fila[1] < time.time():
+            return False, None
+        return True, json.loads(fila[0])
+
+    def guardar(self, clave, valor):
+        ahora = time.time()
+        with self._conexion() as conexion:
+            conexion.execute(
+                'INSERT OR REPLACE INTO resultado (clave, valor, expira, guardado) VALUES (?, ?, ?, ?)',
+                (clave, codificar(valor), ahora + self.ttl, ahora)
+            )
+            conexion.execute('DELETE FROM resultado WHERE expira < ?', (ahora,))
+            sobrantes = conexion.execute(
+                'DELETE FROM resultado WHERE clave IN ('
+                'SELECT clave FROM resultado ORDER BY guardado DESC LIMIT -1 OFFSET ?)',
+                (self.maximo_entradas,)
+            ).rowcount
+            self.expulsiones += max(sobrantes, 0)
+
+    def limpiar(self):
+        with self._conexion() as conexion:
+            conexion.execute('DELETE FROM resultado')
+
+    def estado(self):
+        entradas, bytes_ = self._conexion().execute(
+            'SELECT COUNT(*), COALESCE(SUM(LENGTH(valor)), 0) FROM resultado'
+        ).fetchone()
+        return {'entradas': entradas, 'bytes': bytes_, 'expulsiones': self.expulsiones}
+
+# ----------------------------------------------------------------------------------------------------
+# Caché de resultados
+# ----------------------------------------------------------------------------------------------------
+class CacheResultados:
+    """
+    Envuelve un almacén y lleva la cuenta de aciertos y fallos.
+    """
+    def __init__(self, almacen):
+        self.almacen = almacen
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+    def obtener_o_calcular(self, clave, calcular):
+        encontrado, valor = self.almacen.obtener(clave)
+        with self._lock:
+            if encontrado:
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+        if not encontrado:
+            valor = calcular()
+            self.almacen.guardar(clave, valor)
+        return valor
+
+    def limpiar(self):
+        self.almacen.limpiar()
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return dict(
+            self.almacen.estado(),
+            almacen=self.almacen.nombre,
+            aciertos=self.aciertos,
+            fallos=self.fallos,
+            tasa_aciertos=round(self.aciertos / consultas, 4) if consultas else 0.0
+        )
+
+def registrar_cache(app):
+    """
+    Crea la caché de resultados según la configuración de la aplicación.
+
+    CACHE_RESULTADOS puede ser 'memoria', 'sqlite' o None para desactivarla.
+    Con 'sqlite' hay que indicar CACHE_RUTA_SQLITE (un directorio privado, no /tmp).
+
+    Raises:
+        ValueError: Si se pide la caché SQLite sin CACHE_RUTA_SQLITE.
+    """
+    tipo = app.config.get('CACHE_RESULTADOS', 'memoria')
+    maximo_entradas = app.config.get('CACHE_MAXIMO_ENTRADAS', 2048)
+    ttl = app.config.get('CACHE_TTL', 300)
+    if tipo == 'sqlite':
+        ruta = app.config.get('CACHE_RUTA_SQLITE')
+        if not ruta:
+            raise ValueError("CACHE_RESULTADOS = 'sqlite' requiere CACHE_RUTA_SQLITE")
+        almacen = CacheSQLite(ruta, maximo_entradas=maximo_entradas, ttl=ttl)
+    elif tipo == 'memoria':
+        almacen = CacheMemoria(
+            maximo_entradas=maximo_entradas,
+            maximo_bytes=app.config.get('CACHE_MAXIMO_BYTES', 32 * 1024 * 1024),
+            ttl=ttl
+        )
+    else:
+        app.extensions['remington_song_cache'] = None
+        return
+    app.extensions['remington_song_cache'] = CacheResultados(almacen)
+
+def obtener_cache():
+    """Devuelve la caché de resultados de la aplicación actual (o None si está desactivada)."""
+    return current_app.extensions.get('remington_song_cache')
+
+def normalizar_argumento(valor):
+    """Normaliza los textos (espacios y mayúsculas) para que compartan entrada."""
+    if isinstance(valor, str):
+        return limpiar_texto(valor).lower()
+    return valor
+
+def cacheado(espacio, *tablas):
+    """
+    Decorador que guarda el resultado de una función en la caché de resultados.
+
+    La función se llama siempre con argumentos por nombre, ya normalizados.
+
+    Args:
+        espacio: Nombre del grupo de entradas (por ejemplo, 'busqueda').
+        tablas: Las tablas de las que depende el resultado.
+    """
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(**argumentos):
+            argumentos = {nombre: normalizar_argumento(valor) for nombre, valor in argumentos.items()}
+            cache = obtener_cache()
+            if cache is None:
+                return funcion(**argumentos)
+            versiones = ','.join(f'{tabla}:{version}' for tabla, version, _ in sorted(leer_versiones(tablas)))
+            clave = f'{espacio}|{versiones}|{json.dumps(argumentos, sort_keys=True, ensure_ascii=False)}'
+            return cache.obtener_o_calcular(clave, lambda: funcion(**argumentos))
+        return envoltura
+    return decorador
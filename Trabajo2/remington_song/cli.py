@@ -0,0 +1,120 @@
+"""
+¡Aquí definimos los comandos de consola de Remington Song! 🖥️
+Se ejecutan con 'flask remington <comando>' y sirven para tareas de
+mantenimiento que no tiene sentido exponer por HTTP.
+"""
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from .extensions import db
+from .contadores import recontar_favoritos
+from .condicional import tocar_tablas
+from .ingesta import ingerir_canciones, leer_csv, leer_jsonl, modo_carga_rapida
+from .planes import verificar_planes
+from .replicas import sincronizar_replicas
+from .models import Usuario, Cancion, Favorito
+from .semillas import sembrar, completar_siembra
+
+# Grupo de comandos: flask remington ...
+remington_cli = AppGroup('remington', help='Comandos de mantenimiento de Remington Song.')
+
+@remington_cli.command('recontar-favoritos')
+def recontar_favoritos_comando():
+    """Recalcula el contador de favoritos de todas las canciones."""
+    with db.engine.begin() as conexion:
+        actualizadas = recontar_favoritos(conexion)
+        tocar_tablas(conexion, 'cancion', 'populares')
+    click.echo(f"❤️ Contadores de favoritos recalculados para {actualizadas} canciones")
+
+@remington_cli.command('import-catalog')
+@click.argument('archivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--formato', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='Formato del archivo (por defecto se deduce de la extensión).')
+@click.option('--lote', default=5000, show_default=True, help='Filas por cada executemany.')
+@click.option('--lotes-por-transaccion', default=20, show_default=True, help='Lotes por commit.')
+@click.option('--rapido/--seguro', default=True, show_default=True,
+              help='Usa el modo de carga rápida de SQLite (PRAGMAs relajados e índices diferidos).')
+def importar_catalogo_comando(archivo, formato, lote, lotes_por_transaccion, rapido):
+    """Importa canciones desde un archivo CSV o JSON Lines."""
+    if formato is None:
+        formato = 'csv' if archivo.lower().endswith('.csv') else 'jsonl'
+    lector = leer_csv if formato == 'csv' else leer_jsonl
+
+    click.echo(f"📥 Importando {archivo} ({formato}) en lotes de {lote}...")
+    with open(archivo, encoding='utf-8', newline='') as entrada:
+        if rapido:
+            with modo_carga_rapida():
+                reporte = ingerir_canciones(lector(entrada), lote, lotes_por_transaccion)
+        else:
+            reporte = ingerir_canciones(lector(entrada), lote, lotes_por_transaccion)
+
+    click.echo(
+        f"✅ {reporte['insertadas']} canciones insertadas, {reporte['rechazadas']} rechazadas "
+        f"en {reporte['segundos']} s ({reporte['filas_por_segundo']} filas/s)"
+    )
+    for error in reporte['errores']:
+        click.echo(f"   fila {error['fila'] + 1}: {'; '.join(error['errores'])}", err=True)
+    if reporte['errores_omitidos']:
+        click.echo(f"   ... y {reporte['errores_omitidos']} errores más", err=True)
+    if 'error_base_datos' in reporte:
+        raise click.ClickException(reporte['error_base_datos'])
+    if 'error_formato' in reporte:
+        raise click.ClickException(reporte['error_formato'])
+
+@remington_cli.command('verificar-planes')
+@click.option('--detalle', is_flag=True, help='Muestra el plan de todas las consultas, no solo las que fallan.')
+def verificar_planes_comando(detalle):
+    """Revisa con EXPLAIN QUERY PLAN que ninguna consulta recorra una tabla completa."""
+    resultados = verificar_planes()
+    fallidas = [resultado for resultado in resultados if resultado['recorrido']]
+    for resultado in resultados:
+        if not (detalle or resultado['recorrido']):
+            continue
+        marca = '❌' if resultado['recorrido'] else ('⚠️' if resultado['ordena_en_memoria'] else '✅')
+        click.echo(f"{marca} {resultado['ruta']}\n   {resultado['sql']}")
+        for paso in resultado['plan']:
+            click.echo(f"      {paso}")
+    click.echo(f"🔬 {len(resultados)} consultas analizadas, {len(fallidas)} con recorridos completos")
+    if fallidas:
+        raise click.ClickException("Hay consultas que recorren tablas completas")
+
+@remington_cli.command('sincronizar-replicas')
+def sincronizar_replicas_comando():
+    """Copia la base SQLite principal a las réplicas locales (REPLICAS_SINCRONIZAR)."""
+    if not sincronizar_replicas(current_app):
+        raise click.ClickException("La sincronización local de réplicas no está activa (REPLICAS_SINCRONIZAR)")
+    click.echo(f"📚 Réplicas sincronizadas: {', '.join(current_app.config['REPLICAS_LECTURA'])}")
+
+@remington_cli.command('seed')
+@click.option('--canciones', default=1_000_000, show_default=True, help='Canciones a generar.')
+@click.option('--usuarios', default=100_000, show_default=True, help='Usuarios a generar.')
+@click.option('--favoritos', default=25, show_default=True, help='Favoritos promedio por usuario.')
+@click.option('--zipf', default=1.1, show_default=True, help='Exponente de la distribución de popularidad.')
+@click.option('--semilla', default=42, show_default=True, help='Semilla del generador (mismos datos con la misma semilla).')
+@click.option('--contraseña', default='remington', show_default=True, help='Contraseña de todos los usuarios generados.')
+@click.option('--lote', default=10000, show_default=True, help='Filas por cada executemany.')
+@click.option('--lotes-por-transaccion', default=10, show_default=True, help='Lotes por commit.')
+@click.option('--rapido/--seguro', default=True, show_default=True,
+              help='Usa el modo de carga rápida de SQLite (PRAGMAs relajados e índices diferidos).')
+def sembrar_comando(canciones, usuarios, favoritos, zipf, semilla, contraseña, lote, lotes_por_transaccion, rapido):
+    """Genera canciones, usuarios y favoritos sintéticos para pruebas de carga."""
+    click.echo(f"🌱 Sembrando {canciones} canciones, {usuarios} usuarios y ~{favoritos} favoritos por usuario...")
+    argumentos = dict(canciones=canciones, usuarios=usuarios, favoritos_promedio=favoritos,
+                      exponente_zipf=zipf, semilla=semilla, contraseña=contraseña,
+                      metodo_hash=current_app.config.get('HASH_METODO'),
+                      tamaño_lote=lote, lotes_por_transaccion=lotes_por_transaccion)
+    inicio = time.perf_counter()
+    if rapido:
+        with modo_carga_rapida((Usuario, Cancion, Favorito)):
+            reporte = sembrar(**argumentos)
+    else:
+        reporte = sembrar(**argumentos)
+    completar_siembra(reporte['ids_canciones'])
+
+    for tabla in ('canciones', 'usuarios', 'favoritos'):
+        segundos = reporte[f'segundos_{tabla}']
+        ritmo = round(reporte[tabla] / segundos) if segundos else reporte[tabla]
+        click.echo(f"   {tabla}: {reporte[tabla]} filas en {segundos} s ({ritmo} filas/s)")
+    click.echo(f"✅ Listo en {time.perf_counter() - inicio:.2f} s, reconstrucción de índices incluida "
+               f"(contraseña de todos los usuarios: '{contraseña}')")
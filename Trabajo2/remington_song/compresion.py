@@ -0,0 +1,131 @@
+"""
+¡Aquí definimos la compresión de respuestas de Remington Song! 🗜️
+Negociamos gzip o brotli con la cabecera Accept-Encoding y comprimimos las
+respuestas de texto (JSON, NDJSON, CSV...) que superan un tamaño mínimo.
+
+- Las respuestas en streaming (exportaciones) se comprimen bloque a bloque,
+  sin esperar a tener el cuerpo completo.
+- Las respuestas con ETag se comprimen una sola vez: el resultado se guarda
+  por (ETag, codificación) y se reutiliza mientras el ETag no cambie.
+"""
+import gzip
+import zlib
+from flask import request
+from .cache import CacheMemoria
+
+try:
+    import brotli  # Opcional: si no está instalado solo ofrecemos gzip
+except ImportError:
+    brotli = None
+
+# Tipos de contenido que vale la pena comprimir
+TIPOS_COMPRIMIBLES = {
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'text/csv', 'text/html', 'text/plain', 'text/css'
+}
+
+def codificaciones_disponibles():
+    """Codificaciones que sabemos producir, en orden de preferencia."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def comprimir(datos, codificacion, nivel_gzip=6, nivel_brotli=5):
+    """Comprime un cuerpo completo con la codificación indicada."""
+    if codificacion == 'br':
+        return brotli.compress(datos, quality=nivel_brotli)
+    return gzip.compress(datos, compresslevel=nivel_gzip, mtime=0)
+
+def comprimir_flujo(bloques, codificacion, nivel_gzip=6, nivel_brotli=5):
+    """
+    Comprime un cuerpo en streaming.
+
+    Cada bloque se vacía al cliente apenas se comprime (flush), así el
+    streaming sigue entregando datos a medida que se generan.
+
+    Args:
+        bloques: Un iterable de bytes (el cuerpo original).
+        codificacion: 'gzip' o 'br'.
+
+    Yields:
+        Los bloques comprimidos.
+    """
+    if codificacion == 'br':
+        compresor = brotli.Compressor(quality=nivel_brotli)
+        comprimir_bloque, vaciar, terminar = compresor.process, compresor.flush, compresor.finish
+    else:
+        compresor = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # Formato gzip
+        comprimir_bloque = compresor.compress
+        vaciar = lambda: compresor.flush(zlib.Z_SYNC_FLUSH)
+        terminar = compresor.flush
+    try:
+        for bloque in bloques:
+            salida = comprimir_bloque(bloque) + vaciar()
+            if salida:
+                yield salida
+        yield terminar()
+    finally:
+        if hasattr(bloques, 'close'):
+            bloques.close()
+
+def _agregar_vary(respuesta):
+    vary = respuesta.vary
+    if 'accept-encoding' not in vary:
+        vary.add('Accept-Encoding')
+
+def registrar_compresion(app):
+    """
+    Registra la compresión de respuestas en la aplicación.
+
+    Se configura con COMPRESION_TAMAÑO_MINIMO, COMPRESION_NIVEL_GZIP,
+    COMPRESION_NIVEL_BROTLI y COMPRESION_CACHE_BYTES.
+    """
+    tamaño_minimo = app.config.get('COMPRESION_TAMAÑO_MINIMO', 1024)
+    niveles = {
+        'nivel_gzip': app.config.get('COMPRESION_NIVEL_GZIP', 6),
+        'nivel_brotli': app.config.get('COMPRESION_NIVEL_BROTLI', 5)
+    }
+    # Cuerpos ya comprimidos, por (ETag, codificación). El ETag cambia con los datos,
+    # así que una entrada nunca queda desactualizada; el TTL solo libera memoria.
+    comprimidos = CacheMemoria(
+        maximo_entradas=4096,
+        maximo_bytes=app.config.get('COMPRESION_CACHE_BYTES', 16 * 1024 * 1024),
+        ttl=3600
+    )
+    app.extensions['remington_song_compresion'] = comprimidos
+
+    @app.after_request
+    def comprimir_respuesta(respuesta):
+        if (respuesta.status_code != 200 or respuesta.direct_passthrough
+                or 'Content-Encoding' in respuesta.headers
+                or respuesta.mimetype not in TIPOS_COMPRIMIBLES):
+            return respuesta
+        _agregar_vary(respuesta)
+        if 'no-transform' in respuesta.headers.get('Cache-Control', ''):
+            return respuesta
+
+        codificacion = request.accept_encodings.best_match(codificaciones_disponibles())
+        if codificacion is None:
+            return respuesta
+
+        if respuesta.is_streamed:
+            respuesta.response = comprimir_flujo(respuesta.iter_encoded(), codificacion, **niveles)
+            respuesta.headers.pop('Content-Length', None)
+        else:
+            datos = respuesta.get_data()
+            if len(datos) < tamaño_minimo:
+                return respuesta
+            etag, debil = respuesta.get_etag()
+            if etag:
+                clave = (etag, codificacion)
+                encontrado, comprimido = comprimidos.obtener(clave)
+                if not encontrado:
+                    comprimido = comprimir(datos, codificacion, **niveles)
+                    comprimidos.guardar(clave, comprimido)
+                # El cuerpo comprimido no es idéntico byte a byte: el ETag pasa a ser débil,
+                # y If-None-Match (comparación débil) sigue funcionando con cualquier codificación.
+                respuesta.set_etag(etag, weak=True)
+            else:
+                comprimido = comprimir(datos, codificacion, **niveles)
+            respuesta.set_data(comprimido)
+
+        respuesta.headers['Content-Encoding'] = codificacion
+        return respuesta
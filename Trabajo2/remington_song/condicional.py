@@ -0,0 +1,216 @@
+"""
+¡Aquí definimos las peticiones condicionales (ETag / Last-Modified) de Remington Song! 🏷️
+Cada tabla tiene un contador de versión que se incrementa en la misma
+transacción que cualquier escritura. El ETag de una respuesta se calcula con
+esos contadores y la URL, así podemos responder 304 Not Modified sin ejecutar
+la consulta ni serializar nada.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from flask import Response, current_app, request
+from flask_jwt_extended import verify_jwt_in_request
+from flask_restx.utils import unpack
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session, object_session, scoped_session
+from werkzeug.http import http_date
+from .extensions import db
+from .models import Usuario, Cancion, Favorito, VersionTabla
+
+version_tabla = VersionTabla.__table__
+cancion = Cancion.__table__
+
+# Tablas cuyas versiones seguimos. Además de las tablas reales hay dos vistas de cancion:
+# - 'catalogo': las columnas de cancion salvo total_favoritos (un favorito no la cambia).
+# - 'populares': el ranking por total_favoritos (solo cambia si un favorito puede mover el top).
+TABLAS_VERSIONADAS = ('usuario', 'cancion', 'favorito', 'catalogo', 'populares')
+
+CLAVE_TABLAS = 'remington_song_tablas_modificadas'
+CLAVE_RANGOS = 'remington_song_rangos_versiones'
+
+def inicializar_versiones(conexion):
+    """
+    Crea la fila de versión de cada tabla si todavía no existe.
+    """
+    existentes = set(conexion.execute(select(version_tabla.c.tabla)).scalars())
+    faltantes = [tabla for tabla in TABLAS_VERSIONADAS if tabla not in existentes]
+    if faltantes:
+        ahora = datetime.utcnow()
+        conexion.execute(insert(version_tabla), [
+            {'tabla': tabla, 'version': 0, 'modificado': ahora} for tabla in faltantes
+        ])
+
+def tocar_tablas(conexion, *tablas):
+    """
+    Incrementa la versión de las tablas indicadas.
+
+    Las rutas que escriben con SQL directo (sin pasar por el ORM) deben
+    llamar a esta función antes del commit.
+
+    Args:
+        conexion: Una conexión o sesión de SQLAlchemy.
+        tablas: Los nombres de las tablas modificadas.
+    """
+    conexion.execute(
+        update(version_tabla)
+        .where(version_tabla.c.tabla.in_(tablas))
+        .values(version=version_tabla.c.version + 1, modificado=datetime.utcnow())
+    )
+    if isinstance(conexion, (Session, scoped_session)):
+        anotar_rangos(conexion, tablas)
+
+def anotar_rangos(session, tablas, conexion=None):
+    """
+    Guarda en session.info las versiones que produjo la transacción de la sesión.
+
+    La fila de versión queda bloqueada desde el primer incremento hasta el
+    commit, así que el rango (desde, hasta] de cada tabla es solo de esta
+    transacción. Los índices en memoria lo usan para distinguir sus propias
+    escrituras de las de otros procesos.
+    """
+    consulta = select(version_tabla.c.tabla, version_tabla.c.version).where(version_tabla.c.tabla.in_(tablas))
+    if conexion is None:
+        filas = session.execute(consulta, bind_arguments={'bind': db.engine})
+    else:
+        filas = conexion.execute(consulta)
+    rangos = session.info.setdefault(CLAVE_RANGOS, {})
+    for tabla, version in filas:
+        desde = rangos[tabla][0] if tabla in rangos else version - 1
+        rangos[tabla] = (desde, version)
+
+def _escuchar(modelo, *tablas):
+    """Anota las tablas afectadas cuando el ORM escribe una fila del modelo."""
+    def anotar(mapper, connection, target):
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault(CLAVE_TABLAS, set()).update(tablas)
+    for accion in ('insert', 'update', 'delete'):
+        event.listen(modelo, f'after_{accion}', anotar)
+
+_escuchar(Usuario, 'usuario')
+_escuchar(Cancion, 'cancion', 'catalogo', 'populares')
+# Un favorito también cambia el total_favoritos que mostramos en cada canción
+_escuchar(Favorito, 'favorito', 'cancion')
+
+# Último puesto de /canciones/populares por (puestos, versión, modificado) de 'populares'
+_umbral_populares = {}
+
+def puede_mover_populares(conexion, id_cancion):
+    """
+    Indica si un favorito de esta canción puede cambiar el ranking de populares.
+
+    Compara el contador de la canción (con un margen de uno, así da igual si ya
+    se ajustó) con el del último puesto que puede pedir /canciones/populares.
+    Ese último puesto solo cambia junto con la versión de 'populares', así que
+    se calcula una vez por versión; las demás llamadas leen dos filas por clave.
+    """
+    puestos = current_app.config.get('LIMITE_PAGINA_MAXIMO', 500)
+    total = select(cancion.c.total_favoritos).where(cancion.c.id == id_cancion).scalar_subquery()
+    total, version, modificado = conexion.execute(
+        select(total, version_tabla.c.version, version_tabla.c.modificado)
+        .where(version_tabla.c.tabla == 'populares')
+    ).one()
+    clave = (puestos, version, modificado)
+    if clave in _umbral_populares:
+        umbral = _umbral_populares[clave]
+    else:
+        umbral = conexion.execute(
+            select(cancion.c.total_favoritos)
+            .order_by(cancion.c.total_favoritos.desc())
+            .limit(1).offset(puestos - 1)
+        ).scalar()
+        _umbral_populares.clear()  # Solo nos interesa la versión actual
+        _umbral_populares[clave] = umbral
+    return umbral is None or (total or 0) + 1 >= umbral
+
+def _favorito_en_populares(mapper, connection, target):
+    session = object_session(target)
+    if session is not None and puede_mover_populares(connection, target.id_cancion):
+        session.info.setdefault(CLAVE_TABLAS, set()).add('populares')
+
+for _accion in ('insert', 'delete'):
+    event.listen(Favorito, f'after_{_accion}', _favorito_en_populares)
+
+@event.listens_for(Session, 'after_flush')
+def _incrementar_versiones(session, contexto):
+    tablas = session.info.pop(CLAVE_TABLAS, None)
+    if tablas:
+        conexion = session.connection()
+        tocar_tablas(conexion, *sorted(tablas))
+        anotar_rangos(session, tablas, conexion)
+
+def leer_versiones(tablas):
+    """Devuelve las filas (tabla, version, modificado) de las tablas indicadas."""
+    return db.session.execute(
+        select(version_tabla.c.tabla, version_tabla.c.version, version_tabla.c.modificado)
+        .where(version_tabla.c.tabla.in_(tablas))
+    ).all()
+
+def calcular_etag(versiones):
+    """
+    Calcula el ETag de la petición actual a partir de las versiones de las tablas.
+    """
+    huella = hashlib.sha1(request.full_path.encode('utf-8'))
+    for tabla, version, _ in sorted(versiones):
+        huella.update(f'|{tabla}:{version}'.encode('utf-8'))
+    return huella.hexdigest()[:32]
+
+def fecha_confiable(modificado):
+    """
+    Devuelve la fecha de modificación solo si ya no puede cambiar dentro de su segundo.
+
+    Las fechas HTTP tienen resolución de un segundo: si la última escritura
+    ocurrió en el segundo actual, otra escritura en ese mismo segundo tendría
+    el mismo Last-Modified. En ese caso solo vale el ETag.
+    """
+    if modificado is None:
+        return None
+    ahora = datetime.now(timezone.utc).replace(microsecond=0)
+    return modificado if modificado.replace(microsecond=0) < ahora else None
+
+def _no_modificado(etag, modificado):
+    """Evalúa If-None-Match y, si no viene, If-Modified-Since."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and modificado:
+        return modificado.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def condicional(*tablas, autenticado=False):
+    """
+    Decorador que agrega ETag / Last-Modified y responde 304 cuando corresponde.
+
+    Va por encima de marshal_with, así un 304 no ejecuta la consulta ni la serialización.
+
+    Args:
+        tablas: Las tablas de las que depende la respuesta.
+        autenticado: Si es True, se verifica el JWT antes de responder 304.
+    """
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if autenticado:
+                verify_jwt_in_request()
+
+            versiones = leer_versiones(tablas)
+            etag = calcular_etag(versiones)
+            fechas = [modificado for _, _, modificado in versiones if modificado]
+            modificado = fecha_confiable(max(fechas).replace(tzinfo=timezone.utc) if fechas else None)
+            cabeceras = {'ETag': f'"{etag}"'}
+            if modificado:
+                cabeceras['Last-Modified'] = http_date(modificado)
+
+            if _no_modificado(etag, modificado):
+                return Response(status=304, headers=cabeceras)
+
+            respuesta = funcion(*args, **kwargs)
+            if isinstance(respuesta, Response):
+                if respuesta.status_code == 200:
+                    respuesta.headers.extend(cabeceras)
+                return respuesta
+            datos, codigo, extra = unpack(respuesta)
+            if codigo == 200:
+                extra = dict(extra or {}, **cabeceras)
+            return datos, codigo, extra
+        return envoltura
+    return decorador
@@ -12,12 +12,54 @@ class Config:
     # Configuración de la base de datos
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///remington_song.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False  # Desactivamos el tracking de modificaciones
+    # create_all al arrancar; si no, el esquema es de las migraciones ('flask db upgrade')
+    CREAR_ESQUEMA = os.environ.get('REMINGTON_CREAR_ESQUEMA') == '1'
 
     # Configuración de seguridad
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'remington_song_clave_secreta_muy_segura'
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'remington_song_jwt_clave_secreta_muy_segura'  # Clave secreta para JWT
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)  # Tiempo de expiración del token
 
+    # Configuración del hash de contraseñas
+    HASH_METODO = os.environ.get('HASH_METODO') or 'scrypt:32768:8:1'  # Algoritmo y factor de trabajo (formato de werkzeug)
+    HASH_PROCESOS = int(os.environ.get('HASH_PROCESOS', 2))  # Procesos que calculan hashes (0 = en el hilo de la petición)
+    HASH_COLA_MAXIMA = 64  # Hashes en espera como máximo; si se supera respondemos 503
+    HASH_TIEMPO_MAXIMO = 10  # Segundos máximos de espera por un hash
+
+    # Configuración de la paginación por cursor
+    LIMITE_PAGINA_DEFECTO = 50  # Elementos por página si el cliente no indica 'limit'
+    LIMITE_PAGINA_MAXIMO = 500  # Tope de 'limit' para proteger la memoria de los workers
+    EXPORTACION_TAMAÑO_LOTE = 1000  # Filas por lote al exportar en streaming
+    LIMITE_BUSQUEDA_DEFECTO = 20  # Resultados por búsqueda si el cliente no indica 'limit'
+    LIMITE_SUGERENCIAS = 10  # Sugerencias de autocompletado por defecto
+    LIMITE_ESTADISTICAS_LOTE = 10000  # Usuarios por petición de estadísticas en lote
+    CARGA_TAMAÑO_LOTE = 1000  # Filas por executemany en la carga masiva
+    CARGA_LOTES_POR_TRANSACCION = 10  # Lotes por commit en la carga masiva
+    LIMITE_FAVORITOS_LOTE = 10000  # Canciones por petición de favoritos en lote
+    CONSULTA_TAMAÑO_LOTE = 500  # Ids por cláusula IN (por debajo del límite de variables de SQLite)
+
+    # Configuración de la caché de resultados (búsquedas y populares)
+    CACHE_RESULTADOS = 'memoria'  # 'memoria', 'sqlite' (compartida entre procesos) o None
+    CACHE_MAXIMO_ENTRADAS = 2048  # Entradas como máximo antes de expulsar por LRU
+    CACHE_MAXIMO_BYTES = 32 * 1024 * 1024  # Tamaño máximo de la caché en memoria
+    CACHE_TTL = 300  # Segundos que vive cada entrada
+    CACHE_RUTA_SQLITE = os.environ.get('CACHE_RUTA_SQLITE')  # Archivo de la caché compartida (obligatorio con 'sqlite')
+
+    # Configuración de la compresión de respuestas
+    COMPRESION_TAMAÑO_MINIMO = 1024  # Bytes; por debajo no vale la pena comprimir
+    COMPRESION_NIVEL_GZIP = 6  # 1 (rápido) a 9 (más pequeño)
+    COMPRESION_NIVEL_BROTLI = 5  # 0 (rápido) a 11 (más pequeño)
+    COMPRESION_CACHE_BYTES = 16 * 1024 * 1024  # Cuerpos comprimidos que guardamos por ETag
+
+    # Configuración del motor de base de datos
+    SQLITE_PRAGMAS = {}  # PRAGMAs que se aplican a cada conexión nueva (ver ProductionConfig)
+
+    # Configuración de las réplicas de lectura
+    REPLICAS_LECTURA = [uri for uri in os.environ.get('REPLICAS_LECTURA', '').split(',') if uri]  # URIs de las réplicas
+    VENTANA_LECTURA_PROPIA = 5  # Segundos que un cliente lee de la principal después de escribir
+    REPLICAS_SINCRONIZAR = False  # Copiar la base SQLite principal a las réplicas (solo para pruebas locales)
+    REPLICAS_INTERVALO_SINCRONIZACION = 0.5  # Segundos que se agrupan las escrituras antes de copiar
+
     # Configuración adicional
     DEBUG = False  # Modo debug desactivado por defecto
 
@@ -33,4 +75,36 @@ class TestingConfig(Config):
     Configuración para el entorno de pruebas de Remington Song.
     """
     TESTING = True  # Activamos el modo de pruebas
-    SQLALCHEMY_DATABASE_URI = 'sqlite://
\ No newline at end of file
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'  # Base de datos en memoria para las pruebas
+    CREAR_ESQUEMA = True  # La base en memoria nace vacía en cada prueba
+    HASH_METODO = 'pbkdf2:sha256:1000'  # Hash barato: las pruebas no necesitan un factor de trabajo real
+    HASH_PROCESOS = 0  # Sin pool de procesos en las pruebas
+
+class ProductionConfig(Config):
+    """
+    Configuración para el entorno de producción de Remington Song.
+    Ajusta SQLite para muchas peticiones concurrentes (ver benchmarks/bench_sqlite.py).
+    """
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',  # Lectores y escritor no se bloquean entre sí
+        'synchronous': 'NORMAL',  # Seguro con WAL; sin fsync en cada commit
+        'mmap_size': 256 * 1024 * 1024,  # Leemos la base mapeada en memoria (256 MB)
+        'cache_size': -64 * 1024,  # 64 MB de caché de páginas por conexión (negativo = KB)
+        'busy_timeout': 5000,  # Milisegundos de espera si otro escritor tiene el bloqueo
+        'temp_store': 'MEMORY'  # Ordenamientos temporales en memoria
+    }
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 10,  # Conexiones abiertas que se reutilizan entre peticiones
+        'max_overflow': 10,  # Conexiones extra en los picos
+        'pool_timeout': 10,  # Segundos de espera por una conexión libre
+        'pool_pre_ping': True,  # Descartamos conexiones rotas antes de usarlas
+        'pool_recycle': 3600  # Renovamos las conexiones cada hora
+    }
+
+# Configuraciones por nombre (variable de entorno REMINGTON_ENTORNO)
+configuraciones = {
+    'desarrollo': DevelopmentConfig,
+    'pruebas': TestingConfig,
+    'produccion': ProductionConfig,
+    'defecto': Config
+}
@@ -0,0 +1,70 @@
+"""
+¡Aquí mantenemos los contadores de favoritos de Remington Song! ❤️
+Cada canción guarda cuántas veces fue marcada como favorita, así el top de
+populares es una lectura por índice en lugar de un GROUP BY sobre toda la
+tabla favorito. El contador se ajusta en la misma transacción que el favorito
+(create_app registra los eventos con registrar_contadores()).
+"""
+from flask import current_app
+from sqlalchemy import event, func, select, update
+from .models import Cancion, Favorito
+
+cancion = Cancion.__table__
+favorito = Favorito.__table__
+
+def ajustar_contador(conexion, id_cancion, delta):
+    """
+    Suma delta al contador de favoritos de una canción de forma atómica.
+
+    Usamos 'total_favoritos = total_favoritos + delta' en SQL para que dos
+    peticiones concurrentes no se pisen el valor.
+    """
+    conexion.execute(
+        update(cancion)
+        .where(cancion.c.id == id_cancion)
+        .values(total_favoritos=cancion.c.total_favoritos + delta)
+    )
+
+def recontar_favoritos(conexion, ids=None):
+    """
+    Recalcula los contadores a partir de la tabla favorito.
+
+    Args:
+        conexion: Una conexión o sesión de SQLAlchemy.
+        ids: Los ids de canciones a recalcular (None recalcula todas).
+
+    Returns:
+        La cantidad de canciones actualizadas.
+    """
+    conteo = (
+        select(func.count(favorito.c.id))
+        .where(favorito.c.id_cancion == cancion.c.id)
+        .scalar_subquery()
+    )
+    sentencia = update(cancion).values(total_favoritos=conteo)
+    if ids is None:
+        return conexion.execute(sentencia).rowcount
+    # Por trozos, para no pasar el límite de variables de SQLite en el IN
+    ids = list(ids)
+    tamaño_lote = current_app.config.get('CONSULTA_TAMAÑO_LOTE', 500)
+    return sum(
+        conexion.execute(sentencia.where(cancion.c.id.in_(ids[inicio:inicio + tamaño_lote]))).rowcount
+        for inicio in range(0, len(ids), tamaño_lote)
+    )
+
+def _favorito_agregado(mapper, connection, target):
+    ajustar_contador(connection, target.id_cancion, 1)
+
+def _favorito_eliminado(mapper, connection, target):
+    ajustar_contador(connection, target.id_cancion, -1)
+
+def registrar_contadores():
+    """
+    Registra los eventos del ORM que ajustan el contador en cada favorito.
+
+    Los eventos son del modelo (valen para todo el proceso), así que si se
+    crean varias aplicaciones no se registran dos veces.
+    """
+    for accion, ajustar in (('after_insert', _favorito_agregado), ('after_delete', _favorito_eliminado)):
+        if not event.contains(Favorito, accion, ajustar):
+            event.listen(Favorito, accion, ajustar)
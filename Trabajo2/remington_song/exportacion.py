@@ -0,0 +1,95 @@
+"""
+¡Aquí definimos la exportación en streaming de Remington Song! 📤
+Recorremos las tablas por lotes con un cursor del lado del servidor y enviamos
+cada lote apenas está listo, sin armar la tabla completa en memoria.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from flask import Response, current_app, stream_with_context
+from sqlalchemy import select
+from .extensions import db
+
+# Formatos soportados y su tipo de contenido
+FORMATOS_EXPORTACION = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+def _valor_serializable(valor):
+    """Convierte las fechas a texto ISO 8601; el resto se deja igual."""
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+def iterar_lotes(tabla, tamaño_lote):
+    """
+    Recorre una tabla ordenada por id, entregando listas de filas.
+
+    Args:
+        tabla: La tabla de SQLAlchemy a recorrer.
+        tamaño_lote: Cantidad de filas que se piden a la base de datos por lote.
+
+    Yields:
+        Listas de filas (Row) de a lo sumo tamaño_lote elementos.
+    """
+    consulta = select(tabla).order_by(tabla.c.id).execution_options(
+        yield_per=tamaño_lote,
+        stream_results=True  # Cursor del lado del servidor cuando el motor lo soporta
+    )
+    resultado = db.session.execute(consulta)
+    try:
+        for lote in resultado.partitions():
+            yield lote
+    finally:
+        resultado.close()
+
+def generar_ndjson(tabla, tamaño_lote):
+    """
+    Genera el contenido NDJSON (un objeto JSON por línea) de una tabla.
+    """
+    columnas = [columna.name for columna in tabla.columns]
+    for lote in iterar_lotes(tabla, tamaño_lote):
+        yield ''.join(
+            json.dumps(
+                {nombre: _valor_serializable(valor) for nombre, valor in zip(columnas, fila)},
+                ensure_ascii=False
+            ) + '\n'
+            for fila in lote
+        )
+
+def generar_csv(tabla, tamaño_lote):
+    """
+    Genera el contenido CSV de una tabla, empezando por la fila de encabezados.
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow([columna.name for columna in tabla.columns])
+    for lote in iterar_lotes(tabla, tamaño_lote):
+        escritor.writerows([_valor_serializable(valor) for valor in fila] for fila in lote)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def respuesta_exportacion(tabla, formato, nombre_archivo):
+    """
+    Crea una respuesta HTTP en streaming con el contenido de una tabla.
+
+    Args:
+        tabla: La tabla de SQLAlchemy a exportar.
+        formato: 'ndjson' o 'csv'.
+        nombre_archivo: Nombre base del archivo sugerido al cliente.
+
+    Returns:
+        Un objeto Response cuyo cuerpo es un generador.
+    """
+    tamaño_lote = current_app.config.get('EXPORTACION_TAMAÑO_LOTE', 1000)
+    generador = generar_csv if formato == 'csv' else generar_ndjson
+    return Response(
+        stream_with_context(generador(tabla, tamaño_lote)),
+        mimetype=FORMATOS_EXPORTACION[formato],
+        headers={'Content-Disposition': f'attachment; filename={nombre_archivo}.{formato}'}
+    )
@@ -5,8 +5,9 @@ Esto nos permite mantener el código más limpio y organizado.
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from .replicas import SesionEnrutada
 
 # Creamos las instancias de las extensiones
-db = SQLAlchemy()  # Para interactuar con la base de datos
+db = SQLAlchemy(session_options={'class_': SesionEnrutada})  # Para interactuar con la base de datos (y sus réplicas)
 migrate = Migrate()  # Para gestionar las migraciones de la base de datos
 jwt = JWTManager()  # Para la autenticación con JWT
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+¡Aquí definimos las operaciones en lote sobre favoritos de Remington Song! ⭐
+Permiten sincronizar la biblioteca completa de un usuario en una sola
+petición: una consulta IN para validar, un insert que ignora duplicados, un
+delete y un recálculo de contadores, todo dentro de la misma transacción.
+"""
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from .extensions import db
+from .models import Cancion, Favorito
+from .contadores import recontar_favoritos
+from .indices import registrar_cambio
+from .condicional import tocar_tablas
+
+favorito = Favorito.__table__
+
+def en_lotes(ids):
+    """Parte una lista de ids en trozos de CONSULTA_TAMAÑO_LOTE (límite de variables de SQLite)."""
+    tamaño_lote = current_app.config.get('CONSULTA_TAMAÑO_LOTE', 500)
+    for inicio in range(0, len(ids), tamaño_lote):
+        yield ids[inicio:inicio + tamaño_lote]
+
+def insertar_ignorando_conflictos(tabla, filas):
+    """
+    Inserta filas ignorando las que violan una restricción única.
+
+    Args:
+        tabla: La tabla de SQLAlchemy.
+        filas: Lista de diccionarios con los valores.
+    """
+    dialecto = db.session.get_bind().dialect.name
+    if dialecto == 'sqlite':
+        sentencia = sqlite.insert(tabla).on_conflict_do_nothing()
+    elif dialecto == 'postgresql':
+        sentencia = postgresql.insert(tabla).on_conflict_do_nothing()
+    else:
+        sentencia = insert(tabla).prefix_with('IGNORE')  # MySQL / MariaDB
+    db.session.execute(sentencia, filas)
+
+def aplicar_lote_favoritos(id_usuario, agregar, eliminar):
+    """
+    Agrega y elimina varios favoritos de un usuario en una sola transacción.
+
+    Args:
+        id_usuario: El usuario (debe existir).
+        agregar: Ids de canciones a marcar como favoritas.
+        eliminar: Ids de canciones a desmarcar.
+
+    Returns:
+        Un diccionario con el resultado de la operación.
+    """
+    agregar = list(dict.fromkeys(agregar))
+    eliminar = list(dict.fromkeys(eliminar))
+    solicitadas = agregar + eliminar
+
+    # Una consulta por trozo para saber qué canciones existen y otra para saber cuáles ya son favoritas
+    existentes, ya_favoritas = set(), set()
+    for lote in en_lotes(agregar):
+        existentes.update(db.session.scalars(select(Cancion.id).where(Cancion.id.in_(lote))))
+    for lote in en_lotes(solicitadas):
+        ya_favoritas.update(db.session.scalars(
+            select(favorito.c.id_cancion).where(
+                favorito.c.id_usuario == id_usuario,
+                favorito.c.id_cancion.in_(lote)
+            )
+        ))
+
+    nuevas = [id for id in agregar if id in existentes and id not in ya_favoritas]
+    quitadas = [id for id in eliminar if id in ya_favoritas]
+
+    if nuevas:
+        ahora = datetime.utcnow()
+        insertar_ignorando_conflictos(favorito, [
+            {'id_usuario': id_usuario, 'id_cancion': id, 'fecha_marcado': ahora}
+            for id in nuevas
+        ])
+    for lote in en_lotes(quitadas):
+        db.session.execute(delete(favorito).where(
+            favorito.c.id_usuario == id_usuario,
+            favorito.c.id_cancion.in_(lote)
+        ))
+    if nuevas or quitadas:
+        # Recalculamos solo las canciones tocadas: exacto aunque haya carreras con otras peticiones
+        recontar_favoritos(db.session, nuevas + quitadas)
+        tocar_tablas(db.session, 'favorito', 'cancion', 'populares')
+
+    # Estas escrituras no pasan por el ORM, así que avisamos a los índices en memoria
+    for id in nuevas:
+        registrar_cambio(db.session, 'favorito', 'insert', {'id_usuario': id_usuario, 'id_cancion': id})
+    for id in quitadas:
+        registrar_cambio(db.session, 'favorito', 'delete', {'id_usuario': id_usuario, 'id_cancion': id})
+    db.session.commit()
+
+    return {
+        'agregados': len(nuevas),
+        'eliminados': len(quitadas),
+        'ya_existian': [id for id in agregar if id in ya_favoritas],
+        'no_encontradas': [id for id in agregar if id not in existentes],
+        'no_eran_favoritas': [id for id in eliminar if id not in ya_favoritas]
+    }
@@ -0,0 +1,588 @@
+"""
+¡Aquí definimos los índices en memoria de Remington Song! 🧠
+Son estructuras que viven dentro de cada proceso y responden consultas sin
+tocar la base de datos. Se construyen una sola vez a partir de la tabla y
+luego se mantienen al día con los cambios que confirma cada sesión.
+
+Cada índice recuerda la versión de su tabla (ver condicional.py) que refleja.
+Antes de responder la compara con la de la base: si otro proceso (otro worker,
+la CLI) escribió algo que este no vio, el índice se reconstruye.
+"""
+import heapq
+import math
+import threading
+import unicodedata
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+from .extensions import db
+from .models import Cancion, Favorito, VersionTabla
+from .condicional import CLAVE_RANGOS
+from utils import limpiar_texto
+
+version_tabla = VersionTabla.__table__
+
+# ----------------------------------------------------------------------------------------------------
+# Registro de cambios confirmados
+# ----------------------------------------------------------------------------------------------------
+# Los eventos de SQLAlchemy anotan cada cambio en session.info y solo se aplican
+# a los índices cuando la transacción se confirma (un rollback los descarta).
+
+CLAVE_CAMBIOS = 'remington_song_cambios'
+
+def registrar_cambio(session, tabla, accion, datos):
+    """
+    Anota un cambio pendiente para aplicarlo a los índices tras el commit.
+
+    Las rutas que escriben con SQL directo (sin pasar por el ORM) deben
+    llamar a esta función para que los índices se enteren del cambio.
+
+    Args:
+        session: La sesión de SQLAlchemy que hará el commit.
+        tabla: 'cancion' o 'favorito'.
+        accion: 'insert', 'update' o 'delete'.
+        datos: Diccionario con las columnas relevantes de la fila.
+    """
+    session.info.setdefault(CLAVE_CAMBIOS, []).append((tabla, accion, datos))
+
+def _datos_cancion(cancion):
+    return {'id': cancion.id, 'titulo': cancion.titulo, 'artista': cancion.artista}
+
+def _datos_favorito(favorito):
+    return {'id': favorito.id, 'id_usuario': favorito.id_usuario, 'id_cancion': favorito.id_cancion}
+
+def _escuchar(modelo, tabla, extraer):
+    """Registra los eventos de insert, update y delete de un modelo."""
+    for accion in ('insert', 'update', 'delete'):
+        def anotar(mapper, connection, target, accion=accion):
+            session = object_session(target)
+            if session is not None:
+                registrar_cambio(session, tabla, accion, extraer(target))
+        event.listen(modelo, f'after_{accion}', anotar)
+
+_escuchar(Cancion, 'cancion', _datos_cancion)
+_escuchar(Favorito, 'favorito', _datos_favorito)
+
+def _indices_registrados():
+    return current_app.extensions.get('remington_song_indices', {}).values()
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _reservar_tras_flush(session, contexto):
+    _reservar_versiones(session)
+
+@event.listens_for(Session, 'before_commit')
+def _reservar_versiones(session):
+    # Avisamos antes del commit qué versiones son nuestras, así una consulta de
+    # otro hilo que ya las vea en la base no confunde esta escritura con una ajena
+    rangos = session.info.get(CLAVE_RANGOS)
+    if rangos:
+        for indice in _indices_registrados():
+            indice.reservar(id(session), rangos)
+
+@event.listens_for(Session, 'after_commit')
+def _aplicar_cambios(session):
+    cambios = session.info.pop(CLAVE_CAMBIOS, None) or []
+    rangos = session.info.pop(CLAVE_RANGOS, None) or {}
+    if cambios or rangos:
+        for indice in _indices_registrados():
+            indice.aplicar(cambios, rangos, id(session))
+
+@event.listens_for(Session, 'after_transaction_end')
+def _descartar_cambios(session, transaccion):
+    if transaccion.parent is not None:
+        return  # Un savepoint: la transacción principal sigue abierta
+    session.info.pop(CLAVE_CAMBIOS, None)
+    if session.info.pop(CLAVE_RANGOS, None):
+        for indice in _indices_registrados():
+            indice.liberar(id(session))
+
+def invalidar_indices():
+    """
+    Marca todos los índices para reconstruirse en su próximo uso.
+
+    Se usa después de cargas masivas, donde es más barato reconstruir que
+    aplicar los cambios fila por fila.
+    """
+    for indice in _indices_registrados():
+        indice.invalidar()
+
+def obtener_indice(nombre):
+    """
+    Devuelve el índice registrado con ese nombre.
+
+    Sus consultas lo cargan (o lo reconstruyen si quedó viejo) antes de responder.
+    """
+    return current_app.extensions['remington_song_indices'][nombre]
+
+# ----------------------------------------------------------------------------------------------------
+# Base común de los índices
+# ----------------------------------------------------------------------------------------------------
+class IndiceEnMemoria(ABC):
+    """
+    Base de los índices en memoria: carga perezosa, invalidación y aplicación
+    de cambios protegidas por un lock.
+
+    La versión de TABLA_VERSION que refleja el índice avanza con los rangos de
+    las transacciones de este proceso (ver condicional.anotar_rangos). Si en la
+    base hay versiones que no cubre ningún rango propio, las escribió otro
+    proceso y el índice se reconstruye.
+
+    Las subclases definen TABLA_VERSION e implementan _limpiar, _construir y _aplicar.
+    """
+    TABLA_VERSION = 'cancion'
+    INTENTOS_CONSTRUCCION = 3  # Si la tabla cambia mientras se lee, se vuelve a leer
+
+    def __init__(self, tamaño_lote=5000):
+        self._lock = threading.RLock()
+        self._tamaño_lote = tamaño_lote
+        self._cargado = False
+        self._version = None  # Versión de TABLA_VERSION que refleja el contenido
+        self._aplicados = []  # Rangos propios ya aplicados que todavía no empalman con _version
+        self._reservas = {}  # Sesión -> rango de una transacción propia aún sin confirmar
+        self._limpiar()
+
+    def asegurar_cargado(self):
+        """
+        Construye el índice si todavía no se hizo, o lo reconstruye si otro
+        proceso cambió la tabla (una lectura de una fila por llamada).
+        """
+        if self._cargado:
+            version = self._leer_version()
+            with self._lock:
+                if self._cargado and self._cubre(version):
+                    return
+                self._cargado = False
+        with self._lock:
+            if not self._cargado:
+                self._reconstruir()
+
+    def _reconstruir(self):
+        for _ in range(self.INTENTOS_CONSTRUCCION):
+            antes = self._leer_version()
+            self._limpiar()
+            self._construir()
+            if self._leer_version() == antes:
+                break  # Nadie escribió mientras leíamos: el contenido es exactamente 'antes'
+        # Si siempre hubo escrituras, nos quedamos con la versión de antes: lo
+        # que falte se detecta como ajeno y se reconstruye en la próxima consulta
+        self._version = antes
+        self._aplicados = []
+        self._cargado = True
+
+    def _leer_version(self):
+        return db.session.execute(
+            select(version_tabla.c.version).where(version_tabla.c.tabla == self.TABLA_VERSION),
+            bind_arguments={'bind': db.engine}
+        ).scalar()
+
+    def _cubre(self, version):
+        """Indica si todas las versiones hasta 'version' son propias y conocidas."""
+        actual = self._version
+        if version is None or actual is None or version < actual:
+            return version == actual  # Base recreada o sin fila de versión
+        rangos = sorted(self._aplicados + list(self._reservas.values()))
+        for desde, hasta in rangos:
+            if desde > actual:
+                break  # Hay un hueco: alguna escritura ajena
+            actual = max(actual, hasta)
+        return actual >= version
+
+    def invalidar(self):
+        """Descarta el contenido para reconstruirlo en el próximo uso."""
+        with self._lock:
+            self._limpiar()
+            self._cargado = False
+
+    def reservar(self, sesion, rangos):
+        """Anota el rango de versiones de una transacción propia que está por confirmarse."""
+        rango = rangos.get(self.TABLA_VERSION)
+        if rango is not None:
+            with self._lock:
+                self._reservas[sesion] = rango
+
+    def liberar(self, sesion):
+        """Olvida la reserva de una transacción que no se confirmó."""
+        with self._lock:
+            self._reservas.pop(sesion, None)
+
+    def aplicar(self, cambios, rangos=None, sesion=None):
+        """
+        Aplica una lista de cambios confirmados (tabla, accion, datos).
+
+        Args:
+            cambios: Los cambios de la transacción.
+            rangos: Las versiones que produjo la transacción, por tabla.
+            sesion: La sesión que hizo el commit (para soltar su reserva).
+        """
+        rango = (rangos or {}).get(self.TABLA_VERSION)
+        with self._lock:
+            self._reservas.pop(sesion, None)
+            if not self._cargado:
+                return  # Se leerán de la base de datos al construir el índice
+            if rango is not None and rango[1] <= self._version:
+                return  # La construcción ya leyó estos cambios
+            if cambios:
+                self._aplicar(cambios)
+            if rango is not None:
+                self._aplicados.append(rango)
+                self._avanzar()
+
+    def _avanzar(self):
+        """Mueve _version sobre los rangos aplicados que empalman con ella."""
+        avanzo = True
+        while avanzo:
+            avanzo = False
+            for rango in list(self._aplicados):
+                if rango[0] <= self._version:
+                    self._version = max(self._version, rango[1])
+                    self._aplicados.remove(rango)
+                    avanzo = True
+
+    def _leer(self, *columnas):
+        """Recorre la tabla por lotes devolviendo las columnas pedidas."""
+        consulta = select(*columnas).execution_options(yield_per=self._tamaño_lote)
+        # Siempre desde la base principal: los cambios que ya se aplicaron al índice
+        # podrían no haber llegado todavía a una réplica de lectura.
+        return db.session.execute(consulta, bind_arguments={'bind': db.engine})
+
+    @abstractmethod
+    def _limpiar(self):
+        """Deja el índice vacío."""
+
+    @abstractmethod
+    def _construir(self):
+        """Llena el índice leyendo la tabla con _leer()."""
+
+    @abstractmethod
+    def _aplicar(self, cambios):
+        """Aplica cambios confirmados (tabla, accion, datos) al contenido."""
+
+# ----------------------------------------------------------------------------------------------------
+# Índice de trigramas para la búsqueda tolerante a errores
+# ----------------------------------------------------------------------------------------------------
+def normalizar(texto):
+    """
+    Normaliza un texto para compararlo: limpia espacios, pasa a minúsculas,
+    quita tildes y descarta los signos de puntuación.
+    """
+    texto = limpiar_texto(texto).lower()
+    texto = unicodedata.normalize('NFKD', texto)
+    return ''.join(
+        caracter if caracter.isalnum() else ' '
+        for caracter in texto
+        if not unicodedata.combining(caracter)
+    )
+
+def trigramas(texto):
+    """
+    Calcula el conjunto de trigramas de un texto normalizado.
+
+    Cada palabra se rellena con dos espacios al inicio y uno al final (como
+    pg_trgm), así los inicios de palabra pesan más que los finales.
+    """
+    resultado = set()
+    for palabra in normalizar(texto).split():
+        relleno = f'  {palabra} '
+        resultado.update(relleno[i:i + 3] for i in range(len(relleno) - 2))
+    return resultado
+
+class IndiceTrigramas(IndiceEnMemoria):
+    """
+    Índice invertido de trigramas sobre el título y el artista de las canciones.
+
+    Cada campo se guarda como un documento con clave id * 2 + campo. Las listas
+    de ocurrencias son arrays compactos de enteros; las entradas obsoletas que
+    dejan las actualizaciones se ignoran al consultar y se compactan de vez en
+    cuando.
+    """
+    CAMPOS = ('titulo', 'artista')
+    TABLA_VERSION = 'catalogo'  # Solo mira títulos y artistas: los favoritos no lo cambian
+
+    def _limpiar(self):
+        self._codigos = {}  # trigrama -> código entero
+        self._ocurrencias = []  # código -> array de claves de documento
+        self._documentos = {}  # clave de documento -> array de códigos
+        self._obsoletas = 0
+
+    # -- Carga y mantenimiento ---------------------------------------------------------------------
+    def _construir(self):
+        for id, titulo, artista in self._leer(Cancion.id, Cancion.titulo, Cancion.artista):
+            self._agregar(id, titulo, artista)
+
+    def _aplicar(self, cambios):
+        for tabla, accion, datos in cambios:
+            if tabla != 'cancion':
+                continue
+            if accion == 'delete':
+                self._eliminar(datos['id'])
+            else:
+                self._agregar(datos['id'], datos['titulo'], datos['artista'])
+        if self._obsoletas > len(self._documentos) * 4:
+            self._compactar()
+
+    def _codigo(self, trigrama):
+        codigo = self._codigos.get(trigrama)
+        if codigo is None:
+            codigo = self._codigos[trigrama] = len(self._ocurrencias)
+            self._ocurrencias.append(array('I'))
+        return codigo
+
+    def _agregar(self, id, titulo, artista):
+        self._eliminar(id)
+        for campo, texto in enumerate((titulo, artista)):
+            codigos = array('I', sorted(self._codigo(t) for t in trigramas(texto)))
+            if not codigos:
+                continue
+            clave = id * 2 + campo
+            self._documentos[clave] = codigos
+            for codigo in codigos:
+                self._ocurrencias[codigo].append(clave)
+
+    def _eliminar(self, id):
+        for campo in range(len(self.CAMPOS)):
+            codigos = self._documentos.pop(id * 2 + campo, None)
+            if codigos is not None:
+                self._obsoletas += len(codigos)
+
+    def _compactar(self):
+        ocurrencias = [array('I') for _ in self._ocurrencias]
+        for clave, codigos in self._documentos.items():
+            for codigo in codigos:
+                ocurrencias[codigo].append(clave)
+        self._ocurrencias = ocurrencias
+        self._obsoletas = 0
+
+    # -- Consultas ---------------------------------------------------------------------------------
+    def buscar(self, texto, campos=CAMPOS, limite=20, umbral=0.5):
+        """
+        Busca las canciones más parecidas a un texto, aunque tenga errores de tipeo.
+
+        Solo se revisan los documentos que comparten alguno de los trigramas más
+        raros de la consulta: si un documento no comparte ninguno de ellos, es
+        imposible que alcance el umbral (filtrado por prefijo).
+
+        Args:
+            texto: El texto buscado (por ejemplo, "metalica").
+            campos: Los campos en los que se busca ('titulo' y/o 'artista').
+            limite: Cantidad máxima de resultados.
+            umbral: Fracción mínima de trigramas de la consulta que deben coincidir.
+
+        Returns:
+            Una lista de tuplas (id_cancion, similitud), de mayor a menor similitud.
+        """
+        self.asegurar_cargado()
+        consulta = trigramas(texto)
+        permitidos = {self.CAMPOS.index(campo) for campo in campos}
+        with self._lock:
+            codigos = sorted(
+                (self._codigos[t] for t in consulta if t in self._codigos),
+                key=lambda codigo: len(self._ocurrencias[codigo])
+            )
+            necesarios = max(1, math.ceil(umbral * len(consulta)))
+            if len(codigos) < necesarios:
+                return []
+
+            candidatos = set()
+            for codigo in codigos[:len(codigos) - necesarios + 1]:
+                candidatos.update(self._ocurrencias[codigo])
+
+            codigos_consulta = set(codigos)
+            mejores = {}
+            for clave in candidatos:
+                if clave % 2 not in permitidos:
+                    continue
+                documento = self._documentos.get(clave)
+                if documento is None:
+                    continue  # Entrada obsoleta de una canción actualizada o eliminada
+                comunes = len(codigos_consulta.intersection(documento))
+                if comunes < necesarios:
+                    continue
+                # Combinamos cuánto de la consulta aparece (recall) con el parecido global (Jaccard)
+                similitud = 0.7 * comunes / len(consulta) + \
+                    0.3 * comunes / (len(consulta) + len(documento) - comunes)
+                id = clave // 2
+                if similitud > mejores.get(id, 0):
+                    mejores[id] = similitud
+
+        return sorted(mejores.items(), key=lambda par: (-par[1], par[0]))[:limite]
+
+# ----------------------------------------------------------------------------------------------------
+# Índice de sugerencias para el autocompletado
+# ----------------------------------------------------------------------------------------------------
+def clave_sugerencia(texto):
+    """Normaliza un texto como clave de autocompletado ("  Rock  You!" -> "rock you")."""
+    return ' '.join(normalizar(texto).split())
+
+class IndiceSugerencias(IndiceEnMemoria):
+    """
+    Índice de prefijos para autocompletar títulos y artistas.
+
+    Guardamos las claves normalizadas en una lista ordenada (con un array
+    paralelo de referencias) y resolvemos cada prefijo con búsqueda binaria.
+    Las referencias positivas son ids de canciones y las negativas son
+    artistas. Los resultados se ordenan por cantidad de favoritos.
+
+    Los resultados se memorizan por (prefijo, límite) en un LRU acotado. Cada
+    cambio descarta solo las entradas cuyo prefijo coincide con el título o el
+    artista de la canción tocada.
+    """
+    TABLA_VERSION = 'cancion'  # Títulos, artistas y contadores de favoritos
+    MAXIMO_MEMO = 4096  # Resultados memorizados como máximo
+
+    def _limpiar(self):
+        self._claves = []  # Claves normalizadas, ordenadas
+        self._referencias = array('q')  # Paralelo a _claves: id de canción (> 0) o -id de artista (< 0)
+        self._canciones = {}  # id -> [titulo, artista, favoritos]
+        self._artistas = {}  # clave del artista -> [texto, id, canciones, favoritos]
+        self._claves_artista = {}  # id del artista -> clave del artista
+        self._memo = OrderedDict()  # (prefijo, limite) -> resultado ya calculado (LRU)
+
+    # -- Carga y mantenimiento ---------------------------------------------------------------------
+    def _construir(self):
+        columnas = (Cancion.id, Cancion.titulo, Cancion.artista, Cancion.total_favoritos)
+        for id, titulo, artista, favoritos in self._leer(*columnas):
+            self._agregar_cancion(id, titulo, artista, favoritos)
+
+    def _aplicar(self, cambios):
+        tocadas = set()  # Claves de títulos y artistas cuyos resultados cambian
+        for tabla, accion, datos in cambios:
+            if tabla == 'cancion':
+                anterior = self._quitar_cancion(datos['id'])
+                if anterior:
+                    tocadas.update(map(clave_sugerencia, anterior[:2]))
+                if accion != 'delete':
+                    favoritos = anterior[2] if anterior else 0
+                    self._agregar_cancion(datos['id'], datos['titulo'], datos['artista'], favoritos)
+                    tocadas.update(map(clave_sugerencia, (datos['titulo'], datos['artista'])))
+            elif accion in ('insert', 'delete'):
+                cancion = self._canciones.get(datos['id_cancion'])
+                if cancion:
+                    tocadas.update(map(clave_sugerencia, cancion[:2]))
+                self._sumar_favoritos(datos['id_cancion'], 1 if accion == 'insert' else -1)
+        self._olvidar(tocadas)
+
+    def _olvidar(self, tocadas):
+        """Descarta los resultados memorizados de los prefijos de las claves tocadas."""
+        for memo in list(self._memo):
+            if any(clave.startswith(memo[0]) for clave in tocadas):
+                del self._memo[memo]
+
+    def _insertar_clave(self, clave, referencia):
+        posicion = bisect_right(self._claves, clave)
+        self._claves.insert(posicion, clave)
+        self._referencias.insert(posicion, referencia)
+
+    def _quitar_clave(self, clave, referencia):
+        posicion = bisect_left(self._claves, clave)
+        while posicion < len(self._claves) and self._claves[posicion] == clave:
+            if self._referencias[posicion] == referencia:
+                del self._claves[posicion]
+                del self._referencias[posicion]
+                return
+            posicion += 1
+
+    def _agregar_cancion(self, id, titulo, artista, favoritos):
+        self._canciones[id] = [titulo, artista, favoritos]
+        self._insertar_clave(clave_sugerencia(titulo), id)
+
+        clave_artista = clave_sugerencia(artista)
+        datos_artista = self._artistas.get(clave_artista)
+        if datos_artista is None:
+            id_artista = len(self._claves_artista) + 1
+            while id_artista in self._claves_artista:
+                id_artista += 1
+            datos_artista = self._artistas[clave_artista] = [artista, id_artista, 0, 0]
+            self._claves_artista[id_artista] = clave_artista
+            self._insertar_clave(clave_artista, -id_artista)
+        datos_artista[2] += 1
+        datos_artista[3] += favoritos
+
+    def _quitar_cancion(self, id):
+        cancion = self._canciones.pop(id, None)
+        if cancion is None:
+            return None
+        titulo, artista, favoritos = cancion
+        self._quitar_clave(clave_sugerencia(titulo), id)
+
+        clave_artista = clave_sugerencia(artista)
+        datos_artista = self._artistas[clave_artista]
+        datos_artista[2] -= 1
+        datos_artista[3] -= favoritos
+        if datos_artista[2] == 0:
+            del self._artistas[clave_artista]
+            del self._claves_artista[datos_artista[1]]
+            self._quitar_clave(clave_artista, -datos_artista[1])
+        return cancion
+
+    def _sumar_favoritos(self, id_cancion, delta):
+        cancion = self._canciones.get(id_cancion)
+        if cancion is None:
+            return  # La canción se está eliminando en la misma transacción
+        cancion[2] += delta
+        self._artistas[clave_sugerencia(cancion[1])][3] += delta
+
+    # -- Consultas ---------------------------------------------------------------------------------
+    def _popularidad(self, referencia):
+        if referencia > 0:
+            return self._canciones[referencia][2]
+        return self._artistas[self._claves_artista[-referencia]][3]
+
+    def sugerir(self, prefijo, limite=10):
+        """
+        Devuelve las mejores completaciones de títulos y artistas para un prefijo.
+
+        Args:
+            prefijo: Lo que el usuario lleva escrito.
+            limite: Cantidad máxima de sugerencias.
+
+        Returns:
+            Una lista de diccionarios con texto, tipo, id_cancion y favoritos,
+            ordenada de mayor a menor cantidad de favoritos.
+        """
+        self.asegurar_cargado()
+        clave = clave_sugerencia(prefijo)
+        if not clave:
+            return []
+        with self._lock:
+            resultado = self._memo.get((clave, limite))
+            if resultado is not None:
+                self._memo.move_to_end((clave, limite))
+                return resultado
+
+            inicio = bisect_left(self._claves, clave)
+            fin = bisect_left(self._claves, clave + '\U0010ffff', inicio)
+            mejores = heapq.nlargest(
+                limite, self._referencias[inicio:fin],
+                key=lambda referencia: (self._popularidad(referencia), -abs(referencia))
+            )
+
+            resultado = []
+            for referencia in mejores:
+                if referencia > 0:
+                    titulo, artista, favoritos = self._canciones[referencia]
+                    resultado.append({'texto': titulo, 'tipo': 'titulo', 'artista': artista,
+                                      'id_cancion': referencia, 'favoritos': favoritos})
+                else:
+                    texto, _, _, favoritos = self._artistas[self._claves_artista[-referencia]]
+                    resultado.append({'texto': texto, 'tipo': 'artista', 'artista': texto,
+                                      'id_cancion': None, 'favoritos': favoritos})
+            self._memo[(clave, limite)] = resultado
+            if len(self._memo) > self.MAXIMO_MEMO:
+                self._memo.popitem(last=False)
+            return resultado
+
+def registrar_indices(app):
+    """
+    Crea los índices en memoria de la aplicación.
+
+    Los índices se construyen de forma perezosa en su primer uso, así los
+    comandos de la CLI no pagan ese costo al arrancar.
+    """
+    app.extensions['remington_song_indices'] = {
+        'trigramas': IndiceTrigramas(),
+        'sugerencias': IndiceSugerencias()
+    }
@@ -0,0 +1,330 @@
+"""
+¡Aquí definimos la carga masiva de canciones de Remington Song! 📥
+Leemos el cuerpo de la petición por bloques (JSON array o NDJSON), validamos
+cada fila y la insertamos en lotes con executemany, confirmando la
+transacción cada pocos lotes. Nunca tenemos el cuerpo completo en memoria.
+"""
+import codecs
+import csv
+import json
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import delete, event, insert, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from .extensions import db
+from .models import Cancion
+from .indices import invalidar_indices
+from .condicional import tocar_tablas, version_tabla
+from .busqueda import TRIGGERS_FTS, crear_indice_busqueda, reconstruir_indice_busqueda
+from utils import validar_datos_cancion, limpiar_texto
+
+logger = logging.getLogger(__name__)
+
+# Columnas que aceptamos de cada fila
+COLUMNAS_CANCION = ('titulo', 'artista', 'album', 'duracion', 'año', 'genero')
+COLUMNAS_TEXTO = ('titulo', 'artista', 'album', 'genero')
+COLUMNAS_ENTERAS = ('duracion', 'año')
+
+# PRAGMAs de SQLite para la carga rápida: sin esperar al disco en cada commit
+PRAGMAS_CARGA_RAPIDA = (
+    'PRAGMA synchronous = OFF',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -262144'  # 256 MB de caché de páginas
+)
+# Fila de version_tabla que existe mientras una carga rápida tiene los índices eliminados
+MARCA_CARGA_RAPIDA = 'carga_rapida'
+
+class ErrorFormato(ValueError):
+    """
+    Error que se lanza cuando el cuerpo no es un JSON array ni NDJSON válido.
+    """
+
+def iterar_objetos_json(flujo, tamaño_bloque=64 * 1024):
+    """
+    Recorre los elementos de un JSON array o de un NDJSON sin leerlo completo.
+
+    Args:
+        flujo: Un objeto con read() que entrega bytes (por ejemplo, request.stream).
+        tamaño_bloque: Cantidad de bytes que se leen por vez.
+
+    Yields:
+        Cada elemento decodificado, en orden.
+    """
+    decodificador = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer, posicion, fin_flujo = '', 0, False
+    es_array, inicio, terminado = False, True, False
+
+    def leer_mas():
+        nonlocal buffer, posicion, fin_flujo
+        bloque = flujo.read(tamaño_bloque)
+        fin_flujo = not bloque
+        buffer = buffer[posicion:] + utf8.decode(bloque, final=fin_flujo)
+        posicion = 0
+
+    while True:
+        # Saltamos espacios (y comas entre elementos de un array)
+        while True:
+            while posicion < len(buffer) and (buffer[posicion].isspace() or (es_array and buffer[posicion] == ',')):
+                posicion += 1
+            if posicion < len(buffer) or fin_flujo:
+                break
+            leer_mas()
+
+        if posicion >= len(buffer):
+            if es_array and not terminado:
+                raise ErrorFormato("El JSON array no está cerrado")
+            return
+        if terminado:
+            raise ErrorFormato("Contenido inesperado después del JSON array")
+
+        if inicio:
+            inicio = False
+            if buffer[posicion] == '[':
+                es_array = True
+                posicion += 1
+                continue
+        if es_array and buffer[posicion] == ']':
+            terminado = True
+            posicion += 1
+            continue
+
+        try:
+            elemento, nueva_posicion = decodificador.raw_decode(buffer, posicion)
+        except json.JSONDecodeError as error:
+            if fin_flujo:
+                raise ErrorFormato(f"JSON inválido: {error.msg}")
+            leer_mas()
+            continue
+        if nueva_posicion == len(buffer) and not fin_flujo and not isinstance(elemento, (dict, list)):
+            # Un número o literal al final del bloque podría continuar en el siguiente
+            leer_mas()
+            continue
+        posicion = nueva_posicion
+        yield elemento
+
+def validar_tipos(datos):
+    """
+    Revisa que cada columna tenga el tipo que espera la tabla: texto en
+    COLUMNAS_TEXTO y enteros en COLUMNAS_ENTERAS (None siempre se acepta).
+
+    Returns:
+        La lista de errores (vacía si todos los tipos son correctos).
+    """
+    errores = []
+    for columna in COLUMNAS_TEXTO:
+        if datos.get(columna) is not None and not isinstance(datos[columna], str):
+            errores.append(f"El campo '{columna}' debe ser texto")
+    for columna in COLUMNAS_ENTERAS:
+        valor = datos.get(columna)
+        if valor is not None and (isinstance(valor, bool) or not isinstance(valor, int)):
+            errores.append(f"El campo '{columna}' debe ser un número entero")
+    return errores
+
+def validar_fila(datos):
+    """
+    Valida los tipos de una fila y luego sus valores con validar_datos_cancion.
+
+    Returns:
+        Una tupla (es_valida, errores).
+    """
+    if not isinstance(datos, dict):
+        return False, ["Cada elemento debe ser un objeto JSON"]
+    errores = validar_tipos(datos)
+    if errores:
+        return False, errores
+    return validar_datos_cancion(datos)
+
+def ingerir_canciones(elementos, tamaño_lote=1000, lotes_por_transaccion=10, maximo_errores=1000):
+    """
+    Valida e inserta canciones en lotes.
+
+    Args:
+        elementos: Un iterable de diccionarios con los datos de cada canción.
+        tamaño_lote: Filas por cada executemany.
+        lotes_por_transaccion: Cada cuántos lotes se confirma la transacción.
+        maximo_errores: Cantidad máxima de errores detallados en el reporte.
+
+    Returns:
+        Un diccionario con el reporte de la carga. 'insertadas' cuenta solo las
+        filas confirmadas; si la base rechaza un lote, 'error_base_datos' lo
+        indica y las filas sin confirmar se descartan.
+    """
+    inicio = time.perf_counter()
+    reporte = {'recibidas': 0, 'insertadas': 0, 'rechazadas': 0, 'errores': [], 'errores_omitidos': 0}
+    lote, pendientes, lotes_pendientes = [], 0, 0
+
+    def confirmar():
+        nonlocal pendientes, lotes_pendientes
+        db.session.commit()
+        reporte['insertadas'] += pendientes
+        pendientes, lotes_pendientes = 0, 0
+
+    def insertar_lote():
+        nonlocal lote, pendientes, lotes_pendientes
+        if not lote:
+            return
+        db.session.execute(insert(Cancion.__table__), lote)
+        tocar_tablas(db.session, 'cancion', 'catalogo', 'populares')
+        pendientes += len(lote)
+        lote, lotes_pendientes = [], lotes_pendientes + 1
+        if lotes_pendientes >= lotes_por_transaccion:
+            confirmar()
+
+    try:
+        try:
+            for numero, datos in enumerate(elementos):
+                reporte['recibidas'] += 1
+                es_valida, errores = validar_fila(datos)
+                if not es_valida:
+                    reporte['rechazadas'] += 1
+                    if len(reporte['errores']) < maximo_errores:
+                        reporte['errores'].append({'fila': numero, 'errores': errores})
+                    else:
+                        reporte['errores_omitidos'] += 1
+                    continue
+
+                fila = {columna: datos.get(columna) for columna in COLUMNAS_CANCION}
+                fila['fecha_creacion'] = datetime.utcnow()
+                lote.append(fila)
+                if len(lote) >= tamaño_lote:
+                    insertar_lote()
+        except ErrorFormato as error:
+            # Guardamos lo ya validado e informamos dónde se cortó el cuerpo
+            reporte['error_formato'] = str(error)
+        insertar_lote()
+    except SQLAlchemyError:
+        # El detalle (SQL y parámetros) va al log, nunca a la respuesta
+        logger.exception("La base de datos rechazó un lote de canciones")
+        db.session.rollback()
+        lote, pendientes = [], 0
+        reporte['error_base_datos'] = "La base de datos rechazó un lote; se descartaron las filas sin confirmar"
+    finally:
+        # Aunque la lectura se corte a mitad de camino, lo ya insertado se confirma
+        # y los índices se enteran de lo que quedó guardado
+        try:
+            confirmar()
+        finally:
+            if reporte['insertadas']:
+                invalidar_indices()  # Más barato reconstruir que aplicar fila por fila
+
+    segundos = time.perf_counter() - inicio
+    reporte['segundos'] = round(segundos, 3)
+    reporte['filas_por_segundo'] = round(reporte['recibidas'] / segundos, 1) if segundos else None
+    return reporte
+
+# ----------------------------------------------------------------------------------------------------
+# Lectura de archivos de catálogo (para 'flask remington import-catalog')
+# ----------------------------------------------------------------------------------------------------
+def normalizar_fila(datos):
+    """
+    Limpia los textos con limpiar_texto y convierte los números que llegan como texto.
+    Las celdas vacías se guardan como None.
+    """
+    if not isinstance(datos, dict):
+        return datos
+    fila = {}
+    for columna in COLUMNAS_CANCION:
+        valor = datos.get(columna)
+        if isinstance(valor, str):
+            valor = limpiar_texto(valor) or None
+        if columna in COLUMNAS_ENTERAS and isinstance(valor, str):
+            try:
+                valor = int(valor)
+            except ValueError:
+                pass  # validar_fila lo reportará como tipo inválido
+        fila[columna] = valor
+    return fila
+
+def leer_csv(archivo):
+    """Recorre un archivo CSV (con encabezados) fila por fila."""
+    for datos in csv.DictReader(archivo):
+        yield normalizar_fila(datos)
+
+def leer_jsonl(archivo):
+    """Recorre un archivo JSON Lines fila por fila."""
+    for numero, linea in enumerate(archivo, start=1):
+        if not linea.strip():
+            continue
+        try:
+            yield normalizar_fila(json.loads(linea))
+        except json.JSONDecodeError as error:
+            raise ErrorFormato(f"JSON inválido en la línea {numero}: {error.msg}")
+
+def reparar_carga_interrumpida(conexion):
+    """
+    Restaura los índices y triggers si una carga rápida quedó a medias.
+
+    modo_carga_rapida deja la marca MARCA_CARGA_RAPIDA en version_tabla
+    mientras faltan los índices secundarios y los triggers de FTS5, y la
+    borra al restaurarlos. Si el proceso murió (o falló la restauración), la
+    marca sigue ahí: create_app y la siguiente carga rápida llaman a esta
+    función y recrean todo lo que falte.
+
+    Returns:
+        True si había una carga interrumpida y se reparó.
+    """
+    marca = version_tabla.c.tabla == MARCA_CARGA_RAPIDA
+    if conexion.execute(select(version_tabla.c.tabla).where(marca)).first() is None:
+        return False
+    for tabla in db.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            indice.create(conexion, checkfirst=True)
+    if crear_indice_busqueda(conexion):
+        reconstruir_indice_busqueda(conexion)
+    conexion.execute(delete(version_tabla).where(marca))
+    return True
+
+@contextmanager
+def modo_carga_rapida(modelos=(Cancion,)):
+    """
+    Prepara SQLite para una carga masiva y restaura todo al terminar.
+
+    - Las conexiones nuevas usan PRAGMAs relajados (synchronous = OFF).
+    - Los índices secundarios de los modelos indicados (cancion por defecto)
+      y los triggers de FTS5 se eliminan durante la carga y se reconstruyen
+      una sola vez al final, en lugar de actualizarse fila por fila.
+    - Mientras tanto queda una marca en version_tabla: si el proceso muere
+      antes de restaurar, reparar_carga_interrumpida() lo completa después.
+
+    En otros motores no hace nada.
+    """
+    motor = db.engine
+    if motor.dialect.name != 'sqlite':
+        yield
+        return
+
+    def aplicar_pragmas(conexion_dbapi, registro):
+        cursor = conexion_dbapi.cursor()
+        for pragma in PRAGMAS_CARGA_RAPIDA:
+            cursor.execute(pragma)
+        cursor.close()
+
+    indices = [indice for modelo in modelos for indice in modelo.__table__.indexes]
+    db.session.remove()
+    motor.dispose()  # Las conexiones que abra la carga pasarán por aplicar_pragmas
+    event.listen(motor, 'connect', aplicar_pragmas)
+    with motor.begin() as conexion:
+        if reparar_carga_interrumpida(conexion):
+            logger.warning("Se restauraron los índices de una carga rápida anterior que no terminó")
+        conexion.execute(insert(version_tabla).values(
+            tabla=MARCA_CARGA_RAPIDA, version=0, modificado=datetime.utcnow()))
+        for indice in indices:
+            indice.drop(conexion, checkfirst=True)
+        for nombre in TRIGGERS_FTS:
+            conexion.execute(text(f'DROP TRIGGER IF EXISTS {nombre}'))
+    try:
+        yield
+    finally:
+        db.session.remove()
+        event.remove(motor, 'connect', aplicar_pragmas)
+        motor.dispose()  # Volvemos a las conexiones con la configuración normal
+        with motor.begin() as conexion:
+            for indice in indices:
+                indice.create(conexion, checkfirst=True)
+            if crear_indice_busqueda(conexion):
+                reconstruir_indice_busqueda(conexion)
+            # En la misma transacción: la marca solo desaparece si todo quedó restaurado
+            conexion.execute(delete(version_tabla).where(version_tabla.c.tabla == MARCA_CARGA_RAPIDA))
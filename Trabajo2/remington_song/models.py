@@ -15,7 +15,7 @@ class Usuario(db.Model):
     nombre = db.Column(db.String(80), nullable=False)
     correo = db.Column(db.String(120), unique=True, nullable=False)
     contraseña = db.Column(db.String(128), nullable=False)  # Campo de contraseña
-    fecha_registro = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    fecha_registro = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)  # Orden del listado
     
     # Relación con favoritos
     favoritos = db.relationship('Favorito', backref='usuario', lazy=True, cascade='all, delete-orphan')
@@ -40,12 +40,14 @@ class Cancion(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     titulo = db.Column(db.String(100), nullable=False)
-    artista = db.Column(db.String(100), nullable=False)
+    artista = db.Column(db.String(100), nullable=False, index=True)
     album = db.Column(db.String(100))
     duracion = db.Column(db.Integer)  # Duración en segundos
-    año = db.Column(db.Integer)
-    genero = db.Column(db.String(50))
-    fecha_creacion = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    año = db.Column(db.Integer, index=True)
+    genero = db.Column(db.String(50), index=True)
+    fecha_creacion = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)  # Orden del listado
+    # Contador desnormalizado de favoritos (lo mantiene contadores.py); indexado para el top-N
+    total_favoritos = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
     
     # Relación con favoritos
     favoritos = db.relationship('Favorito', backref='cancion', lazy=True, cascade='all, delete-orphan')
@@ -63,7 +65,8 @@ class Cancion(db.Model):
             'duracion': self.duracion,
             'año': self.año,
             'genero': self.genero,
-            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None
+            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
+            'total_favoritos': self.total_favoritos
         }
 
 class Favorito(db.Model):
@@ -74,11 +77,16 @@ class Favorito(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     id_usuario = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
-    id_cancion = db.Column(db.Integer, db.ForeignKey('cancion.id'), nullable=False)
-    fecha_marcado = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Índice propio: el único (id_usuario, id_cancion) no sirve para buscar solo por canción
+    id_cancion = db.Column(db.Integer, db.ForeignKey('cancion.id'), nullable=False, index=True)
+    fecha_marcado = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
     
-    # Constraint único para evitar duplicados
-    __table_args__ = (db.UniqueConstraint('id_usuario', 'id_cancion', name='unique_user_song_favorite'),)
+    # Constraint único para evitar duplicados (también resuelve las búsquedas por id_usuario)
+    # e índice para listar los favoritos de un usuario ordenados por fecha
+    __table_args__ = (
+        db.UniqueConstraint('id_usuario', 'id_cancion', name='unique_user_song_favorite'),
+        db.Index('ix_favorito_id_usuario_fecha_marcado', 'id_usuario', 'fecha_marcado'),
+    )
 
     def __repr__(self):
         return f'<Favorito Usuario:{self.id_usuario} Cancion:{self.id_cancion}>'
@@ -90,4 +98,19 @@ class Favorito(db.Model):
             'id_usuario': self.id_usuario,
             'id_cancion': self.id_cancion,
             'fecha_marcado': self.fecha_marcado.isoformat() if self.fecha_marcado else None
-        }
\ No newline at end of file
+        }
+
+class VersionTabla(db.Model):
+    """
+    Modelo con un contador de cambios por tabla de Remington Song.
+    Se incrementa en la misma transacción que cada escritura y nos permite
+    calcular ETags sin volver a consultar los datos.
+    """
+    __tablename__ = 'version_tabla'
+
+    tabla = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    modificado = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<VersionTabla {self.tabla}:{self.version}>'
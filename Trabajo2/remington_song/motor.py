@@ -0,0 +1,51 @@
+"""
+¡Aquí ajustamos el motor de base de datos de Remington Song! 🛠️
+Con la configuración por defecto SQLite usa el diario de rollback: un
+escritor bloquea a todos los lectores y, con varias peticiones a la vez,
+aparecen errores "database is locked". En producción activamos:
+
+- journal_mode = WAL: los lectores no esperan al escritor (y viceversa).
+- synchronous = NORMAL: con WAL es seguro ante caídas del proceso y evita
+  un fsync por cada commit.
+- mmap_size y cache_size: más páginas en memoria, menos lecturas al disco.
+- busy_timeout: si otro escritor tiene el bloqueo, esperamos en lugar de fallar.
+
+Los PRAGMAs se aplican a cada conexión nueva (SQLITE_PRAGMAS en la configuración).
+"""
+from sqlalchemy import event
+from .extensions import db
+
+def aplicar_pragmas(conexion_dbapi, pragmas):
+    """
+    Ejecuta los PRAGMAs indicados sobre una conexión de sqlite3.
+
+    Args:
+        conexion_dbapi: La conexión DBAPI recién abierta.
+        pragmas: Un diccionario {nombre: valor}, en el orden en que se aplican.
+    """
+    cursor = conexion_dbapi.cursor()
+    try:
+        for nombre, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nombre} = {valor}')
+    finally:
+        cursor.close()
+
+def registrar_pragmas(app):
+    """
+    Aplica SQLITE_PRAGMAS a cada conexión que abran los motores de la aplicación.
+
+    Se aplican a la base principal y a las réplicas de lectura; no hace nada
+    si no hay PRAGMAs configurados o con motores que no son SQLite.
+    """
+    pragmas = dict(app.config.get('SQLITE_PRAGMAS') or {})
+    if not pragmas:
+        return
+    with app.app_context():
+        motores = list(db.engines.values())
+
+    def ajustar_conexion(conexion_dbapi, registro):
+        aplicar_pragmas(conexion_dbapi, pragmas)
+
+    for motor in motores:
+        if motor.dialect.name == 'sqlite':
+            event.listen(motor, 'connect', ajustar_conexion)
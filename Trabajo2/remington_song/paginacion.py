@@ -0,0 +1,167 @@
+"""
+¡Aquí definimos la paginación por cursor (keyset) de Remington Song! 📄
+En lugar de usar OFFSET, recordamos la clave del último registro entregado y
+continuamos desde ahí. Así la latencia y la memoria se mantienen estables sin
+importar qué tan profundo pagine el cliente.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from urllib.parse import urlencode
+from flask import current_app, request
+from sqlalchemy import and_, or_
+
+class CursorInvalido(ValueError):
+    """
+    Error que se lanza cuando los parámetros de paginación no son válidos.
+    """
+
+def codificar_cursor(orden, valor, id):
+    """
+    Convierte la clave del último registro en un cursor opaco.
+
+    Args:
+        orden: El criterio de ordenamiento (por ejemplo, '-fecha_creacion').
+        valor: El valor de la columna de ordenamiento del último registro.
+        id: El identificador del último registro (desempate).
+
+    Returns:
+        Una cadena base64 segura para URLs.
+    """
+    if isinstance(valor, datetime):
+        valor = valor.isoformat()
+    contenido = json.dumps({'o': orden, 'v': valor, 'id': id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(contenido.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decodificar_cursor(cursor, orden, columna):
+    """
+    Recupera la clave (valor, id) guardada en un cursor.
+
+    Args:
+        cursor: El cursor recibido en el parámetro 'after'.
+        orden: El criterio de ordenamiento de la petición actual.
+        columna: La columna de ordenamiento (para restaurar fechas).
+
+    Returns:
+        Una tupla (valor, id).
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno).decode('utf-8'))
+        valor, id = datos['v'], int(datos['id'])
+        if datos['o'] != orden:
+            raise CursorInvalido("El cursor no corresponde al ordenamiento solicitado")
+        if columna.type.python_type is datetime:
+            valor = datetime.fromisoformat(valor)
+        return valor, id
+    except CursorInvalido:
+        raise
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+        raise CursorInvalido("El cursor de paginación no es válido")
+
+def leer_parametros(modelo, ordenes, orden_defecto='id'):
+    """
+    Lee y valida los parámetros 'limit', 'after' y 'orden' de la petición actual.
+
+    Args:
+        modelo: El modelo que se va a paginar.
+        ordenes: Los nombres de columnas por los que se permite ordenar.
+        orden_defecto: El ordenamiento usado si el cliente no indica uno.
+
+    Returns:
+        Una tupla (limite, orden, despues); despues es la clave (valor, id)
+        del cursor o None si se pide la primera página.
+    """
+    limite_defecto = current_app.config.get('LIMITE_PAGINA_DEFECTO', 50)
+    limite_maximo = current_app.config.get('LIMITE_PAGINA_MAXIMO', 500)
+    try:
+        limite = int(request.args.get('limit', limite_defecto))
+    except ValueError:
+        raise CursorInvalido("El parámetro 'limit' debe ser un número entero")
+    if limite < 1:
+        raise CursorInvalido("El parámetro 'limit' debe ser mayor que cero")
+    limite = min(limite, limite_maximo)
+
+    orden = request.args.get('orden', orden_defecto)
+    if orden.lstrip('-') not in ordenes:
+        raise CursorInvalido(
+            f"Ordenamiento no soportado: '{orden}'. Opciones: {', '.join(ordenes)}"
+        )
+
+    cursor = request.args.get('after')
+    despues = None
+    if cursor:
+        despues = decodificar_cursor(cursor, orden, getattr(modelo, orden.lstrip('-')))
+    return limite, orden, despues
+
+def paginar(query, modelo, orden, limite, despues=None):
+    """
+    Aplica la paginación keyset a una consulta.
+
+    El ordenamiento siempre incluye el id como desempate, de modo que la clave
+    (columna, id) es única y la base de datos puede saltar directamente al
+    siguiente registro con un índice.
+
+    Args:
+        query: La consulta base (ya filtrada) de SQLAlchemy.
+        modelo: El modelo al que pertenecen las columnas de ordenamiento.
+        orden: Nombre de la columna, con prefijo '-' para orden descendente.
+        limite: Cantidad máxima de registros por página.
+        despues: La clave (valor, id) del último registro ya entregado (opcional).
+
+    Returns:
+        Una tupla (filas, siguiente_cursor); siguiente_cursor es None en la última página.
+    """
+    descendente = orden.startswith('-')
+    nombre = orden.lstrip('-')
+    columna = getattr(modelo, nombre)
+    columna_id = modelo.id
+
+    if despues:
+        valor, id = despues
+        if nombre == 'id':
+            condicion = columna_id < id if descendente else columna_id > id
+        # La cota simple (columna <= valor) va por fuera del OR: así SQLite la usa
+        # como rango sobre el índice en lugar de recorrerlo desde el principio.
+        elif descendente:
+            condicion = and_(columna <= valor, or_(columna < valor, columna_id < id))
+        else:
+            condicion = and_(columna >= valor, or_(columna > valor, columna_id > id))
+        query = query.filter(condicion)
+
+    if nombre == 'id':
+        criterios = [columna_id.desc() if descendente else columna_id.asc()]
+    elif descendente:
+        criterios = [columna.desc(), columna_id.desc()]
+    else:
+        criterios = [columna.asc(), columna_id.asc()]
+
+    # Pedimos un registro extra para saber si existe una página siguiente
+    filas = query.order_by(*criterios).limit(limite + 1).all()
+    if len(filas) <= limite:
+        return filas, None
+
+    filas = filas[:limite]
+    ultima = filas[-1]
+    return filas, codificar_cursor(orden, getattr(ultima, nombre), ultima.id)
+
+def cabeceras_paginacion(siguiente_cursor):
+    """
+    Construye las cabeceras con el enlace a la siguiente página.
+
+    Args:
+        siguiente_cursor: El cursor devuelto por paginar (o None).
+
+    Returns:
+        Un diccionario con las cabeceras 'Link' y 'X-Next-Cursor'.
+    """
+    if not siguiente_cursor:
+        return {}
+    argumentos = request.args.to_dict()
+    argumentos['after'] = siguiente_cursor
+    enlace = f"{request.base_url}?{urlencode(argumentos)}"
+    return {
+        'Link': f'<{enlace}>; rel="next"',
+        'X-Next-Cursor': siguiente_cursor
+    }
@@ -0,0 +1,170 @@
+"""
+¡Aquí revisamos los planes de consulta de Remington Song! 🔬
+Levantamos la aplicación sobre una base SQLite temporal con datos de prueba,
+recorremos los endpoints y capturamos cada consulta que llega a la base.
+Después pedimos EXPLAIN QUERY PLAN de cada una y marcamos las que recorren
+una tabla completa en lugar de usar un índice.
+
+Se ejecuta con 'flask remington verificar-planes' (falla si hay recorridos completos).
+"""
+import os
+import random
+import re
+import tempfile
+from sqlalchemy import Select, event, insert
+from .config import Config
+from .extensions import db
+from .models import Usuario, Cancion, Favorito
+from .indices import obtener_indice
+from utils import GENEROS_MUSICALES
+
+# Peticiones que ejercitan las consultas de cada recurso: (método, ruta, cuerpo JSON).
+# Las exportaciones quedan fuera: recorren la tabla completa a propósito.
+ESCENARIOS = [
+    ('POST', '/api/auth/login', {'correo': 'planes@remington.song', 'contraseña': 'planes'}),
+    ('GET', '/api/usuarios?limit=5', None),
+    ('GET', '/api/usuarios?limit=5&orden=-fecha_registro', None),
+    ('GET', '/api/usuarios/2', None),
+    ('GET', '/api/usuarios/2/estadisticas', None),
+    ('POST', '/api/usuarios/estadisticas', {'ids': [2, 3, 4]}),
+    ('GET', '/api/canciones?limit=5', None),
+    ('GET', '/api/canciones?limit=5&orden=fecha_creacion', None),
+    ('GET', '/api/canciones?limit=5&orden=-fecha_creacion&fields=id,titulo', None),
+    ('GET', '/api/canciones/7', None),
+    ('GET', '/api/canciones/buscar?q=rock', None),
+    ('GET', '/api/canciones/buscar?titulo=cancion&genero=pop', None),
+    ('GET', '/api/canciones/buscar?q=cancoin', None),
+    ('GET', '/api/canciones/populares?limit=5', None),
+    ('GET', '/api/canciones/sugerir?q=can', None),
+    ('GET', '/api/favoritos?limit=5', None),
+    ('GET', '/api/favoritos?limit=5&orden=-fecha_marcado', None),
+    ('GET', '/api/favoritos/3', None),
+    ('GET', '/api/usuarios/2/favoritos?limit=2', None),
+    ('GET', '/api/usuarios/2/favoritos?limit=2&orden=fecha_marcado', None),
+    ('POST', '/api/usuarios/2/favoritos/lote', {'agregar': [10, 11, 12], 'eliminar': [13]}),
+    ('POST', '/api/usuarios/3/favoritos/20', None),
+    ('DELETE', '/api/usuarios/3/favoritos/20', None),
+    ('PUT', '/api/canciones/8', {'titulo': 'Otra', 'artista': 'Otro'}),
+    ('DELETE', '/api/canciones/9', None),
+]
+
+# Un SCAN sobre una tabla, con o sin índice (recorre el índice completo)
+PATRON_RECORRIDO = re.compile(r'^SCAN (\w+)(?: USING (?:COVERING )?INDEX \w+)?$')
+
+def sembrar_datos(canciones=300, usuarios=20, favoritos_por_usuario=15, semilla=7):
+    """Carga datos de prueba suficientes para que el planificador elija en serio."""
+    azar = random.Random(semilla)
+    db.session.execute(insert(Cancion.__table__), [
+        {'titulo': f'Canción {numero}', 'artista': f'Artista {numero % 40}',
+         'album': f'Álbum {numero % 60}', 'duracion': 180 + numero % 200,
+         'año': 1960 + numero % 60, 'genero': azar.choice(GENEROS_MUSICALES)}
+        for numero in range(canciones)
+    ])
+    db.session.execute(insert(Usuario.__table__), [
+        {'nombre': f'Usuario {numero}', 'correo': f'usuario{numero}@remington.song', 'contraseña': '-'}
+        for numero in range(usuarios)
+    ])
+    filas = []
+    for id_usuario in range(1, usuarios + 1):
+        for id_cancion in azar.sample(range(1, canciones + 1), favoritos_por_usuario):
+            filas.append({'id_usuario': id_usuario, 'id_cancion': id_cancion})
+    db.session.execute(insert(Favorito.__table__), filas)
+    db.session.commit()
+
+def limite_sin_filtro(consulta):
+    """Indica si el SELECT principal tiene LIMIT y ningún WHERE (None si fue SQL directo)."""
+    return (isinstance(consulta, Select) and consulta._limit_clause is not None
+            and consulta.whereclause is None)
+
+def recorrido_completo(plan, consulta, tablas):
+    """
+    Devuelve el paso del plan que recorre una tabla completa, o None.
+
+    Se decide paso por paso. Un SCAN del SELECT principal se acepta si ese
+    SELECT tiene LIMIT, no filtra con WHERE y no ordena en memoria: lee en el
+    orden del recorrido y se detiene al llegar al límite (la primera página
+    de un listado). Un SCAN dentro de una subconsulta siempre es completo.
+
+    Args:
+        plan: Las filas de EXPLAIN QUERY PLAN (id, padre, _, detalle).
+        consulta: La sentencia de SQLAlchemy que generó el SQL (None si fue SQL directo).
+        tablas: Los nombres de las tablas de la aplicación.
+    """
+    ordena_en_memoria = any(padre == 0 and detalle.startswith('USE TEMP B-TREE') and 'ORDER BY' in detalle
+                            for _, padre, _, detalle in plan)
+    acotado = limite_sin_filtro(consulta) and not ordena_en_memoria
+    for _, padre, _, detalle in plan:
+        coincidencia = PATRON_RECORRIDO.match(detalle)
+        if coincidencia and coincidencia.group(1) in tablas and not (padre == 0 and acotado):
+            return detalle
+    return None
+
+def verificar_planes():
+    """
+    Ejecuta los escenarios y analiza el plan de cada consulta capturada.
+
+    Returns:
+        Una lista de diccionarios con 'ruta', 'sql', 'plan', 'recorrido' y 'ordena_en_memoria'.
+    """
+    from . import create_app  # Import diferido: create_app importa este módulo a través de la CLI
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        class ConfigPlanes(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(carpeta, 'planes.db')}"
+            CREAR_ESQUEMA = True
+            CACHE_RESULTADOS = None  # Queremos ver las consultas, no la caché
+            HASH_METODO = 'pbkdf2:sha256:1000'
+            HASH_PROCESOS = 0
+
+        app = create_app(ConfigPlanes)
+        cliente = app.test_client()
+        with app.app_context():
+            sembrar_datos()
+            cliente.post('/api/auth/register', json={
+                'nombre': 'Planes', 'correo': 'planes@remington.song', 'contraseña': 'planes'
+            })
+            token = cliente.post('/api/auth/login', json={
+                'correo': 'planes@remington.song', 'contraseña': 'planes'
+            }).get_json()['access_token']
+            # Los índices en memoria leen la tabla completa una vez; eso no es una consulta de los recursos
+            obtener_indice('trigramas').asegurar_cargado()
+            obtener_indice('sugerencias').asegurar_cargado()
+
+            capturadas, ruta_actual = {}, [None]
+
+            def capturar(conexion, cursor, sentencia, parametros, contexto, executemany):
+                if not executemany and sentencia.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                    consulta = contexto.compiled.statement if contexto.compiled is not None else None
+                    capturadas.setdefault(sentencia, (ruta_actual[0], parametros, consulta))
+
+            event.listen(db.engine, 'before_cursor_execute', capturar)
+            try:
+                cabeceras = {'Authorization': f'Bearer {token}'}
+                for metodo, ruta, cuerpo in ESCENARIOS:
+                    ruta_actual[0] = f'{metodo} {ruta}'
+                    respuesta = cliente.open(ruta, method=metodo, json=cuerpo, headers=cabeceras)
+                    siguiente = respuesta.headers.get('X-Next-Cursor')
+                    if siguiente:
+                        # La segunda página usa la condición del cursor (keyset)
+                        ruta_actual[0] = f'{metodo} {ruta} (página siguiente)'
+                        cliente.open(f'{ruta}&after={siguiente}', method=metodo, headers=cabeceras)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', capturar)
+
+            tablas = set(db.metadata.tables)
+            resultados = []
+            with db.engine.connect() as conexion:
+                for sentencia, (ruta, parametros, consulta) in capturadas.items():
+                    plan = conexion.exec_driver_sql(f'EXPLAIN QUERY PLAN {sentencia}', parametros).all()
+                    detalles = [fila[-1] for fila in plan]
+                    resultados.append({
+                        'ruta': ruta,
+                        'sql': ' '.join(sentencia.split()),
+                        'plan': detalles,
+                        'recorrido': recorrido_completo(plan, consulta, tablas),
+                        'ordena_en_memoria': any(detalle.startswith('USE TEMP B-TREE') for detalle in detalles)
+                    })
+        db.session.remove()
+        with app.app_context():
+            db.engine.dispose()
+    return resultados
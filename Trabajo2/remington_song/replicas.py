@@ -0,0 +1,236 @@
+"""
+¡Aquí repartimos las lecturas de Remington Song entre réplicas! 📚
+La base principal recibe todas las escrituras; las peticiones de solo lectura
+(GET, HEAD y las rutas marcadas con @solo_lectura) consultan una réplica.
+
+- REPLICAS_LECTURA es la lista de URIs de las réplicas (se registran como
+  binds 'lectura_0', 'lectura_1', ... y se usan por turnos).
+- Lectura propia: después de escribir, el mismo cliente lee de la principal
+  durante VENTANA_LECTURA_PROPIA segundos, así siempre ve lo que acaba de
+  guardar aunque la réplica vaya atrasada. El cliente se reconoce por una
+  cookie y, si no la devuelve, por su token o su IP.
+- Para probar en local, REPLICAS_SINCRONIZAR copia la base SQLite principal
+  a las réplicas con la API de backup de sqlite3 después de cada escritura.
+  La ventana de lectura propia debe ser mayor que el retraso de esa copia.
+"""
+import hashlib
+import itertools
+import logging
+import math
+import sqlite3
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+CLAVE_MOTOR_LECTURA = 'remington_song_motor_lectura'  # En g: el motor de la réplica elegida
+CLAVE_SOLO_LECTURA = 'remington_song_solo_lectura'  # En g: la ruta no escribe aunque no sea GET
+COOKIE_ESCRITURA = 'remington_escritura'  # Instante de la última escritura del cliente
+METODOS_LECTURA = ('GET', 'HEAD')
+METODOS_SIN_ESCRITURA = ('GET', 'HEAD', 'OPTIONS')
+
+def motor_lectura_actual():
+    """Devuelve el motor de la réplica elegida para esta petición, o None."""
+    if not has_app_context():
+        return None
+    return g.get(CLAVE_MOTOR_LECTURA)
+
+class SesionEnrutada(Session):
+    """
+    Sesión que manda las consultas a la réplica elegida para la petición.
+
+    Las escrituras (INSERT, UPDATE, DELETE y los flush del ORM) van siempre a
+    la base principal, aunque ocurran dentro de una petición de lectura.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase):
+            motor = motor_lectura_actual()
+            if motor is not None:
+                return motor
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+class EnrutadorLecturas:
+    """
+    Elige la réplica de cada lectura y recuerda qué clientes escribieron hace poco.
+    """
+    def __init__(self, motores, ventana):
+        self.motores = motores
+        self.ventana = ventana
+        self._turno = itertools.count()
+        self._escrituras = {}  # Clave del cliente -> instante de su última escritura
+        self._lock = threading.Lock()
+
+    def elegir(self):
+        """Devuelve el motor de la siguiente réplica (por turnos)."""
+        return self.motores[next(self._turno) % len(self.motores)]
+
+    def anotar_escritura(self, cliente, instante):
+        with self._lock:
+            self._escrituras[cliente] = instante
+            if len(self._escrituras) > 10000:
+                # Olvidamos a los clientes cuya ventana ya terminó
+                limite = instante - self.ventana
+                self._escrituras = {clave: momento for clave, momento in self._escrituras.items() if momento > limite}
+
+    def escribio_hace_poco(self, cliente, cookie=None):
+        """Indica si el cliente escribió dentro de la ventana de lectura propia."""
+        ahora = time.time()
+        try:
+            if cookie and ahora - float(cookie) < self.ventana:
+                return True
+        except ValueError:
+            pass  # Cookie alterada: nos quedamos con lo que recuerda este proceso
+        with self._lock:
+            momento = self._escrituras.get(cliente)
+        return momento is not None and ahora - momento < self.ventana
+
+class SincronizadorReplicas:
+    """
+    Copia la base SQLite principal a los archivos de las réplicas.
+
+    Las copias se piden con solicitar() y las hace un hilo en segundo plano;
+    las peticiones que llegan mientras tanto se agrupan en una sola copia.
+    """
+    def __init__(self, origen, destinos, intervalo):
+        self.origen = origen
+        self.destinos = destinos
+        self.intervalo = intervalo
+        self._pendiente = threading.Event()
+        self._lock_copia = threading.Lock()
+        self._lock_hilo = threading.Lock()
+        self._hilo = None
+
+    def sincronizar(self):
+        """Copia la base principal a todas las réplicas (una instantánea consistente)."""
+        with self._lock_copia:
+            origen = sqlite3.connect(self.origen)
+            try:
+                for destino in self.destinos:
+                    conexion = sqlite3.connect(destino, timeout=30)
+                    try:
+                        origen.backup(conexion)
+                    finally:
+                        conexion.close()
+            finally:
+                origen.close()
+
+    def solicitar(self):
+        """Pide una copia en segundo plano."""
+        self._pendiente.set()
+        with self._lock_hilo:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name='sincronizador-replicas', daemon=True)
+                self._hilo.start()
+
+    def _bucle(self):
+        while True:
+            self._pendiente.wait()
+            time.sleep(self.intervalo)  # Agrupamos las escrituras que lleguen mientras tanto
+            self._pendiente.clear()
+            try:
+                self.sincronizar()
+            except Exception:
+                logger.exception("No se pudo sincronizar las réplicas")
+
+def nombres_replicas(app):
+    """Nombres de los binds de las réplicas configuradas."""
+    return [f'lectura_{numero}' for numero in range(len(app.config.get('REPLICAS_LECTURA') or []))]
+
+def preparar_replicas(app):
+    """
+    Agrega las réplicas a SQLALCHEMY_BINDS. Se llama antes de db.init_app.
+    """
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    for nombre, uri in zip(nombres_replicas(app), app.config.get('REPLICAS_LECTURA') or []):
+        binds[nombre] = uri
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+def _ruta_sqlite(motor):
+    """Ruta del archivo de una base SQLite, o None si no es un archivo SQLite."""
+    if motor.dialect.name != 'sqlite' or motor.url.database in (None, '', ':memory:'):
+        return None
+    return motor.url.database
+
+def clave_cliente():
+    """Identifica al cliente por su token (si lo envía) o por su IP."""
+    origen = request.headers.get('Authorization') or request.remote_addr or ''
+    return hashlib.sha256(origen.encode('utf-8')).hexdigest()
+
+def usar_replica():
+    """
+    Manda las lecturas de esta petición a una réplica, salvo que el cliente
+    haya escrito hace poco (entonces sigue en la principal).
+    """
+    enrutador = current_app.extensions.get('remington_song_replicas')
+    if enrutador is None or enrutador.escribio_hace_poco(clave_cliente(), request.cookies.get(COOKIE_ESCRITURA)):
+        return
+    g.setdefault(CLAVE_MOTOR_LECTURA, enrutador.elegir())
+
+def solo_lectura(funcion):
+    """
+    Decorador para las rutas que no escriben aunque no sean GET
+    (por ejemplo, un POST que solo consulta): leen de una réplica.
+    """
+    @wraps(funcion)
+    def envoltura(*args, **kwargs):
+        g.setdefault(CLAVE_SOLO_LECTURA, True)
+        usar_replica()
+        return funcion(*args, **kwargs)
+    return envoltura
+
+def registrar_replicas(app):
+    """
+    Activa el reparto de lecturas si hay réplicas configuradas.
+
+    Se configura con REPLICAS_LECTURA, VENTANA_LECTURA_PROPIA,
+    REPLICAS_SINCRONIZAR y REPLICAS_INTERVALO_SINCRONIZACION.
+    """
+    nombres = nombres_replicas(app)
+    if not nombres:
+        return
+    db = app.extensions['sqlalchemy']
+    with app.app_context():
+        principal = db.engine
+        motores = [db.engines[nombre] for nombre in nombres]
+    ventana = app.config.get('VENTANA_LECTURA_PROPIA', 5)
+    enrutador = EnrutadorLecturas(motores, ventana)
+    app.extensions['remington_song_replicas'] = enrutador
+
+    sincronizador = None
+    if app.config.get('REPLICAS_SINCRONIZAR'):
+        destinos = [_ruta_sqlite(motor) for motor in motores]
+        if _ruta_sqlite(principal) is None or None in destinos:
+            raise ValueError("REPLICAS_SINCRONIZAR solo funciona con archivos SQLite")
+        sincronizador = SincronizadorReplicas(
+            _ruta_sqlite(principal), destinos, app.config.get('REPLICAS_INTERVALO_SINCRONIZACION', 0.5)
+        )
+        app.extensions['remington_song_sincronizador'] = sincronizador
+
+    @app.before_request
+    def elegir_motor_lectura():
+        if request.method in METODOS_LECTURA:
+            usar_replica()
+
+    @app.after_request
+    def recordar_escritura(respuesta):
+        if (request.method in METODOS_SIN_ESCRITURA or g.get(CLAVE_SOLO_LECTURA)
+                or respuesta.status_code >= 400):
+            return respuesta
+        instante = time.time()
+        enrutador.anotar_escritura(clave_cliente(), instante)
+        respuesta.set_cookie(COOKIE_ESCRITURA, f'{instante:.3f}', max_age=math.ceil(ventana),
+                             httponly=True, samesite='Lax')
+        if sincronizador is not None:
+            sincronizador.solicitar()
+        return respuesta
+
+def sincronizar_replicas(app):
+    """Copia ahora la base principal a las réplicas (si la sincronización local está activa)."""
+    sincronizador = app.extensions.get('remington_song_sincronizador')
+    if sincronizador is not None:
+        sincronizador.sincronizar()
+    return sincronizador is not None
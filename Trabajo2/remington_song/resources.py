@@ -2,14 +2,27 @@
 ¡Aquí definimos los recursos de Remington Song API! 🚀
 Los recursos son las clases que manejan las peticiones HTTP a nuestros endpoints.
 """
-from flask import request
+import logging
+from flask import request, current_app
 from flask_restx import Namespace, Resource, fields
 from .extensions import db, jwt
 from .models import Usuario, Cancion, Favorito
+from .paginacion import CursorInvalido, leer_parametros, paginar, cabeceras_paginacion
+from .exportacion import FORMATOS_EXPORTACION, respuesta_exportacion
+from .busqueda import buscar_canciones
+from .indices import obtener_indice
+from .ingesta import iterar_objetos_json, ingerir_canciones
+from .favoritos import aplicar_lote_favoritos
+from .condicional import condicional
+from .cache import cacheado, obtener_cache
+from .serializacion import Serializador, respuesta_json
+from .seguridad import ColaHashLlena, generar_hash, verificar_contraseña
+from .replicas import solo_lectura
+from utils import obtener_canciones_populares, calcular_estadisticas_usuarios
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from sqlalchemy import or_
+
+logger = logging.getLogger(__name__)
 
 # Creamos un namespace para agrupar los recursos de la API
 api = Namespace('api', description='Operaciones de Remington Song - Usuarios, canciones y favoritos')
@@ -17,7 +30,10 @@ api = Namespace('api', description='Operaciones de Remington Song - Usuarios, ca
 # Importamos los modelos de la API
 from .api_models import (
     usuario_model as um, cancion_model as cm, favorito_model as fm,
-    auth_model as am, token_model as tm, registro_model as rm, busqueda_model as bm
+    auth_model as am, token_model as tm, registro_model as rm, busqueda_model as bm,
+    sugerencia_model as sm, estadisticas_model as em, estadisticas_lote_model as elm,
+    reporte_carga_model as rcm, favoritos_lote_model as flm,
+    resultado_favoritos_lote_model as rflm, estadisticas_cache_model as ecm
 )
 
 usuario_model = api.model('Usuario', um)
@@ -27,6 +43,25 @@ auth_model = api.model('Auth', am)
 token_model = api.model('Token', tm)
 registro_model = api.model('Registro', rm)
 busqueda_model = api.model('Busqueda', bm)
+sugerencia_model = api.model('Sugerencia', sm)
+estadisticas_model = api.model('Estadisticas', em)
+estadisticas_lote_model = api.model('EstadisticasLote', elm)
+reporte_carga_model = api.model('ReporteCarga', rcm)
+favoritos_lote_model = api.model('FavoritosLote', flm)
+resultado_favoritos_lote_model = api.model('ResultadoFavoritosLote', rflm)
+estadisticas_cache_model = api.model('EstadisticasCache', ecm)
+
+# Serializadores compilados para los listados: salen de los mismos campos que
+# documenta Swagger, pero leen filas de Core sin pasar por el ORM ni por marshal
+serializador_usuario = Serializador(Usuario.__table__, um)
+serializador_cancion = Serializador(Cancion.__table__, cm)
+serializador_favorito = Serializador(Favorito.__table__, fm)
+
+# Modelo para las canciones más populares
+popular_model = api.model('CancionPopular', {
+    'cancion': fields.Nested(cancion_model, description='La canción'),
+    'total_favoritos': fields.Integer(description='Cantidad de favoritos de la canción')
+})
 
 # Definimos el modelo para la creación/actualización de un usuario
 usuario_input = api.model('UsuarioInput', {
@@ -51,6 +86,98 @@ favorito_input = api.model('FavoritoInput', {
     'id_cancion': fields.Integer(required=True, description='ID de la canción')
 })
 
+# Parámetros de la paginación por cursor que aceptan los listados
+parametros_paginacion = {
+    'limit': 'Cantidad máxima de elementos por página',
+    'after': 'Cursor opaco de la página anterior (cabecera X-Next-Cursor)',
+    'orden': 'Columna de ordenamiento; con prefijo "-" el orden es descendente'
+}
+
+# Parámetro de los campos a devolver (sparse fieldsets)
+parametros_campos = {
+    'fields': 'Campos a devolver separados por comas (por ejemplo, id,titulo,artista)'
+}
+
+# Parámetros de los endpoints de exportación
+parametros_exportacion = {
+    'formato': 'Formato de salida: ndjson (por defecto) o csv'
+}
+
+def leer_formato_exportacion():
+    """
+    Lee el formato de exportación solicitado, respondiendo 400 si no es válido.
+    """
+    formato = request.args.get('formato', 'ndjson')
+    if formato not in FORMATOS_EXPORTACION:
+        api.abort(400, f"Formato no soportado: '{formato}'. Opciones: {', '.join(FORMATOS_EXPORTACION)}")
+    return formato
+
+def leer_campos(serializador):
+    """
+    Lee el parámetro 'fields' y devuelve el serializador recortado a esos campos.
+    Responde 400 si se piden campos que el modelo no tiene.
+    """
+    texto = request.args.get('fields')
+    if texto is None:
+        return serializador
+    campos = [campo.strip() for campo in texto.split(',') if campo.strip()]
+    desconocidos = [campo for campo in campos if campo not in serializador.campos]
+    if not campos or desconocidos:
+        api.abort(400, f"Campos no soportados: '{texto}'. Opciones: {', '.join(serializador.campos)}")
+    return serializador.recortar(campos)
+
+def obtener_por_id(serializador, modelo, id, mensaje):
+    """
+    Lee un registro por su id seleccionando solo las columnas del serializador.
+    Responde 404 con el mensaje indicado si no existe.
+    """
+    try:
+        fila = db.session.query(*serializador.columnas).filter(modelo.id == id).first()
+    except Exception as e:
+        api.abort(500, f"Error interno del servidor: {str(e)}")
+    if fila is None:
+        api.abort(404, mensaje)
+    return respuesta_json(serializador.serializar(fila))
+
+# La búsqueda solo depende de las columnas del catálogo: marcar favoritos no la invalida
+@cacheado('busqueda', 'catalogo')
+def buscar_ids(q, titulo, artista, genero, limite):
+    """
+    Busca canciones y, si no hay coincidencias exactas, usa la búsqueda tolerante a errores.
+
+    Returns:
+        Una tupla (ids de las canciones en orden de relevancia, si se usó la búsqueda difusa).
+    """
+    canciones = buscar_canciones(q=q, titulo=titulo, artista=artista, genero=genero, limite=limite)
+    if canciones or genero or not (q or titulo or artista):
+        return [cancion.id for cancion in canciones], False
+
+    # Sin coincidencias exactas: probamos con la búsqueda tolerante a errores de tipeo
+    if q:
+        texto, campos = q, ('titulo', 'artista')
+    elif titulo and not artista:
+        texto, campos = titulo, ('titulo',)
+    elif artista and not titulo:
+        texto, campos = artista, ('artista',)
+    else:
+        texto, campos = f'{titulo} {artista}', ('titulo', 'artista')
+    similares = obtener_indice('trigramas').buscar(texto, campos=campos, limite=limite)
+    return [id for id, _ in similares], True
+
+def buscar_con_respaldo(q, titulo, artista, genero, limite):
+    """
+    Como buscar_ids(), pero devuelve las canciones como diccionarios.
+
+    Las filas se leen por clave primaria en cada petición, así total_favoritos
+    siempre está al día aunque los ids vengan de la caché.
+    """
+    ids, difusa = buscar_ids(q=q, titulo=titulo, artista=artista, genero=genero, limite=limite)
+    por_id = {cancion.id: cancion for cancion in Cancion.query.filter(Cancion.id.in_(ids))} if ids else {}
+    return [por_id[id].to_dict() for id in ids if id in por_id], difusa
+
+# El ranking tiene su propia versión: solo la cambian los favoritos que pueden mover el top
+obtener_populares = cacheado('populares', 'populares')(obtener_canciones_populares)
+
 # ----------------------------------------------------------------------------------------------------
 # Recursos para Autenticación
 # ----------------------------------------------------------------------------------------------------
@@ -61,6 +188,7 @@ class Registro(Resource):
     """
     @api.doc(description='Registrar un nuevo usuario en Remington Song')
     @api.expect(registro_model)
+    @api.response(503, 'Demasiadas operaciones de contraseña en curso')
     @api.marshal_with(usuario_model, code=201)
     def post(self):
         """
@@ -77,7 +205,7 @@ class Registro(Resource):
                 api.abort(409, f"El correo '{correo}' ya está registrado en Remington Song.")
 
             # Hash de la contraseña antes de guardarla
-            hashed_password = generate_password_hash(contraseña)
+            hashed_password = generar_hash(contraseña)
 
             nuevo_usuario = Usuario(
                 nombre=nombre,
@@ -89,6 +217,8 @@ class Registro(Resource):
             db.session.commit()
             
             return nuevo_usuario.to_dict(), 201
+        except ColaHashLlena as e:
+            api.abort(503, str(e))
         except Exception as e:
             api.abort(500, f"Error interno del servidor: {str(e)}")
 
@@ -99,6 +229,7 @@ class Login(Resource):
     """
     @api.doc(description='Iniciar sesión en Remington Song y obtener un token de acceso')
     @api.expect(auth_model)
+    @api.response(503, 'Demasiadas operaciones de contraseña en curso')
     @api.marshal_with(token_model)
     def post(self):
         """
@@ -111,7 +242,7 @@ class Login(Resource):
 
             usuario = Usuario.query.filter_by(correo=correo).first()
 
-            if not usuario or not check_password_hash(usuario.contraseña, contraseña):
+            if not usuario or not verificar_contraseña(usuario.contraseña, contraseña):
                 api.abort(401, "Credenciales inválidas para Remington Song.")
 
             access_token = create_access_token(identity=correo)
@@ -119,6 +250,8 @@ class Login(Resource):
                 'access_token': access_token,
                 'message': f'¡Bienvenido a Remington Song, {usuario.nombre}!'
             }
+        except ColaHashLlena as e:
+            api.abort(503, str(e))
         except Exception as e:
             api.abort(500, f"Error interno del servidor: {str(e)}")
 
@@ -130,21 +263,31 @@ class UsuarioList(Resource):
     """
     Recurso para listar y crear usuarios en Remington Song.
     """
-    @api.doc(description='Listar todos los usuarios de Remington Song')
-    @api.marshal_list_with(usuario_model)
+    @api.doc(description='Listar los usuarios de Remington Song (paginado por cursor)',
+             params=dict(parametros_paginacion, **parametros_campos))
+    @condicional('usuario', autenticado=True)
+    @api.response(200, 'Éxito', [usuario_model])
     @jwt_required()
     def get(self):
         """
-        Listar todos los usuarios de Remington Song.
+        Listar los usuarios de Remington Song, una página a la vez.
         """
         try:
-            usuarios = Usuario.query.all()
-            return [usuario.to_dict() for usuario in usuarios]
+            limite, orden, despues = leer_parametros(Usuario, ('id', 'fecha_registro'))
+        except CursorInvalido as e:
+            api.abort(400, str(e))
+        serializador = leer_campos(serializador_usuario)
+
+        try:
+            query = db.session.query(*serializador.columnas_con('id', orden.lstrip('-')))
+            usuarios, siguiente = paginar(query, Usuario, orden, limite, despues)
+            return respuesta_json(serializador.serializar_filas(usuarios), 200, cabeceras_paginacion(siguiente))
         except Exception as e:
             api.abort(500, f"Error interno del servidor: {str(e)}")
 
     @api.doc(description='Crear un nuevo usuario en Remington Song')
     @api.expect(usuario_input)
+    @api.response(503, 'Demasiadas operaciones de contraseña en curso')
     @api.marshal_with(usuario_model)
     def post(self):
         """
@@ -158,7 +301,7 @@ class UsuarioList(Resource):
                 api.abort(409, f"El correo '{data['correo']}' ya está registrado.")
             
             # Hash de la contraseña antes de guardarla
-            hashed_password = generate_password_hash(data['contraseña'])
+            hashed_password = generar_hash(data['contraseña'])
             
             nuevo_usuario = Usuario(
                 nombre=data['nombre'],
@@ -170,6 +313,8 @@ class UsuarioList(Resource):
             db.session.commit()
             
             return nuevo_usuario.to_dict(), 201
+        except ColaHashLlena as e:
+            api.abort(503, str(e))
         except Exception as e:
             api.abort(500, f"Error interno del servidor: {str(e)}")
 
@@ -178,21 +323,19 @@ class UsuarioResource(Resource):
     """
     Recurso para obtener, actualizar y eliminar un usuario específico.
     """
-    @api.doc(description='Obtener un usuario por su ID')
-    @api.marshal_with(usuario_model)
+    @api.doc(description='Obtener un usuario por su ID', params=parametros_campos)
+    @condicional('usuario', autenticado=True)
+    @api.response(200, 'Éxito', usuario_model)
     @jwt_required()
     def get(self, id):
         """
         Obtener un usuario por su ID.
         """
-        try:
-            usuario = Usuario.query.get_or_404(id)
-            return usuario.to_dict()
-        except Exception as e:
-            api.abort(500, f"Error interno del servidor: {str(e)}")
+        return obtener_por_id(leer_campos(serializador_usuario), Usuario, id, "Usuario no encontrado")
 
     @api.doc(description='Actualizar un usuario por su ID')
     @api.expect(usuario_input)
+    @api.response(503, 'Demasiadas operaciones de contraseña en curso')
     @api.marshal_with(usuario_model)
     @jwt_required()
     def put(self, id):
@@ -208,10 +351,12 @@ class UsuarioResource(Resource):
             
             # Hash de la contraseña antes de guardarla si se proporciona una nueva contraseña
             if 'contraseña' in data:
-                usuario.contraseña = generate_password_hash(data['contraseña'])
+                usuario.contraseña = generar_hash(data['contraseña'])
             
             db.session.commit()
             return usuario.to_dict()
+        except ColaHashLlena as e:
+            api.abort(503, str(e))
         except Exception as e:
             api.abort(500, f"Error interno del servidor: {str(e)}")
 
@@ -230,6 +375,55 @@ class UsuarioResource(Resource):
         except Exception as e:
             api.abort(500, f"Error interno del servidor: {str(e)}")
 
+@api.route('/usuarios/<int:id>/estadisticas')
+class UsuarioEstadisticas(Resource):
+    """
+    Recurso para obtener las estadísticas de favoritos de un usuario.
+    """
+    @api.doc(description='Obtener las estadísticas de favoritos de un usuario')
+    @condicional('usuario', 'favorito', 'cancion', autenticado=True)
+    @api.marshal_with(estadisticas_model)
+    @jwt_required()
+    def get(self, id):
+        """
+        Obtener las estadísticas de favoritos de un usuario.
+        """
+        try:
+            estadisticas = calcular_estadisticas_usuarios([id]).get(id)
+        except Exception as e:
+            api.abort(500, f"Error interno del servidor: {str(e)}")
+
+        if estadisticas is None:
+            api.abort(404, f"El usuario {id} no existe en Remington Song.")
+        return dict(estadisticas, id_usuario=id)
+
+@api.route('/usuarios/estadisticas')
+class UsuarioEstadisticasLote(Resource):
+    """
+    Recurso para obtener las estadísticas de muchos usuarios en una sola petición.
+    """
+    @api.doc(description='Obtener las estadísticas de favoritos de varios usuarios a la vez')
+    @api.expect(estadisticas_lote_model)
+    @api.marshal_list_with(estadisticas_model)
+    @jwt_required()
+    @solo_lectura
+    def post(self):
+        """
+        Obtener las estadísticas de favoritos de varios usuarios a la vez.
+        """
+        data = request.get_json() or {}
+        ids = data.get('ids')
+        if not isinstance(ids, list) or not all(isinstance(id, int) for id in ids):
+            api.abort(400, "Se espera una lista 'ids' de números enteros.")
+        if len(ids) > current_app.config.get('LIMITE_ESTADISTICAS_LOTE', 10000):
+            api.abort(400, "Demasiados usuarios en una sola petición.")
+
+        try:
+            estadisticas = calcular_estadisticas_usuarios(ids)
+            return [dict(datos, id_usuario=id) for id, datos in estadisticas.items()]
+        except Exception as e:
+            api.abort(500, f"Error interno del servidor: {str(e)}")
+
 # ----------------------------------------------------------------------------------------------------
 # Recursos para Canciones
 # ----------------------------------------------------------------------------------------------------
@@ -238,15 +432,24 @@ class CancionList(Resource):
     """
     Recurso para listar y crear canciones en Remington Song.
     """
-    @api.doc(description='Listar todas las canciones de Remington Song')
-    @api.marshal_list_with(cancion_model)
+    @api.doc(description='Listar las canciones de Remington Song (paginado por cursor)',
+             params=dict(parametros_paginacion, **parametros_campos))
+    @condicional('cancion')
+    @api.response(200, 'Éxito', [cancion_model])
     def get(self):
         """
-        Listar todas las canciones de Remington Song.
+        Listar las canciones de Remington Song, una página a la vez.
         """
         try:
-            canciones = Cancion.query.all()
-            return [cancion.to_dict() for cancion in canciones]
+            limite, orden, despues = leer_parametros(Cancion, ('id', 'fecha_creacion'))
+        except CursorInvalido as e:
+            api.abort(400, str(e))
+        serializador = leer_campos(serializador_cancion)
+
+        try:
+            query = db.session.query(*serializador.columnas_con('id', orden.lstrip('-')))
+            canciones, siguiente = paginar(query, Cancion, orden, limite, despues)
+            return respuesta_json(serializador.serializar_filas(canciones), 200, cabeceras_paginacion(siguiente))
         except Exception as e:
             api.abort(500, f"Error interno del servidor: {str(e)}")
 
@@ -279,17 +482,14 @@ class CancionResource(Resource):
     """
     Recurso para obtener, actualizar y eliminar una canción específica.
     """
-    @api.doc(description='Obtener una canción por su ID')
-    @api.marshal_with(cancion_model)
+    @api.doc(description='Obtener una canción por su ID', params=parametros_campos)
+    @condicional('cancion')
+    @api.response(200, 'Éxito', cancion_model)
     def get(self, id):
         """
         Obtener una canción por su ID.
         """
-        try:
-            cancion = Cancion.query.get_or_404(id)
-            return cancion.to_dict()
-        except Exception as e:
-            api.abort(500, f"Error interno del servidor: {str(e)}")
+        return obtener_por_id(leer_campos(serializador_cancion), Cancion, id, "Canción no encontrada")
 
     @api.doc(description='Actualizar una canción por su ID')
     @api.expect(cancion_input)
@@ -333,32 +533,156 @@ class CancionBuscar(Resource):
     """
     Recurso para buscar canciones en Remington Song.
     """
-    @api.doc(description='Buscar canciones por título, artista o género')
+    @api.doc(description='Buscar canciones por título, artista o género (ordenadas por relevancia)',
+             params=dict({'limit': 'Cantidad máxima de resultados'}, **parametros_campos))
     @api.expect(busqueda_model)
-    @api.marshal_list_with(cancion_model)
+    @condicional('cancion')
+    @api.response(200, 'Éxito', [cancion_model])
     def get(self):
         """
         Buscar canciones por título, artista o género.
         """
         try:
-            titulo = request.args.get('titulo', '')
-            artista = request.args.get('artista', '')
-            genero = request.args.get('genero', '')
-            
-            query = Cancion.query
-            
-            if titulo:
-                query = query.filter(Cancion.titulo.contains(titulo))
-            if artista:
-                query = query.filter(Cancion.artista.contains(artista))
-            if genero:
-                query = query.filter(Cancion.genero.contains(genero))
-            
-            canciones = query.all()
-            return [cancion.to_dict() for cancion in canciones]
+            limite = int(request.args.get('limit', current_app.config.get('LIMITE_BUSQUEDA_DEFECTO', 20)))
+        except ValueError:
+            api.abort(400, "El parámetro 'limit' debe ser un número entero")
+        limite = max(1, min(limite, current_app.config.get('LIMITE_PAGINA_MAXIMO', 500)))
+        serializador = leer_campos(serializador_cancion)
+
+        try:
+            canciones, difusa = buscar_con_respaldo(
+                q=request.args.get('q', ''),
+                titulo=request.args.get('titulo', ''),
+                artista=request.args.get('artista', ''),
+                genero=request.args.get('genero', ''),
+                limite=limite
+            )
+            if serializador is not serializador_cancion:
+                # Se leen las canciones completas; aquí solo recortamos la respuesta
+                canciones = [serializador.recortar_dict(cancion) for cancion in canciones]
+            return respuesta_json(canciones, 200, {'X-Busqueda-Difusa': '1'} if difusa else None)
+        except Exception as e:
+            api.abort(500, f"Error interno del servidor: {str(e)}")
+
+@api.route('/canciones/bulk')
+class CancionCargaMasiva(Resource):
+    """
+    Recurso para cargar muchas canciones en una sola petición.
+    """
+    @api.doc(description='Cargar canciones en bloque desde un JSON array o NDJSON (se lee en streaming)')
+    @api.expect([cancion_input])
+    @api.marshal_with(reporte_carga_model)
+    def post(self):
+        """
+        Cargar canciones en bloque.
+        """
+        try:
+            reporte = ingerir_canciones(
+                iterar_objetos_json(request.stream),
+                tamaño_lote=current_app.config.get('CARGA_TAMAÑO_LOTE', 1000),
+                lotes_por_transaccion=current_app.config.get('CARGA_LOTES_POR_TRANSACCION', 10)
+            )
+        except Exception:
+            # El mensaje de la excepción puede traer el SQL y los datos de la carga
+            logger.exception("Falló la carga masiva de canciones")
+            db.session.rollback()
+            api.abort(500, "Error interno del servidor")
+
+        if 'error_base_datos' in reporte:
+            codigo = 500
+        elif 'error_formato' in reporte:
+            codigo = 400
+        else:
+            codigo = 200
+        return reporte, codigo
+
+@api.route('/canciones/populares')
+class CancionPopulares(Resource):
+    """
+    Recurso para obtener las canciones con más favoritos.
+    """
+    @api.doc(description='Listar las canciones con más favoritos de Remington Song',
+             params=dict({'limit': 'Cantidad de canciones a devolver'}, **parametros_campos))
+    @condicional('populares')
+    @api.response(200, 'Éxito', [popular_model])
+    def get(self):
+        """
+        Listar las canciones con más favoritos.
+        """
+        try:
+            limite = int(request.args.get('limit', 10))
+        except ValueError:
+            api.abort(400, "El parámetro 'limit' debe ser un número entero")
+        limite = max(1, min(limite, current_app.config.get('LIMITE_PAGINA_MAXIMO', 500)))
+        serializador = leer_campos(serializador_cancion)
+
+        try:
+            populares = obtener_populares(limite=limite)
+            if serializador is not serializador_cancion:
+                populares = [
+                    {'cancion': serializador.recortar_dict(popular['cancion']), 'total_favoritos': popular['total_favoritos']}
+                    for popular in populares
+                ]
+            return respuesta_json(populares)
+        except Exception as e:
+            api.abort(500, f"Error interno del servidor: {str(e)}")
+
+@api.route('/canciones/cache')
+class CancionCache(Resource):
+    """
+    Recurso para consultar el estado de la caché de búsquedas y populares.
+    """
+    @api.doc(description='Ver los aciertos, fallos y tamaño de la caché de resultados')
+    @api.marshal_with(estadisticas_cache_model)
+    @jwt_required()
+    def get(self):
+        """
+        Ver las estadísticas de la caché de resultados.
+        """
+        cache = obtener_cache()
+        if cache is None:
+            api.abort(404, "La caché de resultados está desactivada")
+        return cache.estadisticas()
+
+@api.route('/canciones/sugerir')
+class CancionSugerir(Resource):
+    """
+    Recurso para autocompletar títulos y artistas mientras el usuario escribe.
+    """
+    @api.doc(description='Sugerir títulos y artistas que empiezan por un prefijo (ordenados por favoritos)',
+             params={'q': 'Prefijo escrito por el usuario', 'limit': 'Cantidad máxima de sugerencias'})
+    @condicional('cancion')
+    @api.marshal_list_with(sugerencia_model)
+    def get(self):
+        """
+        Sugerir títulos y artistas que empiezan por un prefijo.
+        """
+        try:
+            limite = int(request.args.get('limit', current_app.config.get('LIMITE_SUGERENCIAS', 10)))
+        except ValueError:
+            api.abort(400, "El parámetro 'limit' debe ser un número entero")
+        limite = max(1, min(limite, current_app.config.get('LIMITE_PAGINA_MAXIMO', 500)))
+
+        try:
+            return obtener_indice('sugerencias').sugerir(request.args.get('q', ''), limite)
         except Exception as e:
             api.abort(500, f"Error interno del servidor: {str(e)}")
 
+@api.route('/canciones/export')
+class CancionExportar(Resource):
+    """
+    Recurso para exportar el catálogo completo de canciones en streaming.
+    """
+    @api.doc(description='Exportar todas las canciones en streaming (NDJSON o CSV)',
+             params=parametros_exportacion)
+    @api.produces(list(FORMATOS_EXPORTACION.values()))
+    def get(self):
+        """
+        Exportar todas las canciones en streaming.
+        """
+        formato = leer_formato_exportacion()
+        return respuesta_exportacion(Cancion.__table__, formato, 'canciones')
+
 # ----------------------------------------------------------------------------------------------------
 # Recursos para Favoritos
 # ----------------------------------------------------------------------------------------------------
@@ -367,15 +691,24 @@ class FavoritoList(Resource):
     """
     Recurso para listar y crear favoritos en Remington Song.
     """
-    @api.doc(description='Listar todos los favoritos de Remington Song')
-    @api.marshal_list_with(favorito_model)
+    @api.doc(description='Listar los favoritos de Remington Song (paginado por cursor)',
+             params=dict(parametros_paginacion, **parametros_campos))
+    @condicional('favorito')
+    @api.response(200, 'Éxito', [favorito_model])
     def get(self):
         """
-        Listar todos los favoritos de Remington Song.
+        Listar los favoritos de Remington Song, una página a la vez.
         """
         try:
-            favoritos = Favorito.query.all()
-            return [favorito.to_dict() for favorito in favoritos]
+            limite, orden, despues = leer_parametros(Favorito, ('id', 'fecha_marcado'))
+        except CursorInvalido as e:
+            api.abort(400, str(e))
+        serializador = leer_campos(serializador_favorito)
+
+        try:
+            query = db.session.query(*serializador.columnas_con('id', orden.lstrip('-')))
+            favoritos, siguiente = paginar(query, Favorito, orden, limite, despues)
+            return respuesta_json(serializador.serializar_filas(favoritos), 200, cabeceras_paginacion(siguiente))
         except Exception as e:
             api.abort(500, f"Error interno del servidor: {str(e)}")
 
@@ -414,17 +747,14 @@ class FavoritoResource(Resource):
     """
     Recurso para obtener y eliminar un favorito específico.
     """
-    @api.doc(description='Obtener un favorito por su ID')
-    @api.marshal_with(favorito_model)
+    @api.doc(description='Obtener un favorito por su ID', params=parametros_campos)
+    @condicional('favorito')
+    @api.response(200, 'Éxito', favorito_model)
     def get(self, id):
         """
         Obtener un favorito por su ID.
         """
-        try:
-            favorito = Favorito.query.get_or_404(id)
-            return favorito.to_dict()
-        except Exception as e:
-            api.abort(500, f"Error interno del servidor: {str(e)}")
+        return obtener_por_id(leer_campos(serializador_favorito), Favorito, id, "Favorito no encontrado")
 
     @api.doc(description='Eliminar un favorito por su ID')
     @api.response(204, 'Favorito eliminado')
@@ -440,21 +770,78 @@ class FavoritoResource(Resource):
         except Exception as e:
             api.abort(500, f"Error interno del servidor: {str(e)}")
 
+@api.route('/favoritos/export')
+class FavoritoExportar(Resource):
+    """
+    Recurso para exportar todos los favoritos en streaming.
+    """
+    @api.doc(description='Exportar todos los favoritos en streaming (NDJSON o CSV)',
+             params=parametros_exportacion)
+    @api.produces(list(FORMATOS_EXPORTACION.values()))
+    def get(self):
+        """
+        Exportar todos los favoritos en streaming.
+        """
+        formato = leer_formato_exportacion()
+        return respuesta_exportacion(Favorito.__table__, formato, 'favoritos')
+
 @api.route('/usuarios/<int:id>/favoritos')
 class UsuarioFavoritosList(Resource):
     """
     Recurso para listar los favoritos de un usuario específico.
     """
-    @api.doc(description='Listar los favoritos de un usuario')
-    @api.marshal_list_with(favorito_model)
+    @api.doc(description='Listar los favoritos de un usuario (paginado por cursor)',
+             params=dict(parametros_paginacion, **parametros_campos))
+    @condicional('usuario', 'favorito')
+    @api.response(200, 'Éxito', [favorito_model])
     def get(self, id):
         """
-        Listar los favoritos de un usuario.
+        Listar los favoritos de un usuario, una página a la vez.
         """
+        try:
+            limite, orden, despues = leer_parametros(Favorito, ('id', 'fecha_marcado'))
+        except CursorInvalido as e:
+            api.abort(400, str(e))
+        serializador = leer_campos(serializador_favorito)
+
         try:
             usuario = Usuario.query.get_or_404(id)
-            return [favorito.to_dict() for favorito in usuario.favoritos]
+            query = db.session.query(*serializador.columnas_con('id', orden.lstrip('-')))
+            query = query.filter(Favorito.id_usuario == usuario.id)
+            favoritos, siguiente = paginar(query, Favorito, orden, limite, despues)
+            return respuesta_json(serializador.serializar_filas(favoritos), 200, cabeceras_paginacion(siguiente))
+        except Exception as e:
+            api.abort(500, f"Error interno del servidor: {str(e)}")
+
+@api.route('/usuarios/<int:id_usuario>/favoritos/lote')
+class UsuarioFavoritosLote(Resource):
+    """
+    Recurso para agregar y quitar muchos favoritos de un usuario en una sola petición.
+    """
+    @api.doc(description='Agregar y quitar varios favoritos de un usuario en una sola transacción')
+    @api.expect(favoritos_lote_model)
+    @api.marshal_with(resultado_favoritos_lote_model)
+    def post(self, id_usuario):
+        """
+        Agregar y quitar varios favoritos de un usuario.
+        """
+        data = request.get_json() or {}
+        agregar = data.get('agregar', [])
+        eliminar = data.get('eliminar', [])
+        for lista in (agregar, eliminar):
+            if not isinstance(lista, list) or not all(isinstance(id, int) for id in lista):
+                api.abort(400, "'agregar' y 'eliminar' deben ser listas de números enteros.")
+        if set(agregar) & set(eliminar):
+            api.abort(400, "Una canción no puede estar en 'agregar' y en 'eliminar' a la vez.")
+        if len(agregar) + len(eliminar) > current_app.config.get('LIMITE_FAVORITOS_LOTE', 10000):
+            api.abort(400, "Demasiadas canciones en una sola petición.")
+        if db.session.get(Usuario, id_usuario) is None:
+            api.abort(404, f"El usuario {id_usuario} no existe en Remington Song.")
+
+        try:
+            return aplicar_lote_favoritos(id_usuario, agregar, eliminar)
         except Exception as e:
+            db.session.rollback()
             api.abort(500, f"Error interno del servidor: {str(e)}")
 
 @api.route('/usuarios/<int:id_usuario>/favoritos/<int:id_cancion>')
@@ -474,4 +861,38 @@ class UsuarioCancionFavoritoResource(Resource):
             cancion = Cancion.query.get_or_404(id_cancion)
             
             # Verificar que no exista ya este favorito
-            favorito_existente
\ No newline at end of file
+            favorito_existente = Favorito.query.filter_by(
+                id_usuario=usuario.id,
+                id_cancion=cancion.id
+            ).first()
+            
+            if favorito_existente:
+                api.abort(409, "Esta canción ya está en los favoritos del usuario.")
+            
+            nuevo_favorito = Favorito(
+                id_usuario=usuario.id,
+                id_cancion=cancion.id,
+                fecha_marcado=datetime.utcnow()
+            )
+            db.session.add(nuevo_favorito)
+            db.session.commit()
+            return nuevo_favorito.to_dict(), 201
+        except Exception as e:
+            api.abort(500, f"Error interno del servidor: {str(e)}")
+
+    @api.doc(description='Desmarcar una canción como favorita para un usuario')
+    @api.response(204, 'Favorito eliminado')
+    def delete(self, id_usuario, id_cancion):
+        """
+        Desmarcar una canción como favorita para un usuario.
+        """
+        try:
+            favorito = Favorito.query.filter_by(
+                id_usuario=id_usuario,
+                id_cancion=id_cancion
+            ).first_or_404()
+            db.session.delete(favorito)
+            db.session.commit()
+            return '', 204
+        except Exception as e:
+            api.abort(500, f"Error interno del servidor: {str(e)}")
@@ -0,0 +1,94 @@
+"""
+¡Aquí definimos el hash de contraseñas de Remington Song! 🔐
+Calcular y verificar un hash es trabajo de CPU a propósito (cuanto más caro,
+más difícil es atacarlo). Para que una ola de logins no deje sin CPU a las
+demás peticiones, ese trabajo se hace en un pool de procesos acotado:
+
+- HASH_METODO elige el algoritmo y su factor de trabajo.
+- HASH_PROCESOS fija cuántos procesos calculan hashes (0 = en el mismo hilo).
+- HASH_COLA_MAXIMA limita cuántos hashes pueden esperar a la vez; si la cola
+  está llena respondemos 503 enseguida en lugar de acumular peticiones.
+
+Los procesos se crean con 'spawn', así que cada uno importa el script
+principal una vez al arrancar (app.py solo crea la app; el servidor queda
+protegido por if __name__ == "__main__").
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class ColaHashLlena(Exception):
+    """
+    Error que se lanza cuando hay demasiados hashes esperando en la cola.
+    """
+
+class ServicioHash:
+    """
+    Calcula y verifica hashes de contraseñas en un pool de procesos acotado.
+    """
+    def __init__(self, metodo, procesos, cola_maxima, tiempo_maximo):
+        self.metodo = metodo
+        self.procesos = procesos
+        self.tiempo_maximo = tiempo_maximo
+        self._cupos = threading.BoundedSemaphore(cola_maxima)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _obtener_pool(self):
+        # El pool se crea en el primer uso: cada worker del servidor tiene el suyo
+        # y los comandos de la CLI no lanzan procesos que no van a usar.
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.procesos,
+                    mp_context=multiprocessing.get_context('spawn')  # fork no es seguro con hilos
+                )
+            return self._pool
+
+    def _ejecutar(self, funcion, *args):
+        if not self.procesos:
+            return funcion(*args)
+        if not self._cupos.acquire(blocking=False):
+            raise ColaHashLlena("Hay demasiadas operaciones de contraseña en curso, intenta de nuevo en unos segundos")
+        try:
+            futuro = self._obtener_pool().submit(funcion, *args)
+        except Exception:
+            self._cupos.release()
+            raise
+        futuro.add_done_callback(lambda _: self._cupos.release())
+        return futuro.result(timeout=self.tiempo_maximo)
+
+    def generar(self, contraseña):
+        """Devuelve el hash de una contraseña con el método configurado."""
+        return self._ejecutar(generate_password_hash, contraseña, self.metodo)
+
+    def verificar(self, hash_guardado, contraseña):
+        """Indica si la contraseña corresponde al hash guardado."""
+        return self._ejecutar(check_password_hash, hash_guardado, contraseña)
+
+    def cerrar(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+def registrar_hash(app):
+    """
+    Crea el servicio de hash de contraseñas según la configuración.
+    """
+    app.extensions['remington_song_hash'] = ServicioHash(
+        metodo=app.config.get('HASH_METODO', 'scrypt'),
+        procesos=app.config.get('HASH_PROCESOS', 2),
+        cola_maxima=app.config.get('HASH_COLA_MAXIMA', 64),
+        tiempo_maximo=app.config.get('HASH_TIEMPO_MAXIMO', 10)
+    )
+
+def generar_hash(contraseña):
+    """Calcula el hash de una contraseña (fuera del hilo de la petición)."""
+    return current_app.extensions['remington_song_hash'].generar(contraseña)
+
+def verificar_contraseña(hash_guardado, contraseña):
+    """Verifica una contraseña contra su hash (fuera del hilo de la petición)."""
+    return current_app.extensions['remington_song_hash'].verificar(hash_guardado, contraseña)
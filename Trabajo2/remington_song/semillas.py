@@ -0,0 +1,185 @@
+"""
+¡Aquí generamos datos sintéticos para Remington Song! 🌱
+Sirven para pruebas de carga y para planificar capacidad: millones de
+canciones, cientos de miles de usuarios y favoritos con una popularidad
+realista (distribución de Zipf: pocas canciones concentran la mayoría de
+los favoritos).
+
+- Todo sale de un generador aleatorio con semilla: la misma semilla produce
+  exactamente los mismos datos.
+- Las filas se insertan con executemany de SQLAlchemy Core, por lotes.
+- Todos los usuarios comparten un mismo hash de contraseña, calculado una
+  sola vez (calcular uno por usuario tardaría horas con scrypt).
+"""
+import math
+import random
+import time
+from array import array
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+from .extensions import db
+from .models import Usuario, Cancion, Favorito
+from .contadores import recontar_favoritos
+from .condicional import tocar_tablas
+from .indices import invalidar_indices
+from utils import GENEROS_MUSICALES
+
+# Palabras de los títulos (las búsquedas de las pruebas de carga usan las mismas)
+PALABRAS = [
+    'amor', 'noche', 'fuego', 'corazon', 'luna', 'sol', 'camino', 'sueño', 'mar', 'cielo',
+    'ciudad', 'baile', 'tiempo', 'libre', 'rio', 'viento', 'estrella', 'sombra', 'lluvia', 'verano'
+]
+FECHA_REFERENCIA = datetime(2025, 1, 1)  # Fija, para que las fechas no dependan del día en que se siembra
+SEGUNDOS_HISTORIA = 3 * 365 * 24 * 3600  # Las fechas se reparten en los tres años anteriores
+# Con más canciones nuevas que esto es más barato recontar todas que armar un IN enorme
+LIMITE_RECONTEO_PARCIAL = 10000
+
+def _fecha(azar):
+    return FECHA_REFERENCIA - timedelta(seconds=azar.randrange(SEGUNDOS_HISTORIA))
+
+def generar_canciones(cantidad, azar):
+    """Genera canciones con géneros de utils.GENEROS_MUSICALES."""
+    for _ in range(cantidad):
+        yield {
+            'titulo': ' '.join(azar.sample(PALABRAS, azar.randint(2, 4))),
+            'artista': f'Artista {azar.randint(1, max(1, cantidad // 20))}',
+            'album': f'Álbum {azar.randint(1, max(1, cantidad // 8))}',
+            'duracion': azar.randint(60, 600),
+            'año': azar.randint(1950, 2024),
+            'genero': azar.choice(GENEROS_MUSICALES),
+            'fecha_creacion': _fecha(azar)
+        }
+
+def generar_usuarios(cantidad, hash_contraseña, azar, desde=0):
+    """Genera usuarios con correos únicos (usuario<n>@semilla.remington.song)."""
+    for numero in range(desde, desde + cantidad):
+        yield {
+            'nombre': f'Usuario {numero}',
+            'correo': f'usuario{numero}@semilla.remington.song',
+            'contraseña': hash_contraseña,
+            'fecha_registro': _fecha(azar)
+        }
+
+class DistribucionZipf:
+    """
+    Elige canciones con probabilidad proporcional a 1 / rango^exponente.
+
+    El rango más popular no es el id más bajo: los rangos se reparten entre
+    los ids con un salto coprimo con la cantidad de canciones.
+    """
+    def __init__(self, ids, exponente):
+        self.ids = ids
+        cantidad = len(ids)
+        acumulado, total = array('d'), 0.0
+        for rango in range(1, cantidad + 1):
+            total += rango ** -exponente
+            acumulado.append(total)
+        self._acumulado = acumulado
+        self._rangos = range(cantidad)
+        self._salto = next(salto for salto in range(max(2, cantidad // 3 + 1), 2 * cantidad + 3)
+                           if math.gcd(salto, cantidad) == 1)
+
+    def elegir(self, azar, cantidad):
+        """Devuelve 'cantidad' ids elegidos (puede haber repetidos)."""
+        rangos = azar.choices(self._rangos, cum_weights=self._acumulado, k=cantidad)
+        return [self.ids[rango * self._salto % len(self.ids)] for rango in rangos]
+
+def generar_favoritos(ids_usuarios, ids_canciones, promedio, exponente, azar):
+    """
+    Genera favoritos únicos por usuario: la cantidad por usuario sigue una
+    exponencial con media 'promedio' y las canciones salen de una Zipf.
+    """
+    zipf = DistribucionZipf(ids_canciones, exponente)
+    maximo = len(ids_canciones)
+    for id_usuario in ids_usuarios:
+        objetivo = min(maximo, max(1, round(azar.expovariate(1 / promedio)))) if promedio else 0
+        elegidas = set()
+        intentos = 0
+        while len(elegidas) < objetivo and intentos < 10:
+            elegidas.update(zipf.elegir(azar, objetivo - len(elegidas)))
+            intentos += 1
+        for id_cancion in sorted(elegidas):
+            yield {'id_usuario': id_usuario, 'id_cancion': id_cancion, 'fecha_marcado': _fecha(azar)}
+
+def insertar_por_lotes(tabla, filas, tamaño_lote, lotes_por_transaccion):
+    """Inserta las filas con executemany, confirmando cada pocos lotes. Devuelve cuántas insertó."""
+    insertadas, lote, lotes = 0, [], 0
+    sentencia = insert(tabla)
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamaño_lote:
+            db.session.execute(sentencia, lote)
+            insertadas += len(lote)
+            lote, lotes = [], lotes + 1
+            if lotes % lotes_por_transaccion == 0:
+                db.session.commit()
+    if lote:
+        db.session.execute(sentencia, lote)
+        insertadas += len(lote)
+    db.session.commit()
+    return insertadas
+
+def _ids_nuevos(modelo, anterior):
+    """Ids de las filas insertadas después de 'anterior' (el id máximo previo)."""
+    return [fila[0] for fila in db.session.execute(
+        select(modelo.id).where(modelo.id > anterior).order_by(modelo.id))]
+
+def sembrar(canciones, usuarios, favoritos_promedio, exponente_zipf=1.1, semilla=42,
+            contraseña='remington', metodo_hash=None, tamaño_lote=10000, lotes_por_transaccion=10):
+    """
+    Genera e inserta canciones, usuarios y favoritos.
+
+    Los favoritos se reparten entre los usuarios y canciones creados en esta
+    misma llamada, así que se puede sembrar sobre una base que ya tiene datos.
+    Después hay que llamar a completar_siembra().
+
+    Returns:
+        Un diccionario con las filas insertadas por tabla, los segundos de cada
+        etapa y los ids de las canciones creadas ('ids_canciones').
+    """
+    azar = random.Random(semilla)
+    reporte = {}
+    inicio = time.perf_counter()
+
+    anterior = db.session.scalar(select(func.coalesce(func.max(Cancion.id), 0)))
+    reporte['canciones'] = insertar_por_lotes(
+        Cancion.__table__, generar_canciones(canciones, azar), tamaño_lote, lotes_por_transaccion)
+    ids_canciones = _ids_nuevos(Cancion, anterior)
+    reporte['segundos_canciones'] = round(time.perf_counter() - inicio, 2)
+
+    etapa = time.perf_counter()
+    hash_contraseña = generate_password_hash(contraseña, metodo_hash) if metodo_hash else generate_password_hash(contraseña)
+    anterior = db.session.scalar(select(func.coalesce(func.max(Usuario.id), 0)))
+    reporte['usuarios'] = insertar_por_lotes(
+        Usuario.__table__, generar_usuarios(usuarios, hash_contraseña, azar, desde=anterior),
+        tamaño_lote, lotes_por_transaccion)
+    ids_usuarios = _ids_nuevos(Usuario, anterior)
+    reporte['segundos_usuarios'] = round(time.perf_counter() - etapa, 2)
+
+    etapa = time.perf_counter()
+    reporte['favoritos'] = insertar_por_lotes(
+        Favorito.__table__,
+        generar_favoritos(ids_usuarios, ids_canciones, favoritos_promedio, exponente_zipf, azar)
+        if ids_canciones else (),
+        tamaño_lote, lotes_por_transaccion)
+    reporte['segundos_favoritos'] = round(time.perf_counter() - etapa, 2)
+
+    reporte['ids_canciones'] = ids_canciones
+    reporte['segundos'] = round(time.perf_counter() - inicio, 2)
+    return reporte
+
+def completar_siembra(ids_canciones=None):
+    """
+    Recalcula contadores, versiones e índices después de sembrar.
+
+    Las inserciones por Core no pasan por los eventos del ORM. Hay que
+    llamarla fuera de modo_carga_rapida(): sin el índice de favorito.id_cancion
+    recontar los favoritos recorrería la tabla una vez por canción.
+    """
+    if ids_canciones is not None and len(ids_canciones) >= LIMITE_RECONTEO_PARCIAL:
+        ids_canciones = None
+    recontar_favoritos(db.session, ids_canciones)
+    tocar_tablas(db.session, 'usuario', 'cancion', 'catalogo', 'favorito', 'populares')
+    db.session.commit()
+    invalidar_indices()
@@ -0,0 +1,111 @@
+"""
+¡Aquí definimos la serialización rápida de Remington Song! ⚡
+Para los listados grandes no pasamos por los objetos del ORM, ni por to_dict()
+ni por marshal_with: leemos filas de SQLAlchemy Core con solo las columnas del
+modelo de la API y las convertimos con una función generada una sola vez por
+modelo. El JSON se escribe con orjson si está instalado.
+
+La documentación Swagger sigue saliendo de api_models.py: los serializadores
+se construyen a partir de esos mismos diccionarios de campos.
+"""
+import json
+from flask import Response
+from flask_restx import fields
+
+try:
+    import orjson  # Opcional: varias veces más rápido que json
+except ImportError:
+    orjson = None
+
+def _fecha_iso(valor):
+    """Convierte una fecha a texto ISO 8601 (igual que to_dict)."""
+    return valor.isoformat() if valor is not None else None
+
+class Serializador:
+    """
+    Serializador compilado para un modelo de la API y una tabla.
+
+    Attributes:
+        columnas: Las columnas que hay que seleccionar, en el orden que espera serializar.
+        serializar: Función que convierte una fila (tupla o Row) en diccionario.
+    """
+    def __init__(self, tabla, campos):
+        """
+        Args:
+            tabla: La tabla de SQLAlchemy de la que se leen las filas.
+            campos: El diccionario de campos de api_models.py.
+        """
+        self.tabla = tabla
+        self.definicion = dict(campos)
+        self.campos = tuple(campos)
+        self.columnas = [tabla.c[nombre] for nombre in self.campos]
+        self._recortados = {}
+
+        # Generamos el código de la función una sola vez: un literal de
+        # diccionario que lee cada columna por posición, sin bucles por campo.
+        partes = []
+        for posicion, (nombre, campo) in enumerate(campos.items()):
+            valor = f'fila[{posicion}]'
+            if isinstance(campo, fields.DateTime):
+                valor = f'_fecha_iso({valor})'
+            partes.append(f'{nombre!r}: {valor}')
+        codigo = f"def serializar(fila):\n    return {{{', '.join(partes)}}}\n"
+        espacio = {'_fecha_iso': _fecha_iso}
+        exec(compile(codigo, f'<serializador {tabla.name}>', 'exec'), espacio)
+        self.serializar = espacio['serializar']
+
+    def serializar_filas(self, filas):
+        """Convierte una lista de filas en una lista de diccionarios."""
+        return list(map(self.serializar, filas))
+
+    def recortar(self, campos):
+        """
+        Devuelve un serializador que solo incluye algunos campos (?fields=).
+
+        Los serializadores recortados se compilan una vez y se reutilizan.
+
+        Args:
+            campos: Los nombres de los campos pedidos (deben existir en el modelo).
+        """
+        clave = tuple(nombre for nombre in self.campos if nombre in campos)  # Orden del modelo
+        if clave == self.campos:
+            return self
+        serializador = self._recortados.get(clave)
+        if serializador is None:
+            serializador = Serializador(self.tabla, {nombre: self.definicion[nombre] for nombre in clave})
+            self._recortados[clave] = serializador
+        return serializador
+
+    def recortar_dict(self, datos):
+        """Recorta un diccionario ya serializado (por ejemplo, uno guardado en la caché)."""
+        return {nombre: datos[nombre] for nombre in self.campos}
+
+    def columnas_con(self, *nombres):
+        """
+        Columnas a seleccionar, agregando al final las que no se serializan pero
+        la consulta necesita (por ejemplo, las del cursor de paginación).
+        """
+        extras = [nombre for nombre in dict.fromkeys(nombres) if nombre not in self.campos]
+        return self.columnas + [self.tabla.c[nombre] for nombre in extras]
+
+def codificar_json(datos):
+    """
+    Codifica datos a JSON (bytes), con orjson si está disponible.
+    """
+    if orjson is not None:
+        return orjson.dumps(datos)
+    return json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def respuesta_json(datos, codigo=200, cabeceras=None):
+    """
+    Crea una respuesta JSON ya codificada (marshal_with no vuelve a recorrerla).
+
+    Args:
+        datos: Los datos ya serializados (listas y diccionarios).
+        codigo: El código de estado HTTP.
+        cabeceras: Cabeceras adicionales (opcional).
+
+    Returns:
+        Un objeto Response.
+    """
+    return Response(codificar_json(datos), status=codigo, headers=cabeceras, mimetype='application/json')
@@ -0,0 +1,37 @@
+"""
+Piezas comunes de las pruebas de Remington Song. 🧪
+Cada prueba arranca una aplicación con TestingConfig (SQLite en memoria).
+
+Uso (desde la carpeta Trabajo2):
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from remington_song import create_app
+from remington_song.config import TestingConfig
+from remington_song.extensions import db
+from remington_song.models import Cancion
+
+@pytest.fixture
+def app():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        yield app
+        db.session.remove()
+    app.extensions['remington_song_hash'].cerrar()
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
+
+@pytest.fixture
+def canciones(app):
+    """Siembra 100 canciones de prueba."""
+    db.session.add_all([Cancion(titulo=f'Canción {numero}', artista=f'Artista {numero % 7}', genero='Rock')
+                        for numero in range(100)])
+    db.session.commit()
@@ -0,0 +1,23 @@
+"""
+Pruebas de la compresión de respuestas (compresion.py). 🗜️
+"""
+import gzip
+import json
+
+from remington_song import compresion
+
+def test_lista_grande_con_gzip_reutiliza_el_cuerpo_comprimido(app, cliente, canciones, monkeypatch):
+    llamadas = []
+    comprimir = compresion.comprimir
+    monkeypatch.setattr(compresion, 'comprimir', lambda *args, **kwargs: llamadas.append(1) or comprimir(*args, **kwargs))
+
+    primera = cliente.get('/api/canciones?limit=100', headers={'Accept-Encoding': 'gzip'})
+    segunda = cliente.get('/api/canciones?limit=100', headers={'Accept-Encoding': 'gzip'})
+
+    assert primera.status_code == 200 and segunda.status_code == 200
+    assert segunda.headers['Content-Encoding'] == 'gzip'
+    assert segunda.get_data() == primera.get_data()
+    assert len(json.loads(gzip.decompress(segunda.get_data()))) == 100
+    # La segunda respuesta sale de la caché por (ETag, codificación): se comprimió una sola vez
+    assert len(llamadas) == 1
+    assert app.extensions['remington_song_compresion'].estado()['entradas'] == 1
@@ -38,7 +38,7 @@ def limpiar_texto(texto):
     if not texto:
         return ""
     texto = texto.strip()
-    texto = re.sub(r'\\s+', ' ', texto)
+    texto = re.sub(r'\s+', ' ', texto)
     return texto
 
 def generar_slug(texto):
@@ -56,42 +56,62 @@ def calcular_estadisticas_usuario(usuario_id):
     """
     Calcula estadísticas básicas de un usuario.
     """
+    return calcular_estadisticas_usuarios([usuario_id]).get(usuario_id)
+
+def calcular_estadisticas_usuarios(usuario_ids):
+    """
+    Calcula estadísticas básicas de varios usuarios a la vez.
+    Usa una única consulta agregada (agrupada por usuario y género) por cada
+    lote de ids, en lugar de recorrer los favoritos uno por uno.
+    Los usuarios que no existen no aparecen en el resultado.
+    """
     from remington_song.models import Usuario, Favorito, Cancion
-    usuario = Usuario.query.get(usuario_id)
-    if not usuario:
-        return None
-    total_favoritos = len(usuario.favoritos)
-    generos = {}
-    for favorito in usuario.favoritos:
-        if favorito.cancion.genero:
-            genero = favorito.cancion.genero
-            generos[genero] = generos.get(genero, 0) + 1
-    genero_favorito = max(generos.items(), key=lambda x: x[1])[0] if generos else None
-    return {
-        'total_favoritos': total_favoritos,
-        'genero_favorito': genero_favorito,
-        'generos_estadisticas': generos
-    }
+    from remington_song.extensions import db
+    from sqlalchemy import func
+    from flask import current_app
+    tamaño_lote = current_app.config.get('CONSULTA_TAMAÑO_LOTE', 500)
+    ids = list(dict.fromkeys(usuario_ids))
+    estadisticas = {}
+    for inicio in range(0, len(ids), tamaño_lote):
+        filas = db.session.query(
+            Usuario.id,
+            Cancion.genero,
+            func.count(Favorito.id)
+        ).outerjoin(Favorito, Favorito.id_usuario == Usuario.id).outerjoin(
+            Cancion, Cancion.id == Favorito.id_cancion
+        ).filter(
+            Usuario.id.in_(ids[inicio:inicio + tamaño_lote])
+        ).group_by(Usuario.id, Cancion.genero).all()
+        for usuario_id, genero, total in filas:
+            datos = estadisticas.setdefault(usuario_id, {
+                'total_favoritos': 0,
+                'genero_favorito': None,
+                'generos_estadisticas': {}
+            })
+            datos['total_favoritos'] += total
+            if genero:
+                datos['generos_estadisticas'][genero] = total
+    for datos in estadisticas.values():
+        generos = datos['generos_estadisticas']
+        datos['genero_favorito'] = max(generos.items(), key=lambda x: x[1])[0] if generos else None
+    return estadisticas
 
 def obtener_canciones_populares(limite=10):
     """
     Obtiene las canciones más populares basándose en la cantidad de favoritos.
+    Lee el contador desnormalizado Cancion.total_favoritos (indexado), así que
+    es una lectura por índice y no un GROUP BY sobre toda la tabla favorito.
     """
-    from remington_song.models import Cancion, Favorito
-    from remington_song.extensions import db
-    from sqlalchemy import func
-    canciones_populares = db.session.query(
-        Cancion,
-        func.count(Favorito.id).label('total_favoritos')
-    ).outerjoin(Favorito).group_by(Cancion.id).order_by(
-        func.count(Favorito.id).desc()
+    from remington_song.models import Cancion
+    canciones_populares = Cancion.query.order_by(
+        Cancion.total_favoritos.desc(), Cancion.id.desc()
     ).limit(limite).all()
     return [
         {
             'cancion': cancion.to_dict(),
-            'total_favoritos': total_favoritos
+            'total_favoritos': cancion.total_favoritos
         }
-        for cancion, total_favoritos in canciones_populares
+        for cancion in canciones_populares
     ]
 
 def validar_datos_cancion(datos):
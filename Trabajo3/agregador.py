@@ -0,0 +1,59 @@
+"""
+Consultas concurrentes para armar la página principal.
+
+Cada fuente (el API y las funciones de los módulos) se ejecuta en un pool de
+hilos con su propio plazo. Si una fuente tarda más que su plazo o falla, su
+sección se muestra como parcial y el resto de la página no la espera.
+"""
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as PlazoVencido
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+# Un solo pool para todas las peticiones: las llamadas que se pasan de su plazo
+# siguen ocupando un hilo hasta terminar, así que el pool pone un tope.
+_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix='agregador')
+
+@dataclass
+class Fuente:
+    nombre: str
+    funcion: Callable[[], Any]
+    plazo: float  # Segundos que esperamos esta fuente
+
+@dataclass
+class Seccion:
+    nombre: str
+    datos: Any = None
+    error: Optional[str] = None
+    parcial: bool = False  # True si la fuente no respondió a tiempo o falló
+    duracion: float = 0.0
+
+def consultar_fuentes(fuentes):
+    """
+    Ejecuta todas las fuentes a la vez y devuelve una sección por fuente.
+
+    El tiempo total es el de la fuente más lenta (acotado por su plazo), no
+    la suma de todas.
+    """
+    inicio = time.monotonic()
+    # Cada tarea corre con una copia del contexto actual (app y request de Flask)
+    futuros = [
+        (fuente, _pool.submit(contextvars.copy_context().run, fuente.funcion))
+        for fuente in fuentes
+    ]
+
+    secciones = {}
+    for fuente, futuro in futuros:
+        restante = max(0.0, inicio + fuente.plazo - time.monotonic())
+        try:
+            seccion = Seccion(fuente.nombre, datos=futuro.result(timeout=restante))
+        except PlazoVencido:
+            futuro.cancel()  # Solo tiene efecto si todavía no empezó
+            seccion = Seccion(fuente.nombre, parcial=True,
+                              error=f"No respondió en {fuente.plazo:g} s")
+        except Exception as e:
+            seccion = Seccion(fuente.nombre, parcial=True, error=str(e))
+        seccion.duracion = time.monotonic() - inicio
+        secciones[fuente.nombre] = seccion
+    return secciones
@@ -1,33 +1,62 @@
-from flask import Flask, render_template, request
-import requests
+import os
+from flask import Flask, jsonify, render_template, request
 
-# Importa las funciones que necesitas de cada trabajo
-from modulos.Trabajo1.app import mi_funcion
-from modulos.Trabajo2.app import otra_funcion
+from agregador import Fuente, consultar_fuentes
+from cliente_http import ClienteHTTP
+from cache_upstream import CacheUpstream
+from montaje import crear_despachador, llamar_json
 
 app = Flask(__name__)
 
 # URL base del API lp3-taller2 (reemplaza con la URL real)
-API_BASE_URL = "http://api.example.com"
+API_BASE_URL = os.environ.get("API_BASE_URL", "http://api.example.com")
+
+# Plazos por fuente (segundos): una fuente lenta no retrasa al resto de la página
+PLAZO_API = 2.0
+PLAZO_MODULOS = 1.0
+
+# Cliente compartido: conexiones reutilizadas, timeouts, reintentos y circuit breaker
+# (cada llamada del API recibe PLAZO_API como plazo total, reintentos incluidos)
+cliente = ClienteHTTP(conexiones_por_host=10, timeout_conexion=0.5, timeout_lectura=PLAZO_API, reintentos=1)
+
+# Respuestas del API guardadas según su Cache-Control (se actualizan en segundo plano)
+cache_api = CacheUpstream(cliente)
+
+def consultar_api():
+    # Ejemplo de cómo consumir el API
+    return cache_api.obtener_json(f"{API_BASE_URL}/endpoint", plazo=PLAZO_API)
+
+# Los trabajos 1 y 2 se consultan dentro del proceso (sin HTTP ni sockets)
+def consultar_trabajo1():
+    return llamar_json('videostream', '/api/v1/videos')
+
+def consultar_trabajo2():
+    return llamar_json('remington', '/api/canciones/populares?limit=5')
 
 @app.route('/')
 def index():
-    # Ejemplo de cómo consumir el API
-    try:
-        response = requests.get(f"{API_BASE_URL}/endpoint")
-        response.raise_for_status()
-        data = response.json()
-    except requests.exceptions.RequestException as e:
-        data = {"error": str(e)}
-
-    # Llama a funciones de tus módulos
-    resultado_trabajo1 = mi_funcion()
-    resultado_trabajo2 = otra_funcion()
-
-    return render_template('index.html', 
-                           data=data,
-                           resultado_trabajo1=resultado_trabajo1,
-                           resultado_trabajo2=resultado_trabajo2)
+    # Las tres fuentes se consultan a la vez, cada una con su plazo
+    secciones = consultar_fuentes([
+        Fuente('api', consultar_api, PLAZO_API),
+        Fuente('trabajo1', consultar_trabajo1, PLAZO_MODULOS),
+        Fuente('trabajo2', consultar_trabajo2, PLAZO_MODULOS),
+    ])
+
+    return render_template('index.html', secciones=secciones)
+
+@app.route('/estadisticas/upstream')
+def estadisticas_upstream():
+    # Pool de conexiones, latencias y estado del circuito de cada host externo, y la caché
+    return jsonify(dict(cliente.estadisticas(), cache=cache_api.estadisticas()))
+
+def crear_wsgi():
+    # Portada en '/', VideoStream en '/videostream' y Remington Song en '/remington'
+    # (por ejemplo: gunicorn "app:crear_wsgi()")
+    return crear_despachador(app)
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    if os.environ.get("MONTAR_APIS") == "1":
+        from werkzeug.serving import run_simple
+        run_simple('127.0.0.1', 5000, crear_wsgi(), use_reloader=True, use_debugger=True, threaded=True)
+    else:
+        app.run(debug=True)
@@ -0,0 +1,194 @@
+"""
+Caché de respuestas del API externo con stale-while-revalidate.
+
+- Respeta Cache-Control del servicio (max-age, s-maxage, no-cache, no-store,
+  stale-while-revalidate, stale-if-error) y revalida con ETag /
+  Last-Modified (un 304 solo renueva la copia guardada).
+- Mientras la copia está fresca se sirve sin llamar al servicio.
+- Si está vencida pero dentro de la ventana stale-while-revalidate, se sirve
+  igual y se lanza una sola actualización en segundo plano por URL.
+- Si el servicio falla, se sirve la última copia buena (stale-if-error).
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import requests
+
+@dataclass
+class Entrada:
+    datos: Any
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fresca_hasta: float = 0.0
+    obsoleta_hasta: float = 0.0  # Hasta cuándo se puede servir vencida mientras se revalida
+    respaldo_hasta: float = 0.0  # Hasta cuándo se puede servir si el servicio falla
+    actualizando: bool = field(default=False, repr=False)
+
+def leer_cache_control(valor):
+    """Convierte 'max-age=60, no-cache' en {'max-age': '60', 'no-cache': True}."""
+    directivas = {}
+    for parte in (valor or '').split(','):
+        nombre, _, argumento = parte.strip().partition('=')
+        if nombre:
+            directivas[nombre.lower()] = argumento.strip('"') if argumento else True
+    return directivas
+
+def _segundos(directivas, nombre, defecto):
+    valor = directivas.get(nombre)
+    if isinstance(valor, str) and re.fullmatch(r'\d+', valor):
+        return int(valor)
+    return defecto
+
+class CacheUpstream:
+    """
+    Caché por URL de respuestas JSON de un servicio externo.
+
+    Args:
+        cliente: El ClienteHTTP con el que se hacen las llamadas.
+        ttl_defecto: Segundos de frescura si el servicio no envía max-age.
+        obsoleta_defecto: Ventana stale-while-revalidate si el servicio no la envía.
+        respaldo_defecto: Ventana stale-if-error si el servicio no la envía.
+        maximo_entradas: URLs guardadas como máximo (LRU).
+    """
+
+    def __init__(self, cliente, ttl_defecto=30, obsoleta_defecto=300, respaldo_defecto=86400,
+                 maximo_entradas=256):
+        self.cliente = cliente
+        self.ttl_defecto = ttl_defecto
+        self.obsoleta_defecto = obsoleta_defecto
+        self.respaldo_defecto = respaldo_defecto
+        self.maximo_entradas = maximo_entradas
+        self._entradas = OrderedDict()
+        self._candados = {}  # Un lock por URL: una sola descarga a la vez
+        self._lock = threading.Lock()
+        self._contadores = {'frescas': 0, 'obsoletas_servidas': 0, 'descargas': 0,
+                            'revalidadas_304': 0, 'respaldos_por_error': 0}
+
+    def _contar(self, nombre):
+        with self._lock:
+            self._contadores[nombre] += 1
+
+    def _candado(self, url):
+        with self._lock:
+            return self._candados.setdefault(url, threading.Lock())
+
+    def _guardar(self, url, entrada):
+        with self._lock:
+            self._entradas[url] = entrada
+            self._entradas.move_to_end(url)
+            while len(self._entradas) > self.maximo_entradas:
+                viejo, _ = self._entradas.popitem(last=False)
+                self._candados.pop(viejo, None)
+
+    def obtener_json(self, url, plazo=None):
+        """
+        Devuelve el JSON de la URL, desde la caché cuando se puede.
+
+        Args:
+            url: La URL a consultar.
+            plazo: Segundos como máximo para esperar la descarga (incluida la
+                espera por otra descarga de la misma URL). None: sin plazo.
+
+        Raises:
+            requests.exceptions.RequestException: Si el servicio falla y no hay copia de respaldo.
+        """
+        limite = None if plazo is None else time.monotonic() + plazo
+        ahora = time.time()
+        with self._lock:
+            entrada = self._entradas.get(url)
+            if entrada is not None:
+                self._entradas.move_to_end(url)
+
+        if entrada is not None and ahora < entrada.fresca_hasta:
+            self._contar('frescas')
+            return entrada.datos
+        if entrada is not None and ahora < entrada.obsoleta_hasta:
+            self._contar('obsoletas_servidas')
+            self._actualizar_en_segundo_plano(url, entrada, plazo)
+            return entrada.datos
+
+        candado = self._candado(url)
+        if not candado.acquire(timeout=-1 if limite is None else max(0.0, limite - time.monotonic())):
+            # Otra descarga de la misma URL sigue en curso y no nos queda tiempo para esperarla
+            if entrada is not None and time.time() < entrada.respaldo_hasta:
+                self._contar('respaldos_por_error')
+                return entrada.datos
+            raise requests.exceptions.Timeout(f"Se agotó el plazo de {plazo:g} s para {url}")
+        try:
+            # Otra petición pudo haberla descargado mientras esperábamos el lock
+            actual = self._entradas.get(url)
+            if actual is not None and time.time() < actual.fresca_hasta:
+                return actual.datos
+            restante = None if limite is None else limite - time.monotonic()
+            return self._descargar(url, actual, restante)
+        finally:
+            candado.release()
+
+    def _actualizar_en_segundo_plano(self, url, entrada, plazo=None):
+        with self._lock:
+            if entrada.actualizando:
+                return  # Ya hay una actualización en curso para esta URL
+            entrada.actualizando = True
+
+        def actualizar():
+            try:
+                with self._candado(url):
+                    self._descargar(url, entrada, plazo)
+            except Exception:
+                pass  # La copia vencida se sigue sirviendo; _descargar ya contó el error
+            finally:
+                entrada.actualizando = False
+
+        threading.Thread(target=actualizar, name='cache-upstream', daemon=True).start()
+
+    def _descargar(self, url, entrada, plazo=None):
+        """Pide la URL (condicional si hay copia) y actualiza la caché."""
+        cabeceras = {}
+        if entrada is not None and entrada.etag:
+            cabeceras['If-None-Match'] = entrada.etag
+        if entrada is not None and entrada.last_modified:
+            cabeceras['If-Modified-Since'] = entrada.last_modified
+
+        try:
+            respuesta = self.cliente.get(url, headers=cabeceras, plazo=plazo)
+            if respuesta.status_code != 304:
+                respuesta.raise_for_status()
+                datos = respuesta.json()
+        except Exception:
+            if entrada is not None and time.time() < entrada.respaldo_hasta:
+                self._contar('respaldos_por_error')
+                return entrada.datos
+            raise
+
+        directivas = leer_cache_control(respuesta.headers.get('Cache-Control'))
+        if respuesta.status_code == 304:
+            self._contar('revalidadas_304')
+            datos = entrada.datos
+        else:
+            self._contar('descargas')
+        if 'no-store' in directivas:
+            return datos
+
+        ahora = time.time()
+        ttl = 0 if 'no-cache' in directivas else _segundos(
+            directivas, 's-maxage', _segundos(directivas, 'max-age', self.ttl_defecto))
+        fresca_hasta = ahora + ttl
+        self._guardar(url, Entrada(
+            datos=datos,
+            etag=respuesta.headers.get('ETag') or (entrada.etag if entrada else None),
+            last_modified=respuesta.headers.get('Last-Modified') or (entrada.last_modified if entrada else None),
+            fresca_hasta=fresca_hasta,
+            # no-cache: hay que revalidar antes de usarla, así que no se sirve vencida
+            obsoleta_hasta=fresca_hasta + (0 if 'no-cache' in directivas else
+                                           _segundos(directivas, 'stale-while-revalidate', self.obsoleta_defecto)),
+            respaldo_hasta=fresca_hasta + _segundos(directivas, 'stale-if-error', self.respaldo_defecto)
+        ))
+        return datos
+
+    def estadisticas(self):
+        with self._lock:
+            return dict(self._contadores, entradas=len(self._entradas))
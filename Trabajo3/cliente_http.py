@@ -0,0 +1,234 @@
+"""
+Cliente HTTP compartido para las llamadas a servicios externos.
+
+- Reutiliza conexiones (keep-alive) con un pool por host y un tope de
+  conexiones simultáneas a cada host.
+- Siempre usa timeouts de conexión y de lectura, y acepta un plazo total
+  para la llamada completa (intentos y esperas incluidos).
+- Reintenta los errores transitorios (conexión, 429, 502, 503, 504) con
+  espera exponencial y jitter.
+- Un circuit breaker por host deja de llamar a un servicio que falla
+  seguido y vuelve a probarlo pasado un tiempo.
+- Publica estadísticas del pool, latencias y estado de cada circuito.
+"""
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ESTADOS_REINTENTABLES = {429, 502, 503, 504}
+METODOS_IDEMPOTENTES = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+class CircuitoAbierto(requests.exceptions.RequestException):
+    """El host falló demasiadas veces seguidas; no lo llamamos por un tiempo."""
+
+class Circuito:
+    """Circuit breaker de un host: cerrado, abierto o semiabierto."""
+
+    def __init__(self, umbral_fallos, tiempo_abierto):
+        self.umbral_fallos = umbral_fallos
+        self.tiempo_abierto = tiempo_abierto
+        self.estado = 'cerrado'
+        self.fallos_seguidos = 0
+        self.abierto_desde = 0.0
+        self._prueba_en_curso = False
+        self._lock = threading.Lock()
+
+    def permitir(self):
+        """Indica si se puede hacer una llamada ahora."""
+        with self._lock:
+            if self.estado == 'cerrado':
+                return True
+            if self.estado == 'abierto' and time.monotonic() - self.abierto_desde >= self.tiempo_abierto:
+                self.estado = 'semiabierto'
+            if self.estado == 'semiabierto' and not self._prueba_en_curso:
+                self._prueba_en_curso = True  # Una sola llamada de prueba a la vez
+                return True
+            return False
+
+    def registrar_exito(self):
+        with self._lock:
+            self.estado = 'cerrado'
+            self.fallos_seguidos = 0
+            self._prueba_en_curso = False
+
+    def liberar(self):
+        """Termina una llamada que no dice nada de la salud del host (p. ej. URL inválida)."""
+        with self._lock:
+            self._prueba_en_curso = False
+
+    def registrar_fallo(self):
+        with self._lock:
+            self.fallos_seguidos += 1
+            self._prueba_en_curso = False
+            if self.estado == 'semiabierto' or self.fallos_seguidos >= self.umbral_fallos:
+                self.estado = 'abierto'
+                self.abierto_desde = time.monotonic()
+
+class EstadisticasHost:
+    """Contadores y latencias recientes de un host."""
+
+    def __init__(self, muestras):
+        self.peticiones = 0
+        self.errores = 0
+        self.reintentos = 0
+        self.rechazadas_por_circuito = 0
+        self.latencias = deque(maxlen=muestras)  # Milisegundos de los últimos intentos
+
+    def resumen(self):
+        ordenadas = sorted(self.latencias)
+
+        def percentil(p):
+            if not ordenadas:
+                return None
+            return round(ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))], 2)
+
+        return {
+            'peticiones': self.peticiones,
+            'errores': self.errores,
+            'reintentos': self.reintentos,
+            'rechazadas_por_circuito': self.rechazadas_por_circuito,
+            'latencia_p50_ms': percentil(50),
+            'latencia_p95_ms': percentil(95),
+            'latencia_p99_ms': percentil(99)
+        }
+
+class ClienteHTTP:
+    """
+    Cliente HTTP con pool de conexiones, timeouts, reintentos y circuit breaker.
+
+    Es seguro compartirlo entre hilos: el pool de urllib3 lo es, y el
+    estado propio (circuitos y estadísticas) está protegido por un lock.
+    """
+
+    def __init__(self, conexiones_por_host=10, hosts_en_pool=10, timeout_conexion=1.0,
+                 timeout_lectura=5.0, reintentos=2, espera_base=0.1, espera_maxima=2.0,
+                 umbral_fallos=5, tiempo_abierto=30.0, muestras_latencia=1000):
+        self.timeout = (timeout_conexion, timeout_lectura)
+        self.reintentos = reintentos
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.umbral_fallos = umbral_fallos
+        self.tiempo_abierto = tiempo_abierto
+        self.muestras_latencia = muestras_latencia
+        self._circuitos = {}
+        self._estadisticas = {}
+        self._lock = threading.Lock()
+
+        # pool_block=True: si un host ya tiene todas sus conexiones ocupadas,
+        # las llamadas esperan una libre en lugar de abrir conexiones de más.
+        self._adaptador = HTTPAdapter(pool_connections=hosts_en_pool, pool_maxsize=conexiones_por_host,
+                                      pool_block=True, max_retries=0)
+        self.sesion = requests.Session()
+        self.sesion.mount('http://', self._adaptador)
+        self.sesion.mount('https://', self._adaptador)
+
+    def _del_host(self, host):
+        with self._lock:
+            if host not in self._circuitos:
+                self._circuitos[host] = Circuito(self.umbral_fallos, self.tiempo_abierto)
+                self._estadisticas[host] = EstadisticasHost(self.muestras_latencia)
+            return self._circuitos[host], self._estadisticas[host]
+
+    def _espera(self, intento):
+        # "Full jitter": un valor al azar entre 0 y la espera exponencial, para que
+        # los clientes no reintenten todos al mismo tiempo
+        return random.uniform(0, min(self.espera_maxima, self.espera_base * 2 ** intento))
+
+    def request(self, metodo, url, timeout=None, plazo=None, **kwargs):
+        """
+        Hace una petición con reintentos y circuit breaker.
+
+        Los reintentos solo se hacen con métodos idempotentes. Devuelve la
+        respuesta (también si es un error HTTP definitivo, como 404).
+
+        Con 'plazo' (segundos) los timeouts de cada intento se recortan a lo
+        que queda y no se reintenta si la espera no cabe antes de que venza.
+
+        Raises:
+            CircuitoAbierto: Si el circuito del host está abierto.
+            requests.exceptions.RequestException: Si todos los intentos fallan.
+        """
+        metodo = metodo.upper()
+        host = urlsplit(url).netloc
+        circuito, estadisticas = self._del_host(host)
+        intentos = 1 + (self.reintentos if metodo in METODOS_IDEMPOTENTES else 0)
+        limite = None if plazo is None else time.monotonic() + plazo
+
+        for intento in range(intentos):
+            tiempo = timeout or self.timeout
+            if limite is not None:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise requests.exceptions.Timeout(f"Se agotó el plazo de {plazo:g} s para {url}")
+                tiempo = tuple(min(parte, restante) for parte in tiempo) if isinstance(tiempo, tuple) \
+                    else min(tiempo, restante)
+
+            if not circuito.permitir():
+                with self._lock:
+                    estadisticas.rechazadas_por_circuito += 1
+                raise CircuitoAbierto(f"Circuito abierto para {host}")
+
+            inicio = time.perf_counter()
+            error, respuesta = None, None
+            try:
+                respuesta = self.sesion.request(metodo, url, timeout=tiempo, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            except Exception:
+                circuito.liberar()
+                raise
+            duracion = (time.perf_counter() - inicio) * 1000
+
+            transitorio = error is not None or respuesta.status_code in ESTADOS_REINTENTABLES
+            with self._lock:
+                estadisticas.peticiones += 1
+                estadisticas.latencias.append(duracion)
+                if transitorio:
+                    estadisticas.errores += 1
+            if not transitorio:
+                circuito.registrar_exito()
+                return respuesta
+
+            circuito.registrar_fallo()
+            espera = self._espera(intento)
+            if intento == intentos - 1 or (limite is not None and time.monotonic() + espera >= limite):
+                if error is not None:
+                    raise error
+                return respuesta
+            if respuesta is not None:
+                respuesta.close()  # Devolvemos la conexión al pool antes de esperar
+            with self._lock:
+                estadisticas.reintentos += 1
+            time.sleep(espera)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def estadisticas(self):
+        """Estado del pool de conexiones y estadísticas por host."""
+        with self._lock:
+            hosts = {host: dict(estadisticas.resumen(), circuito=self._circuitos[host].estado)
+                     for host, estadisticas in self._estadisticas.items()}
+        pools = {}
+        for clave in list(self._adaptador.poolmanager.pools.keys()):
+            pool = self._adaptador.poolmanager.pools.get(clave)
+            if pool is None:
+                continue
+            pools[f'{pool.scheme}://{pool.host}:{pool.port}'] = {
+                'conexiones_creadas': pool.num_connections,  # Incluye las que se cerraron por timeout
+                'peticiones': pool.num_requests,
+                'cupos_libres': pool.pool.qsize() if pool.pool is not None else 0,  # Conexiones que aún se pueden tomar
+                'maximo': self._adaptador._pool_maxsize
+            }
+        return {'hosts': hosts, 'pools': pools}
+
+    def cerrar(self):
+        self.sesion.close()
@@ -0,0 +1,115 @@
+"""
+Montaje de VideoStream (Trabajo1) y Remington Song (Trabajo2) en este proceso.
+
+- crear_despachador() sirve la portada de Trabajo3 en '/', VideoStream en
+  '/videostream' y Remington Song en '/remington' desde un solo proceso WSGI.
+- llamar_json() consulta cualquiera de las dos APIs sin sockets: arma la
+  petición WSGI y la pasa directamente a la aplicación montada.
+
+Las aplicaciones se crean desde las carpetas Trabajo1 y Trabajo2 del
+repositorio (no desde las copias de modulos/) y una sola vez por proceso.
+"""
+import importlib.util
+import json
+import logging
+import os
+import sys
+import threading
+
+from flask import Flask, jsonify
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
+from werkzeug.test import Client
+
+logger = logging.getLogger(__name__)
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Prefijo de cada aplicación montada
+PREFIJOS = {
+    'videostream': '/videostream',
+    'remington': '/remington',
+}
+
+_aplicaciones = {}
+_lock = threading.Lock()
+
+def _agregar_ruta(carpeta):
+    if carpeta not in sys.path:
+        sys.path.insert(0, carpeta)
+
+def _crear_videostream():
+    carpeta = os.path.join(RAIZ, 'Trabajo1')
+    _agregar_ruta(carpeta)  # Trabajo1 importa sus módulos como 'config', 'database'...
+    # Su app.py se carga con otro nombre: 'app' ya es la portada de Trabajo3
+    spec = importlib.util.spec_from_file_location('videostream_app', os.path.join(carpeta, 'app.py'))
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    from config import config_map
+    return modulo.create_app(config_map[os.environ.get('FLASK_ENV', 'default')])
+
+def _crear_remington():
+    _agregar_ruta(os.path.join(RAIZ, 'Trabajo2'))  # remington_song importa 'utils' de Trabajo2
+    from remington_song import create_app
+    from remington_song.config import configuraciones
+    return create_app(configuraciones[os.environ.get('REMINGTON_ENTORNO', 'defecto')])
+
+FABRICAS = {
+    'videostream': _crear_videostream,
+    'remington': _crear_remington,
+}
+
+def _no_disponible(nombre, error):
+    """App de reemplazo cuando una de las APIs no se puede crear."""
+    app = Flask(f'{nombre}_no_disponible')
+
+    @app.route('/', defaults={'ruta': ''})
+    @app.route('/<path:ruta>')
+    def no_disponible(ruta):
+        return jsonify({'error': f'{nombre} no está disponible: {error}'}), 503
+
+    return app
+
+def obtener_aplicacion(nombre):
+    """Devuelve la aplicación montada con ese nombre, creándola la primera vez."""
+    with _lock:
+        if nombre not in _aplicaciones:
+            try:
+                _aplicaciones[nombre] = FABRICAS[nombre]()
+            except Exception as e:
+                # Una API rota no debe tumbar la portada ni a la otra API
+                logger.exception("No se pudo crear la aplicación %s", nombre)
+                _aplicaciones[nombre] = _no_disponible(nombre, e)
+        return _aplicaciones[nombre]
+
+def crear_despachador(portada):
+    """Aplicación WSGI con la portada en '/' y las dos APIs bajo sus prefijos."""
+    return DispatcherMiddleware(portada, {
+        prefijo: obtener_aplicacion(nombre) for nombre, prefijo in PREFIJOS.items()
+    })
+
+def llamar(nombre, ruta, metodo='GET', **kwargs):
+    """
+    Hace una petición a una de las APIs dentro del proceso, sin sockets.
+
+    Args:
+        nombre: 'videostream' o 'remington'.
+        ruta: La ruta dentro de esa API (por ejemplo, '/api/canciones/populares').
+        kwargs: Lo mismo que acepta el cliente de pruebas de werkzeug (json, headers...).
+
+    Returns:
+        La respuesta de werkzeug (ya leída).
+    """
+    cliente = Client(obtener_aplicacion(nombre), use_cookies=False)
+    return cliente.open(ruta, method=metodo, **kwargs)
+
+def llamar_json(nombre, ruta, metodo='GET', **kwargs):
+    """
+    Como llamar(), pero devuelve el JSON de la respuesta.
+
+    Raises:
+        RuntimeError: Si la API responde con un error.
+    """
+    respuesta = llamar(nombre, ruta, metodo, **kwargs)
+    if respuesta.status_code >= 400:
+        raise RuntimeError(f"{nombre} respondió {respuesta.status_code} en {ruta}")
+    return json.loads(respuesta.get_data())
@@ -0,0 +1,84 @@
+"""
+Servidor local que simula el API externo, para probar el cliente HTTP.
+
+Rutas:
+    /endpoint            Responde JSON enseguida, con ETag y Cache-Control
+                         (max-age=5, stale-while-revalidate=30); si el cliente
+                         envía el mismo ETag responde 304. Con
+                         ManejadorStub.fallando = True responde 503.
+    /lento?segundos=N    Responde después de N segundos.
+    /error?codigo=N      Responde siempre con el código N (503 por defecto).
+    /intermitente        Falla con 503 una de cada dos veces.
+
+Uso:
+    python stub_upstream.py --puerto 8081
+    API_BASE_URL=http://127.0.0.1:8081 python app.py
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+class ManejadorStub(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, como un servidor real
+    disable_nagle_algorithm = True  # Cabeceras y cuerpo van en escrituras separadas
+    contador = itertools.count()
+    fallando = False  # Para simular una caída del servicio desde las pruebas
+
+    def _responder(self, codigo, datos, cabeceras=None):
+        cuerpo = json.dumps(datos).encode('utf-8') if datos is not None else b''
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        try:
+            self.wfile.write(cuerpo)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # El cliente se rindió antes (timeout): es lo que queremos probar
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        parametros = {clave: valores[0] for clave, valores in parse_qs(partes.query).items()}
+        if partes.path == '/endpoint':
+            if self.fallando:
+                self._responder(503, {'error': 'caído'})
+                return
+            cabeceras = {'ETag': '"stub-v1"', 'Cache-Control': 'max-age=5, stale-while-revalidate=30'}
+            if self.headers.get('If-None-Match') == cabeceras['ETag']:
+                self._responder(304, None, cabeceras)
+            else:
+                self._responder(200, {'mensaje': 'hola desde el stub'}, cabeceras)
+        elif partes.path == '/lento':
+            time.sleep(float(parametros.get('segundos', 5)))
+            self._responder(200, {'mensaje': 'lento'})
+        elif partes.path == '/error':
+            self._responder(int(parametros.get('codigo', 503)), {'error': 'simulado'})
+        elif partes.path == '/intermitente':
+            if next(self.contador) % 2:
+                self._responder(503, {'error': 'intermitente'})
+            else:
+                self._responder(200, {'mensaje': 'intermitente'})
+        else:
+            self._responder(404, {'error': 'no encontrado'})
+
+    def log_message(self, formato, *args):
+        pass  # Sin una línea por petición
+
+def iniciar_stub(puerto=0):
+    """Arranca el stub en un hilo y devuelve (servidor, url_base)."""
+    servidor = ThreadingHTTPServer(('127.0.0.1', puerto), ManejadorStub)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f'http://127.0.0.1:{servidor.server_port}'
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='API externo simulado')
+    parser.add_argument('--puerto', type=int, default=8081)
+    args = parser.parse_args()
+    servidor = ThreadingHTTPServer(('127.0.0.1', args.puerto), ManejadorStub)
+    print(f"Stub escuchando en http://127.0.0.1:{args.puerto}")
+    servidor.serve_forever()